@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+
+class ArchivePages:
+    """
+    Archive des pages HTML visitées, compressées (gzip) et adressées par leur contenu (sha256) :
+    une page identique n'est stockée qu'une fois. Un index SQLite associe (href, vue) à l'empreinte
+    et à la compétition du match (pour relire ses statistiques avec le même schéma).
+    Vues : "resume" (score mi-temps) et "statistiques" (score complet et statistiques).
+    """
+
+    def __init__(self, repertoire="archive"):
+        self.repertoire = repertoire
+        os.makedirs(repertoire, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(repertoire, "index.sqlite"), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+                                 href TEXT,
+                                 vue TEXT,
+                                 saison TEXT,
+                                 empreinte TEXT,
+                                 maj REAL,
+                                 competition TEXT,
+                                 PRIMARY KEY (href, vue))""")
+        self.conn.commit()
+
+    def chemin(self, empreinte):
+        return os.path.join(self.repertoire, empreinte[:2], empreinte + ".html.gz")
+
+    def ajouter(self, href, saison, vue, html, competition=None):
+        """Archive le HTML d'une vue d'un match de la compétition et renvoie son empreinte."""
+        contenu = html.encode("utf-8")
+        empreinte = hashlib.sha256(contenu).hexdigest()
+        chemin = self.chemin(empreinte)
+        if not os.path.exists(chemin):
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            temporaire = f"{chemin}.{os.getpid()}.tmp"
+            with gzip.open(temporaire, "wb", compresslevel=6) as f:
+                f.write(contenu)
+            os.replace(temporaire, chemin)
+        self.conn.execute("""INSERT OR REPLACE INTO pages (href, vue, saison, empreinte, maj, competition)
+                             VALUES (?, ?, ?, ?, ?, ?)""", (href, vue, saison, empreinte, time.time(), competition))
+        self.conn.commit()
+        return empreinte
+
+    def lire(self, empreinte):
+        with gzip.open(self.chemin(empreinte), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def matchs(self):
+        """Liste de (saison, href, compétition, {vue: empreinte}) pour chaque match archivé."""
+        matchs = {}
+        for href, vue, saison, empreinte, competition in self.conn.execute(
+                "SELECT href, vue, saison, empreinte, competition FROM pages ORDER BY rowid"):
+            matchs.setdefault(href, (saison, href, competition, {}))[3][vue] = empreinte
+        return list(matchs.values())
+
+    def fermer(self):
+        self.conn.close()
+
+
+# --- Archive propre à chaque processus (activée si un répertoire est donné) ---
+archive = None
+
+def obtenir_archive(repertoire):
+    global archive
+    if archive is None:
+        archive = ArchivePages(repertoire)
+    return archive
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import os
+import random
+import re
+from datetime import datetime, timezone
+from functools import partial
+from urllib.parse import urlparse
+
+import aiohttp
+from tqdm import tqdm
+
+from extraction_js import FORMAT_DATE
+from match_ids import id_equipe, id_match, url_match
+from metriques import compter, mesurer
+from ordonnanceur import Seau
+
+
+# --- Flux de données utilisés par les pages de match Flashscore ---
+URL_FLUX = "https://local-global.flashscore.ninja/2/x/feed/"
+ENTETES = {"x-fsign": "SW9D1eZo"}
+FLUX_SCORE = "dc_1_{id}"       # score final
+FLUX_STATS = "df_st_1_{id}"    # statistiques (match, 1ère et 2ème mi-temps)
+FLUX_RESUME = "df_sui_1_{id}"  # résumé, contient le score à la mi-temps
+PAGE_MATCH = "page_{id}.html"  # page du match (équipes), nom de son enregistrement à côté des flux
+# Requêtes HTTP par match, au plus : les trois flux et la page
+REQUETES_PAR_MATCH = 4
+
+# Index par défaut de la période de statistiques, identique à l'onglet "/statistiques-du-match/1"
+# (pour une compétition : competitions.periode_stats)
+PERIODE_STATS = 1
+
+# Relances d'un flux en échec (connexion, délai dépassé, 429 ou 5xx), mêmes valeurs que l'Ordonnanceur
+TENTATIVES = 4
+DELAI_BASE = 2.0
+DELAI_MAX = 120.0
+
+
+def lire_flux(texte):
+    """
+    Découpe un flux Flashscore en liste d'enregistrements.
+    Les enregistrements sont séparés par '~', les champs par '¬' et chaque champ est de la forme 'CLE÷valeur'.
+    """
+    enregistrements = []
+    for bloc in texte.split("~"):
+        champs = {}
+        for champ in bloc.split("¬"):
+            if "÷" in champ:
+                cle, valeur = champ.split("÷", 1)
+                champs[cle] = valeur
+        if champs:
+            enregistrements.append(champs)
+    return enregistrements
+
+def remplir_score(result, texte):
+    """
+    Score final : champs DE (domicile) et DF (extérieur) du flux dc_1, ainsi que la date du match
+    (DC, horodatage du coup d'envoi, écrite en UTC comme extraction_js.date_match).
+    """
+    for champs in lire_flux(texte):
+        if champs.get("DC", "").isdigit():
+            result["date_match"] = datetime.fromtimestamp(int(champs["DC"]), tz=timezone.utc).strftime(FORMAT_DATE)
+        if "DE" in champs and "DF" in champs:
+            result["score_equipe_home"] = champs["DE"]
+            result["score_equipe_away"] = champs["DF"]
+            return
+
+def remplir_stats(result, texte, stats=None, periode=PERIODE_STATS):
+    """
+    Statistiques de la période `periode` : chaque période commence par un champ SE, puis chaque ligne
+    contient SG (catégorie), SH (domicile) et SI (extérieur).
+    Avec un schéma `stats`, seules les catégories déclarées sont gardées (voir extraction_js.remplir_stats).
+    """
+    courante = -1
+    for champs in lire_flux(texte):
+        if "SE" in champs:
+            courante += 1
+        if courante != periode or "SG" not in champs:
+            continue
+        category_name = champs["SG"]
+        colonne = stats.colonne(category_name) if stats is not None else category_name.replace(" ", "_")
+        if colonne is None:
+            continue
+        result[colonne + "_home"] = champs.get("SH")
+        result[colonne + "_away"] = champs.get("SI")
+
+def participants(html):
+    """
+    Participants du match déclarés dans le HTML brut de la page (objet JSON `window.environment`, dont
+    `participantsData` alimente l'en-tête rendu par script) : {"home": [...], "away": [...]}, None sans cet objet.
+    """
+    debut = html.find("window.environment")
+    debut = html.find("{", debut) if debut >= 0 else -1
+    if debut < 0:
+        return None
+    try:
+        environnement, _ = json.JSONDecoder().raw_decode(html, debut)
+    except ValueError:
+        return None
+    return environnement.get("participantsData") if isinstance(environnement, dict) else None
+
+def remplir_equipes(result, html):
+    """
+    Identifiants des équipes (equipe_home, equipe_away) : les équipes ne figurent pas dans les flux,
+    on les lit dans le HTML de la page du match. L'en-tête (duelParticipant__home/__away) est rendu par script :
+    le HTML brut n'en contient que les données (`participants`) ; ses liens ne servent que pour une page déjà rendue.
+    """
+    donnees = participants(html)
+    if donnees:
+        for cote in ("home", "away"):
+            equipe = (donnees.get(cote) or [{}])[0]
+            result[f"equipe_{cote}"] = id_equipe(equipe.get("detail_link")) or equipe.get("id")
+        return
+    for cote in ("home", "away"):
+        debut = html.find(f"duelParticipant__{cote}")
+        fin = html.find("duelParticipant__", debut + 1) if debut >= 0 else -1
+        bloc = html[debut:fin if fin > 0 else None] if debut >= 0 else ""
+        equipes = (id_equipe(lien) for lien in re.findall(r'href="([^"]+)"', bloc))
+        result[f"equipe_{cote}"] = next((equipe for equipe in equipes if equipe), None)
+
+def remplir_mi_temps(result, texte):
+    """Score mi-temps : premier enregistrement de période (AC) portant IG/IH."""
+    for champs in lire_flux(texte):
+        if "AC" in champs and "IG" in champs and "IH" in champs:
+            result["score_mi_temps_home"] = champs["IG"].strip()
+            result["score_mi_temps_away"] = champs["IH"].strip()
+            return
+
+class Limiteur:
+    """
+    Débits global et par hôte (requêtes/s) des flux, avec les seaux à jetons de l'Ordonnanceur.
+    Les requêtes attendent leur tour derrière un verrou (ordre d'arrivée) : seule la première
+    surveille les seaux, les autres ne sont pas réveillées à chaque jeton. Un débit nul désactive la limite.
+    """
+
+    def __init__(self, debit_global=None, debit_par_hote=None):
+        self.seau_global = Seau(debit_global) if debit_global else None
+        self.debit_par_hote = debit_par_hote
+        self.seaux_hotes = {}
+        self.verrou = asyncio.Lock()
+
+    async def attendre(self, url):
+        hote = urlparse(url).netloc
+        if self.debit_par_hote and hote not in self.seaux_hotes:
+            self.seaux_hotes[hote] = Seau(self.debit_par_hote)
+        seaux = [seau for seau in (self.seau_global, self.seaux_hotes.get(hote)) if seau is not None]
+        if not seaux:
+            return
+        async with self.verrou:
+            while True:
+                attente = max(seau.attente() for seau in seaux)
+                if attente <= 0:
+                    break
+                await asyncio.sleep(attente)
+            for seau in seaux:
+                seau.prendre()
+
+def a_relancer(erreur):
+    """Erreurs passagères : connexion, délai dépassé, limitation (429) ou erreur serveur (5xx)."""
+    if isinstance(erreur, aiohttp.ClientResponseError):
+        return erreur.status == 429 or erreur.status >= 500
+    return isinstance(erreur, (aiohttp.ClientError, asyncio.TimeoutError))
+
+def delai(tentative, delai_base=DELAI_BASE, delai_max=DELAI_MAX):
+    """Délai avant la tentative suivante : exponentiel, plafonné, avec gigue aléatoire (comme l'Ordonnanceur)."""
+    return random.uniform(0, min(delai_max, delai_base * 2 ** (tentative - 1)))
+
+async def telecharger(session, semaphore, url_flux, nom, enregistrement=None, limiteur=None, tentatives=TENTATIVES,
+                      fichier=None):
+    """
+    Télécharge un flux (en respectant la limite de concurrence et les débits du limiteur) et l'enregistre si demandé,
+    sous le nom `fichier` (par défaut `nom`).
+    Les erreurs passagères sont relancées jusqu'à `tentatives` essais, la dernière erreur est alors levée.
+    """
+    for tentative in range(1, tentatives + 1):
+        if limiteur is not None:
+            await limiteur.attendre(url_flux)
+        try:
+            async with semaphore:
+                with mesurer("http.flux"):
+                    async with session.get(url_flux + nom) as reponse:
+                        reponse.raise_for_status()
+                        texte = await reponse.text()
+            break
+        except Exception as e:
+            if tentative == tentatives or not a_relancer(e):
+                raise
+            compter("relances", "http.flux")
+            await asyncio.sleep(delai(tentative))
+    compter("requetes_http")
+    compter("octets_http", n=len(texte.encode("utf-8")))
+    if enregistrement:
+        with open(os.path.join(enregistrement, fichier or nom), "w", encoding="utf-8") as f:
+            f.write(texte)
+    return texte
+
+async def extraire_match(session, semaphore, match_tuple, url_flux=URL_FLUX, enregistrement=None, stats=None,
+                         limiteur=None, morts=None, url_page=None, periode=PERIODE_STATS, mi_temps=True):
+    """
+    Équivalent HTTP de process_match : renvoie le même dictionnaire de résultats
+    à partir des flux de données, sans navigateur. Les flux abandonnés sont ajoutés à `morts` (href, flux, erreur).
+    La page du match est lue sur le site, ou sous `url_page` (enregistrements PAGE_MATCH) si donné.
+    `periode` et `mi_temps` suivent l'entrée du registre (onglet statistiques, lecture du score mi-temps).
+    """
+    saison, href = match_tuple
+    result = {"saison": saison, "href": href,
+              "score_equipe_home": None, "score_equipe_away": None,
+              "score_mi_temps_home": None, "score_mi_temps_away": None}
+    identifiant = id_match(href)
+    if identifiant is None:
+        print(f"Identifiant de match introuvable pour {href}")
+        return result
+
+    lectures = [(FLUX_SCORE, remplir_score), (FLUX_STATS, partial(remplir_stats, stats=stats, periode=periode))]
+    if mi_temps:
+        lectures.append((FLUX_RESUME, remplir_mi_temps))
+    noms = [flux.format(id=identifiant) for flux, _ in lectures]
+    requetes = [telecharger(session, semaphore, url_flux, nom, enregistrement, limiteur) for nom in noms]
+    # Page du match (HTML brut, sans exécuter de script) pour les équipes, enregistrée avec les flux
+    page = PAGE_MATCH.format(id=identifiant)
+    if url_page is None:
+        requetes.append(telecharger(session, semaphore, url_match(identifiant), "", enregistrement, limiteur,
+                                    fichier=page))
+    else:
+        requetes.append(telecharger(session, semaphore, url_page, page, enregistrement, limiteur))
+    reponses = await asyncio.gather(*requetes, return_exceptions=True)
+    remplissages = [remplir for _, remplir in lectures] + [remplir_equipes]
+    for nom, remplir, reponse in zip(noms + [page], remplissages, reponses):
+        if isinstance(reponse, Exception):
+            print(f"Erreur lors du chargement du flux pour {href}: {reponse}")
+            compter("abandons", "http.flux")
+            if morts is not None:
+                morts.append((href, nom, reponse))
+            continue
+        remplir(result, reponse)
+    return result
+
+async def extraire_matchs(links_list, concurrence=50, url_flux=URL_FLUX, enregistrement=None, stats=None,
+                          debit_global=None, debit_par_hote=None, morts=None, url_page=None, periode=PERIODE_STATS,
+                          mi_temps=True):
+    """
+    Extrait tous les matchs avec une seule session HTTP (connexions réutilisées),
+    au plus `concurrence` requêtes simultanées et les débits donnés. L'ordre des résultats suit links_list.
+    """
+    if enregistrement:
+        os.makedirs(enregistrement, exist_ok=True)
+    connecteur = aiohttp.TCPConnector(limit=concurrence, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=30)
+    semaphore = asyncio.Semaphore(concurrence)
+    limiteur = Limiteur(debit_global, debit_par_hote)
+    async with aiohttp.ClientSession(headers=ENTETES, connector=connecteur, timeout=timeout) as session:
+        async def indexer(i, match_tuple):
+            with mesurer("http.match"):
+                return i, await extraire_match(session, semaphore, match_tuple, url_flux, enregistrement, stats,
+                                               limiteur, morts, url_page, periode, mi_temps)
+
+        taches = [indexer(i, match_tuple) for i, match_tuple in enumerate(links_list)]
+        results = [None] * len(taches)
+        for tache in tqdm(asyncio.as_completed(taches), total=len(taches), desc="Extraction HTTP"):
+            i, result = await tache
+            results[i] = result
+    return results
+
+def process_matches_http(links_list, concurrence=50, url_flux=URL_FLUX, enregistrement=None, stats=None,
+                         debit_global=None, debit_par_hote=None, morts=None, url_page=None, periode=PERIODE_STATS,
+                         mi_temps=True):
+    """
+    Point d'entrée synchrone du mode HTTP.
+      - url_flux : URL de base des flux (ex: serveur local de test)
+      - enregistrement : répertoire où sauvegarder les réponses brutes (flux et pages) pour les rejouer plus tard
+      - url_page : URL de base des pages enregistrées (rejeu : la même que url_flux), None = pages du site
+      - stats : schéma des statistiques retenues (None = toutes)
+      - periode, mi_temps : période de statistiques lue et lecture du score mi-temps (entrée du registre :
+        competitions.periode_stats(config), config["mi_temps"])
+      - debit_global, debit_par_hote : requêtes/s (None ou 0 = sans limite), comme l'Ordonnanceur
+      - morts : liste complétée par les flux abandonnés après toutes les tentatives (href, flux, erreur)
+    """
+    return asyncio.run(extraire_matchs(links_list, concurrence, url_flux, enregistrement, stats,
+                                       debit_global, debit_par_hote, morts, url_page, periode, mi_temps))
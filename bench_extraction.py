@@ -0,0 +1,62 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from frashcore import (lire_mi_temps_elements, lire_score_et_stats_elements,
+                       lire_mi_temps_js, lire_score_et_stats_js)
+from driver_pool import creer_navigateur
+from serveur_local import CATEGORIES, demarrer_serveur
+
+
+def page_synthetique():
+    """Page de match minimale reprenant les sélecteurs lus par process_match (score, mi-temps, ~15 statistiques)."""
+    lignes = "\n".join(
+        f'<div data-testid="wcl-statistics"><span data-testid="wcl-scores-simpleText-01">{i}</span>'
+        f'<span data-testid="wcl-scores-simpleText-01">{nom}</span>'
+        f'<span data-testid="wcl-scores-simpleText-01">{i + 1}</span></div>'
+        for i, nom in enumerate(CATEGORIES))
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>
+<div class="detailScore__wrapper"><span>1</span><span>-</span><span>4</span></div>
+<div data-testid="wcl-scores-overline-02">TERMINÉ</div>
+<div data-testid="wcl-scores-overline-02">1ÈRE MI-TEMPS</div>
+<div data-testid="wcl-scores-overline-02">0 - 1</div>
+{lignes}
+</body></html>"""
+
+def mesurer(driver, lecteurs, repetitions):
+    """Temps (ms) de chaque lecture complète de la page avec les lecteurs donnés."""
+    temps = []
+    for _ in range(repetitions):
+        result = {"href": "bench"}
+        debut = time.perf_counter()
+        for lire in lecteurs:
+            lire(driver, result)
+        temps.append((time.perf_counter() - debut) * 1000)
+    return np.array(temps), result
+
+if __name__ == "__main__":
+    # Usage : python bench_extraction.py [page_sauvegardee.html] [repetitions]
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    repertoire = tempfile.mkdtemp()
+    if len(sys.argv) > 1:
+        shutil.copy(sys.argv[1], os.path.join(repertoire, "match.html"))
+    else:
+        with open(os.path.join(repertoire, "match.html"), "w", encoding="utf-8") as f:
+            f.write(page_synthetique())
+
+    serveur, url = demarrer_serveur(repertoire)
+    driver = creer_navigateur("leger")
+    try:
+        driver.get(url + "match.html")
+        for nom, lecteurs in [("élément par élément", (lire_mi_temps_elements, lire_score_et_stats_elements)),
+                              ("script unique", (lire_mi_temps_js, lire_score_et_stats_js))]:
+            temps, result = mesurer(driver, lecteurs, repetitions)
+            print(f"{nom:>20} : moyenne {temps.mean():.1f} ms, p50 {np.percentile(temps, 50):.1f} ms, "
+                  f"p95 {np.percentile(temps, 95):.1f} ms, {len(result) - 1} valeurs extraites")
+    finally:
+        driver.quit()
+        serveur.shutdown()
+        shutil.rmtree(repertoire)
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import psutil
+
+from serveur_local import demarrer_site
+
+
+# Étape mesurée par metriques pour la latence de chaque tâche du crawler
+ETAPES_LATENCE = {"liens": "liens.saison", "matchs": "match"}
+SEUIL_REGRESSION = 0.10  # écart relatif signalé par `comparer`
+
+
+@contextmanager
+def pic_rss(periode=0.05):
+    """Pic de mémoire (Mo) du processus et de tous ses descendants (workers, chromedriver, Chrome), échantillonné."""
+    mesure = {"rss_max_mo": 0.0}
+    arret = threading.Event()
+    racine = psutil.Process()
+
+    def echantillonner():
+        while True:
+            total = 0
+            for p in [racine] + racine.children(recursive=True):
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            mesure["rss_max_mo"] = max(mesure["rss_max_mo"], total / 1024 ** 2)
+            if arret.wait(periode):
+                return
+
+    thread = threading.Thread(target=echantillonner, daemon=True)
+    thread.start()
+    try:
+        yield mesure
+    finally:
+        arret.set()
+        thread.join()
+
+def resultat(etape, config, n, duree, durees=None, p50=None, p95=None, rss_max_mo=None, **autres):
+    """Ligne du rapport : débit (unités/s), latences en ms (percentiles des `durees` si données)."""
+    if durees is not None and len(durees):
+        p50, p95 = np.percentile(durees, 50), np.percentile(durees, 95)
+    return {"etape": etape, "config": config, "n": n, "duree_s": round(duree, 4),
+            "par_seconde": round(n / duree, 2) if duree else None,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 3),
+            "p95_ms": None if p95 is None else round(p95 * 1000, 3),
+            "rss_max_mo": None if rss_max_mo is None else round(rss_max_mo, 1), **autres}
+
+def afficher(ligne):
+    echecs = f"  ({ligne['echecs']} échecs, hors débit)" if ligne.get("echecs") else ""
+    print(f"{ligne['etape']:<14}{ligne['config']:<22}{ligne['n']:>9}{ligne['par_seconde'] or 0:>12.1f}/s"
+          f"{ligne['p50_ms'] or 0:>11.1f}{ligne['p95_ms'] or 0:>11.1f}{ligne['rss_max_mo'] or 0:>10.0f}{echecs}")
+
+# --- Crawler contre le site local ---
+
+def navigateur_disponible():
+    """Vérifie qu'un navigateur démarre (les étapes liens/matchs en dépendent)."""
+    from driver_pool import GestionnaireDriver
+    gestionnaire = GestionnaireDriver()
+    try:
+        gestionnaire.demarrer()
+        return True
+    except Exception as e:
+        print(f"Navigateur indisponible, étapes liens et matchs ignorées : {e.__class__.__name__}")
+        return False
+    finally:
+        gestionnaire.fermer()
+
+def mesures_crawler(etape):
+    """
+    Mesures des workers pour l'étape (metriques) : p50/p95 (s) des tâches, erreurs,
+    octets reçus par page (moyenne des pages mesurées) et mémoire maximale de chaque worker (navigateur compris).
+    """
+    import metriques
+    resume = metriques.exporter()
+    etapes = resume["etapes"].get(ETAPES_LATENCE[etape], {})
+    pages = sum(resume["compteurs"].get("pages", {}).values())
+    octets = sum(resume["compteurs"].get("octets", {}).values())
+    mesurees = sum(resume["compteurs"].get("pages_mesurees", {}).values())
+    rss_workers = {pid: round(sum(w["jauges"][nom]["max"] for nom in ("rss_navigateur_mo", "rss_worker_mo")
+                                  if nom in w["jauges"]), 1)
+                   for pid, w in resume["workers"].items() if w["jauges"]}
+    return etapes.get("p50"), etapes.get("p95"), {"erreurs": etapes.get("erreurs", 0), "pages": pages,
+                                                  "octets_par_page": round(octets / mesurees) if mesurees else None,
+                                                  "rss_max_par_worker_mo": rss_workers}
+
+def bench_liens(frashcore, workers, nb_saisons, repertoire):
+    """links() sur `nb_saisons` saisons du site local ; renvoie les lignes du rapport et la base obtenue."""
+    import metriques
+    config = frashcore.COMPETITIONS["laliga2"]
+    config["saisons"] = range(config["saison_en_cours"] - nb_saisons + 1, config["saison_en_cours"] + 1)
+    lignes, base = [], None
+    for nb in workers:
+        base = os.path.join(repertoire, f"liens_{nb}.sqlite")
+        metriques.reinitialiser()
+        with pic_rss() as rss:
+            debut = time.perf_counter()
+            df = frashcore.links(["laliga2"], nb, base)
+            duree = time.perf_counter() - debut
+        p50, p95, autres = mesures_crawler("liens")
+        lignes.append(resultat("liens", f"{nb} workers", len(df), duree, p50=p50, p95=p95,
+                               rss_max_mo=rss["rss_max_mo"], saisons=nb_saisons, **autres))
+        afficher(lignes[-1])
+    return lignes, base
+
+def bench_matchs(frashcore, workers, base_liens, repertoire):
+    """
+    Extraction (process_match) de tous les matchs de base_liens, sur une copie de la base par essai.
+    Le débit ne compte que les matchs extraits (statut "ok") ; les échecs sont rapportés à part.
+    """
+    import metriques
+    from store import BaseResultats
+    lignes = []
+    for nb in workers:
+        base = os.path.join(repertoire, f"matchs_{nb}.sqlite")
+        shutil.copy(base_liens, base)
+        metriques.reinitialiser()
+        with pic_rss() as rss:
+            debut = time.perf_counter()
+            morts = frashcore.crawler(["laliga2"], nb, base, liens=False)
+            duree = time.perf_counter() - debut
+        p50, p95, autres = mesures_crawler("matchs")
+        store = BaseResultats(base)
+        statuts = store.compter()
+        store.fermer()
+        lignes.append(resultat("matchs", f"{nb} workers", statuts.get("ok", 0), duree, p50=p50, p95=p95,
+                               rss_max_mo=rss["rss_max_mo"], echecs=statuts.get("echec", 0), abandons=len(morts),
+                               **autres))
+        afficher(lignes[-1])
+    return lignes
+
+# --- Nettoyage, prétraitement et entraînement ---
+
+def bench_traitement(frashcore, source, tailles, repetitions):
+    """nettoyage puis pretraitement (écritures CSV et colonnaire comprises) sur des copies agrandies de `source`."""
+    from bench_pretraitement import donnees_brutes
+    lignes = []
+    for nb_lignes in tailles:
+        brut = donnees_brutes(source, nb_lignes)
+        durees = {"nettoyage": [], "pretraitement": []}
+        with pic_rss() as rss:
+            for _ in range(repetitions):
+                debut = time.perf_counter()
+                df = frashcore.nettoyage(brut.copy(), "bench_utilisable.csv")
+                durees["nettoyage"].append(time.perf_counter() - debut)
+                debut = time.perf_counter()
+                frashcore.pretraitement(df, "bench")
+                durees["pretraitement"].append(time.perf_counter() - debut)
+        for etape, mesures in durees.items():
+            lignes.append(resultat(etape, f"{nb_lignes} lignes", nb_lignes, float(np.median(mesures)),
+                                   durees=mesures, rss_max_mo=rss["rss_max_mo"], repetitions=repetitions))
+            afficher(lignes[-1])
+    return lignes
+
+def bench_ia(source, epoques):
+    """Boucle d'entraînement de ia.py : débit en échantillons/s et durée de chaque époque."""
+    import torch
+    from torch import nn
+    from dataset import FEATURES
+    from ia import (BATCH_SIZE, NB_THREADS, ChargeurTenseurs, FootballNet, charger_donnees,
+                    creer_optimiseur, entrainer_epoque)
+    torch.set_num_threads(NB_THREADS)
+    torch.manual_seed(0)
+    with pic_rss() as rss:
+        X_train, _, y_train, _, _ = charger_donnees(source)
+        train_loader = ChargeurTenseurs(X_train, y_train, batch_size=BATCH_SIZE, shuffle=True)
+        model = FootballNet(len(FEATURES), 32, 3)
+        criterion = nn.CrossEntropyLoss()
+        optimizer = creer_optimiseur(model)
+        durees = []
+        for _ in range(epoques):
+            debut = time.perf_counter()
+            entrainer_epoque(model, train_loader, criterion, optimizer)
+            durees.append(time.perf_counter() - debut)
+    ligne = resultat("ia", f"batch {BATCH_SIZE}", len(y_train) * epoques, sum(durees), durees=durees,
+                     rss_max_mo=rss["rss_max_mo"], epoques=epoques, threads=NB_THREADS)
+    afficher(ligne)
+    return [ligne]
+
+# --- Rapport ---
+
+def commit_courant():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparer(chemin_ancien, chemin_nouveau, seuil=SEUIL_REGRESSION):
+    """Compare deux rapports JSON ligne à ligne (même étape et configuration) ; renvoie le nombre de régressions."""
+    with open(chemin_ancien, encoding="utf-8") as f:
+        ancien = json.load(f)
+    with open(chemin_nouveau, encoding="utf-8") as f:
+        nouveau = json.load(f)
+    references = {(l["etape"], l["config"]): l for l in ancien["resultats"]}
+    print(f"{ancien['commit']} -> {nouveau['commit']}")
+    regressions = 0
+    for ligne in nouveau["resultats"]:
+        reference = references.get((ligne["etape"], ligne["config"]))
+        if reference is None or not reference["par_seconde"] or not ligne["par_seconde"]:
+            continue
+        rapport = ligne["par_seconde"] / reference["par_seconde"]
+        signal = ""
+        if rapport < 1 - seuil:
+            signal = "  <-- régression"
+            regressions += 1
+        print(f"{ligne['etape']:<14}{ligne['config']:<22}{reference['par_seconde']:>12.1f}/s ->"
+              f"{ligne['par_seconde']:>12.1f}/s  x{rapport:.2f}{signal}")
+    return regressions
+
+def arguments():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du scraper et du pipeline (site Flashscore local).")
+    parser.add_argument("--etapes", default="liens,matchs,traitement,ia", help="étapes mesurées, séparées par des virgules")
+    parser.add_argument("--workers", default="1,2,4", help="nombres de workers du crawler")
+    parser.add_argument("--saisons", type=int, default=2, help="saisons parcourues par le crawler")
+    parser.add_argument("--matchs-saison", type=int, default=60, help="matchs par page de résultats")
+    parser.add_argument("--taille-page", type=int, default=20, help="matchs ajoutés par 'Montrer plus de matchs'")
+    parser.add_argument("--latence", type=float, default=0.0, help="délai de chaque réponse du serveur (s)")
+    parser.add_argument("--delai-js", type=int, default=0, help="délai de rendu dans la page (ms)")
+    parser.add_argument("--navigateur", default="leger", choices=["leger", "complet"], help="profil du navigateur (driver_pool)")
+    parser.add_argument("--debit", action="store_true", help="garder les limites de débit de l'Ordonnanceur")
+    parser.add_argument("--lignes", default="100000,1000000", help="tailles des copies de merged_data.csv")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--epoques", type=int, default=5)
+    parser.add_argument("--donnees", default="merged_data.csv")
+    parser.add_argument("--sortie", default="bench_pipeline.json")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    # Usage : python bench_pipeline.py [options]  (voir --help)
+    #         python bench_pipeline.py comparer ancien.json nouveau.json
+    if sys.argv[1:2] == ["comparer"]:
+        sys.exit(1 if comparer(sys.argv[2], sys.argv[3]) else 0)
+    args = arguments()
+    etapes = args.etapes.split(",")
+    workers = [int(n) for n in args.workers.split(",")]
+    source = os.path.abspath(args.donnees)
+    sortie = os.path.abspath(args.sortie)
+
+    # Le site local doit être connu avant l'import du scraper (URLs du registre des compétitions)
+    serveur, url = demarrer_site(args.matchs_saison, args.taille_page, args.latence, args.delai_js)
+    os.environ["FLASHCORE_SITE"] = url.rstrip("/")
+    os.environ["FLASHCORE_NAVIGATEUR"] = args.navigateur
+    # Tous les fichiers produits (bases, CSV, métriques, attentes) restent dans un répertoire temporaire
+    repertoire = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.chdir(repertoire)
+    import frashcore
+    if not args.debit:
+        frashcore.DEBIT_GLOBAL = frashcore.DEBIT_PAR_HOTE = 0
+        frashcore.DEBIT_GLOBAL_HTTP = frashcore.DEBIT_PAR_HOTE_HTTP = 0
+
+    print(f"{'étape':<14}{'configuration':<22}{'n':>9}{'débit':>14}{'p50 ms':>11}{'p95 ms':>11}{'RSS Mo':>10}")
+    lignes = []
+    try:
+        if {"liens", "matchs"} & set(etapes) and navigateur_disponible():
+            nouvelles, base_liens = bench_liens(frashcore, workers if "liens" in etapes else workers[-1:],
+                                                args.saisons, repertoire)
+            lignes += nouvelles if "liens" in etapes else []
+            if "matchs" in etapes:
+                lignes += bench_matchs(frashcore, workers, base_liens, repertoire)
+        if "traitement" in etapes:
+            lignes += bench_traitement(frashcore, source, [int(n) for n in args.lignes.split(",")], args.repetitions)
+        if "ia" in etapes:
+            lignes += bench_ia(source, args.epoques)
+    finally:
+        serveur.shutdown()
+        os.chdir(os.path.dirname(sortie))
+        shutil.rmtree(repertoire, ignore_errors=True)
+
+    rapport = {"commit": commit_courant(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "machine": {"processeurs": os.cpu_count(), "python": platform.python_version(),
+                           "systeme": platform.platform()},
+               "parametres": vars(args), "resultats": lignes}
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=1)
+    print(f"Rapport écrit dans {sortie}")
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from dataset import FEATURES, charger_dataset
+from ia import FootballNet
+from prediction import CLASSES, Predicteur, sauvegarder_modele
+
+
+def artefact_de_test(repertoire, X):
+    """Modèle non entraîné mais de même forme (la latence ne dépend pas des poids)."""
+    chemin = os.path.join(repertoire, "modele.pt")
+    sauvegarder_modele(FootballNet(len(FEATURES), 32, 3), StandardScaler().fit(X), chemin, FEATURES, torchscript=True)
+    return chemin
+
+def percentiles(durees):
+    durees = np.array(durees) * 1000
+    return f"p50 {np.percentile(durees, 50):.3f} ms, p95 {np.percentile(durees, 95):.3f} ms"
+
+def latence(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+def debit(predicteur, X, taille_batch, duree_min=1.0):
+    """Matchs par seconde en découpant X en paquets de taille_batch."""
+    n, debut = 0, time.perf_counter()
+    while time.perf_counter() - debut < duree_min:
+        for i in range(0, len(X), taille_batch):
+            predicteur.predire(X[i:i + taille_batch])
+        n += len(X)
+    return n / (time.perf_counter() - debut)
+
+if __name__ == "__main__":
+    # Usage : python bench_prediction.py [modele.pt] [merged_data.csv]
+    torch.set_num_threads(1)
+    X, _ = charger_dataset(sys.argv[2] if len(sys.argv) > 2 else "merged_data.csv", FEATURES)
+    X = np.ascontiguousarray(np.resize(X, (100_000, X.shape[1])))
+    with tempfile.TemporaryDirectory() as repertoire:
+        chemin = sys.argv[1] if len(sys.argv) > 1 else artefact_de_test(repertoire, X)
+        chemin_ts = chemin + ".ts" if os.path.exists(chemin + ".ts") else None
+
+        duree = latence(lambda: Predicteur(chemin), 20)
+        print(f"chargement du modèle              : {percentiles(duree)}")
+
+        predicteur = Predicteur(chemin)
+        match = dict(zip(FEATURES, X[0].tolist()))
+        print(f"1 match (dict, predire_match)     : {percentiles(latence(lambda: predicteur.predire_match(match), 2000))}")
+        ligne = X[:1]
+        print(f"1 match (matrice, predire)        : {percentiles(latence(lambda: predicteur.predire(ligne), 2000))}")
+
+        for nom, p in [("eager", predicteur)] + ([("torchscript", Predicteur(chemin_ts))] if chemin_ts else []):
+            for taille_batch in [1, 16, 256, 4096]:
+                print(f"{nom:<11} batch {taille_batch:>5} : {debit(p, X[:20_000], taille_batch):>12,.0f} matchs/s")
+
+        df = pd.DataFrame(X[:20_000], columns=FEATURES)
+        debut = time.perf_counter()
+        probas = list(predicteur.predire_flux(df.to_dict("records")))
+        duree = time.perf_counter() - debut
+        print(f"flux de {len(probas)} matchs (dicts)      : {len(probas) / duree:,.0f} matchs/s")
+        assert np.allclose([[p[c] for c in CLASSES] for p in probas], predicteur.predire(X[:20_000]), atol=1e-6)
@@ -0,0 +1,86 @@
+import re
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from frashcore import convertir_types
+
+
+def pretraitement_reference(df):
+    """Ancienne version de pretraitement (apply ligne à ligne), sans écriture du CSV."""
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    for col in ['Possession_de_balle_home', 'Possession_de_balle_away']:
+        if col in df.columns:
+            df[col] = df[col].str.rstrip('%').astype(float) / 100
+
+    def extract_percentage(value):
+        match = re.search(r'(\d+)%', str(value))
+        if match:
+            return float(match.group(1)) / 100
+        return None
+
+    for col in ['Passes_home', 'Passes_away']:
+        if col in df.columns:
+            df[col] = df[col].apply(extract_percentage)
+    colonnes_numeriques = [
+        'score_equipe_home', 'score_equipe_away', 'Tirs_au_but_home', 'Tirs_au_but_away',
+        'Tirs_cadrés_home', 'Tirs_cadrés_away', 'Tirs_non_cadrés_home', 'Tirs_non_cadrés_away',
+        'Tirs_bloqués_home', 'Tirs_bloqués_away', 'Corners_home', 'Corners_away',
+        'Sauvetages_du_gardien_home', 'Sauvetages_du_gardien_away', 'Coup_francs_home', 'Coup_francs_away',
+        'Hors-jeu_home', 'Hors-jeu_away', 'Fautes_home', 'Fautes_away', 'Cartons_Jaunes_home',
+        'Cartons_Jaunes_away', 'Passes_home', 'Passes_away', 'Cartons_Rouges_home', 'Cartons_Rouges_away'
+    ]
+    for col in colonnes_numeriques:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    if 'score_equipe_home' in df.columns and 'score_equipe_away' in df.columns:
+        df['resultat'] = np.where(df['score_equipe_home'] > df['score_equipe_away'], -1,
+                           np.where(df['score_equipe_home'] == df['score_equipe_away'], 0, 1))
+    return df
+
+def donnees_brutes(chemin, nb_lignes):
+    """
+    Reconstitue le format lu dans extraction_parallel.csv ("52%", "81% (300/370)",
+    statistiques numériques) à partir de merged_data.csv, répliqué jusqu'à nb_lignes lignes.
+    """
+    df = pd.read_csv(chemin).drop(columns=["resultat"])
+    df = df.iloc[np.resize(np.arange(len(df)), nb_lignes)].reset_index(drop=True)
+    for col in ['Possession_de_balle_home', 'Possession_de_balle_away']:
+        df[col] = (df[col] * 100).round().astype(int).astype(str) + "%"
+    for col in ['Passes_home', 'Passes_away']:
+        df[col] = (df[col] * 100).round().astype(int).astype(str) + "% (300/370)"
+    return df
+
+def mesurer(fonction, df):
+    """Durée (meilleure de 3, sans traçage) puis pic mémoire (exécution séparée sous tracemalloc)."""
+    durees = []
+    for _ in range(3):
+        copie = df.copy()
+        debut = time.perf_counter()
+        resultat = fonction(copie)
+        durees.append(time.perf_counter() - debut)
+    copie = df.copy()
+    tracemalloc.start()
+    fonction(copie)
+    pic = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return resultat, min(durees), pic
+
+if __name__ == "__main__":
+    # Usage : python bench_pretraitement.py [nb_lignes] [merged_data.csv]
+    nb_lignes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = donnees_brutes(sys.argv[2] if len(sys.argv) > 2 else "merged_data.csv", nb_lignes)
+    print(f"{len(df)} lignes, {df.memory_usage(deep=True).sum() / 1024 ** 2:.0f} Mo en entrée")
+
+    ancien, duree_ancien, pic_ancien = mesurer(pretraitement_reference, df)
+    nouveau, duree_nouveau, pic_nouveau = mesurer(convertir_types, df)
+
+    colonnes = [c for c in ancien.columns if pd.api.types.is_numeric_dtype(ancien[c])]
+    identiques = all(np.allclose(ancien[c].to_numpy(float), nouveau[c].to_numpy(float), equal_nan=True, atol=1e-6)
+                     for c in colonnes)
+    print(f"apply ligne à ligne : {duree_ancien:.2f} s, pic {pic_ancien:.0f} Mo, {ancien.memory_usage(deep=True).sum() / 1024 ** 2:.0f} Mo en sortie")
+    print(f"vectorisé           : {duree_nouveau:.2f} s, pic {pic_nouveau:.0f} Mo, {nouveau.memory_usage(deep=True).sum() / 1024 ** 2:.0f} Mo en sortie")
+    print(f"accélération x{duree_ancien / duree_nouveau:.1f}, résultats identiques : {identiques}")
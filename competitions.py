@@ -0,0 +1,79 @@
+from match_ids import SITE
+from schema_stats import SCHEMA_FOOTBALL, octets
+
+
+# --- Registre des compétitions parcourues ---
+# Chaque entrée décrit où trouver les matchs d'une compétition et comment les lire :
+#   url_resultats    : page de résultats ; {suffixe} vaut "" pour la saison en cours, "-<saison>" sinon
+#   saisons          : années de début des saisons parcourues ; saison_en_cours : celle servie sans suffixe
+#   format_saison    : nom d'une saison à partir de son année ("{annee}-{suivante}" ou "{annee}")
+#   selecteur_matchs : lignes de match de la page de résultats (sélecteur CSS)
+#   onglet_stats     : ancre de l'onglet statistiques sur la page d'un match ; son numéro est la période lue
+#                      (0 = tout le match, 1 = 1ère mi-temps ou 1er set...), aussi dans le flux df_st_1 en mode http
+#   mi_temps         : lire le score à la mi-temps (page de résumé, flux df_sui_1 en mode http)
+#   stats            : schéma des statistiques (schema_stats.SchemaStats) : catégories retenues, colonnes fixes
+#                      et enregistrements typés ; None = toutes les catégories, colonnes nommées d'après la page
+#   fichiers         : CSV des liens, de l'extraction brute (ou enregistrements .npy si stats est défini)
+#                      et des matchs nettoyés ; le prétraitement écrit data_<nom>.csv
+COMPETITIONS = {
+    "laliga2": {
+        "url_resultats": SITE + "/football/espagne/laliga2{suffixe}/resultats/",
+        "saisons": range(2012, 2025),
+        "saison_en_cours": 2024,
+        "format_saison": "{annee}-{suivante}",
+        "selecteur_matchs": "div.event__match",
+        "onglet_stats": "/statistiques-du-match/1",
+        "mi_temps": True,
+        "stats": SCHEMA_FOOTBALL,
+        "fichiers": {"liens": "flashscore_ligue2_links.csv",
+                     "extraction": "extraction_parallel.csv",
+                     "enregistrements": "extraction_parallel.npy",
+                     "utilisable": "matchs_utilisable_l1.csv"},
+    },
+    "open_australie": {
+        "url_resultats": SITE + "/tennis/atp-simples/open-d-australie{suffixe}/resultats/",
+        "saisons": range(2024, 2025),
+        "saison_en_cours": 2024,
+        "format_saison": "{annee}",
+        "selecteur_matchs": "div.sportName.tennis div.event__match",
+        # Statistiques de tout le match : l'onglet /1 (repris du football) ne donnait que le 1er set.
+        # Pas de mi-temps en tennis : la lecture du football prenait le score d'un set.
+        "onglet_stats": "/statistiques-du-match/0",
+        "mi_temps": False,
+        "stats": None,
+        "fichiers": {"liens": "open_australie_links.csv",
+                     "extraction": "extraction_open_australie.csv",
+                     "utilisable": "matchs_utilisable_open_australie.csv"},
+    },
+}
+
+
+def nom_saison(config, annee):
+    """Nom d'une saison (ex: "2012-2013" en football, "2024" en tennis)."""
+    return config["format_saison"].format(annee=annee, suivante=annee + 1)
+
+def url_saison(config, annee):
+    """Nom de la saison et URL de sa page de résultats."""
+    saison = nom_saison(config, annee)
+    suffixe = "" if annee == config["saison_en_cours"] else f"-{saison}"
+    return saison, config["url_resultats"].format(suffixe=suffixe)
+
+def saison_en_cours(config):
+    return nom_saison(config, config["saison_en_cours"])
+
+def periode_stats(config):
+    """Période de statistiques lue (numéro de l'onglet statistiques, ex: "/statistiques-du-match/1" -> 1)."""
+    return int(config["onglet_stats"].rstrip("/").rsplit("/", 1)[1])
+
+def verifier_registre(competitions=COMPETITIONS):
+    """
+    Noms de compétition et de saison assez courts pour les champs clés des enregistrements
+    (schema_stats.CHAMPS_CLES) : ValueError dès l'import plutôt qu'à l'export d'une extraction.
+    """
+    for nom, config in competitions.items():
+        octets("competition", nom)
+        for annee in config["saisons"]:
+            octets("saison", nom_saison(config, annee))
+
+
+verifier_registre()
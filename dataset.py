@@ -0,0 +1,175 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+TAILLE_CHUNK = 50_000  # lignes lues/écrites à la fois en mode flux
+
+# Colonnes utilisées comme entrées du modèle (ia.py)
+FEATURES = [
+    'Possession_de_balle_home', 'Possession_de_balle_away',
+    'Tirs_au_but_home', 'Tirs_au_but_away', 'Tirs_cadrés_home',
+    'Tirs_cadrés_away', 'Tirs_non_cadrés_home', 'Tirs_non_cadrés_away',
+    'Tirs_bloqués_home', 'Tirs_bloqués_away', 'Corners_home',
+    'Corners_away', 'Sauvetages_du_gardien_home',
+    'Sauvetages_du_gardien_away', 'Coup_francs_home', 'Coup_francs_away',
+    'Hors-jeu_home', 'Hors-jeu_away', 'Fautes_home', 'Fautes_away',
+    'Cartons_Jaunes_home', 'Cartons_Jaunes_away', 'Passes_home',
+    'Passes_away', 'Cartons_Rouges_home', 'Cartons_Rouges_away',
+    'score_mi_temps_home', 'score_mi_temps_away'
+]
+
+# Contexte d'un match (équipes, date) : absent des extractions antérieures à sa capture,
+# jamais utilisé comme feature ni pour écarter une ligne incomplète
+COLONNES_CONTEXTE = ["equipe_home", "equipe_away", "date_match"]
+
+
+def repertoire_dataset(chemin_csv):
+    """Répertoire du format colonnaire associé à un CSV (ex: merged_data.csv -> merged_data.dataset)."""
+    return os.path.splitext(chemin_csv)[0] + ".dataset"
+
+def matrice_features(df, features=FEATURES):
+    """Matrice float32 des features (valeur manquante si la colonne est absente ou non numérique)."""
+    return np.column_stack([pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float32) if col in df.columns
+                            else np.full(len(df), np.nan, dtype=np.float32) for col in features])
+
+def ecrire_dataset(df, repertoire, features=FEATURES):
+    """
+    Écrit un jeu de données en format colonnaire :
+      - matchs.parquet : toutes les colonnes, saison et href encodés en dictionnaire
+      - features.npy   : matrice float32 (lignes x features), lisible en mémoire partagée (mmap)
+      - labels.npy     : colonne resultat en int8 (absent, et supprimé d'une écriture précédente, sans cette colonne)
+      - meta.json      : liste des features et nombre de lignes
+    """
+    os.makedirs(repertoire, exist_ok=True)
+    table = df.copy()
+    for col in ["saison", "href"]:
+        if col in table.columns:
+            table[col] = table[col].astype(str).astype("category")
+    table.to_parquet(os.path.join(repertoire, "matchs.parquet"), index=False)
+    np.save(os.path.join(repertoire, "features.npy"), matrice_features(df, features))
+    labels = os.path.join(repertoire, "labels.npy")
+    if "resultat" in df.columns:
+        np.save(labels, df["resultat"].to_numpy(dtype=np.int8))
+    elif os.path.exists(labels):
+        os.remove(labels)
+    with open(os.path.join(repertoire, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"features": list(features), "lignes": len(df)}, f, ensure_ascii=False)
+
+class EcrivainDataset:
+    """
+    Écriture du même format que ecrire_dataset, morceau par morceau (mémoire constante).
+    Les colonnes numériques sont stockées en float32 (resultat en int8) pour garder
+    un schéma Parquet identique d'un morceau à l'autre.
+    """
+
+    def __init__(self, repertoire, features=FEATURES):
+        os.makedirs(repertoire, exist_ok=True)
+        self.repertoire = repertoire
+        self.features = list(features)
+        self.parquet = None
+        self.schema = None
+        self.fichier_features = open(os.path.join(repertoire, "features.tmp"), "wb")
+        self.fichier_labels = open(os.path.join(repertoire, "labels.tmp"), "wb")
+        self.lignes = 0
+
+    def ajouter(self, df):
+        table = df.copy()
+        for col in table.columns:
+            if col in ("saison", "href"):
+                table[col] = table[col].astype(str)
+            elif col in COLONNES_CONTEXTE:
+                # Texte avec valeurs manquantes, y compris dans un morceau où la colonne est entièrement vide
+                table[col] = table[col].astype("string")
+            elif col == "resultat":
+                table[col] = table[col].astype(np.int8)
+            elif pd.api.types.is_numeric_dtype(table[col]):
+                table[col] = table[col].astype(np.float32)
+        table = pa.Table.from_pandas(table, preserve_index=False)
+        if self.parquet is None:
+            self.schema = table.schema
+            self.parquet = pq.ParquetWriter(os.path.join(self.repertoire, "matchs.parquet"), self.schema)
+        self.parquet.write_table(table.cast(self.schema))
+        self.fichier_features.write(matrice_features(df, self.features).tobytes())
+        if "resultat" in df.columns:
+            self.fichier_labels.write(df["resultat"].to_numpy(dtype=np.int8).tobytes())
+        self.lignes += len(df)
+
+    def convertir(self, nom, dtype, colonnes=None):
+        """
+        Recopie par blocs le fichier brut temporaire dans un .npy (en-tête avec la forme finale) ;
+        un fichier brut vide pour des lignes non vides (colonne absente) supprime le .npy d'une écriture précédente.
+        """
+        brut = os.path.join(self.repertoire, nom + ".tmp")
+        chemin = os.path.join(self.repertoire, nom + ".npy")
+        forme = (self.lignes, colonnes) if colonnes else (self.lignes,)
+        if os.path.getsize(brut) or not self.lignes:
+            destination = np.lib.format.open_memmap(chemin, mode="w+", dtype=dtype, shape=forme)
+            if self.lignes:
+                source = np.memmap(brut, dtype=dtype, mode="r", shape=forme)
+                for debut in range(0, self.lignes, TAILLE_CHUNK):
+                    destination[debut:debut + TAILLE_CHUNK] = source[debut:debut + TAILLE_CHUNK]
+                del source
+            destination.flush()
+            del destination
+        elif os.path.exists(chemin):
+            os.remove(chemin)
+        os.remove(brut)
+
+    def fermer(self):
+        if self.parquet is not None:
+            self.parquet.close()
+        self.fichier_features.close()
+        self.fichier_labels.close()
+        self.convertir("features", np.float32, len(self.features))
+        self.convertir("labels", np.int8)
+        with open(os.path.join(self.repertoire, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"features": self.features, "lignes": self.lignes}, f, ensure_ascii=False)
+
+def ecrire_dataset_flux(chemin_csv, repertoire, features=FEATURES, taille_chunk=TAILLE_CHUNK):
+    """Construit le format colonnaire à partir d'un CSV lu par morceaux."""
+    ecrivain = EcrivainDataset(repertoire, features)
+    for morceau in pd.read_csv(chemin_csv, chunksize=taille_chunk):
+        ecrivain.ajouter(morceau)
+    ecrivain.fermer()
+
+def charger_features(repertoire, mmap=True):
+    """
+    Matrice des features et labels, projetés en mémoire sans copie (mmap) ; renvoie (X, y, features),
+    y valant None pour un jeu de données sans colonne resultat.
+    """
+    mode = "r" if mmap else None
+    X = np.load(os.path.join(repertoire, "features.npy"), mmap_mode=mode)
+    labels = os.path.join(repertoire, "labels.npy")
+    y = np.load(labels, mmap_mode=mode) if os.path.exists(labels) else None
+    if y is not None and len(y) != len(X):
+        raise ValueError(f"{repertoire} : {len(X)} lignes de features pour {len(y)} labels")
+    with open(os.path.join(repertoire, "meta.json"), encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    return X, y, features
+
+def charger_colonnes(repertoire, colonnes=None):
+    """Lit seulement les colonnes demandées du fichier Parquet."""
+    return pd.read_parquet(os.path.join(repertoire, "matchs.parquet"), columns=colonnes)
+
+def charger_dataset(chemin_csv, features=FEATURES):
+    """
+    Charge (X, y) pour l'entraînement depuis le format colonnaire associé au CSV,
+    en le (re)construisant une seule fois si le CSV est plus récent ou si les features ont changé.
+    """
+    repertoire = repertoire_dataset(chemin_csv)
+    meta = os.path.join(repertoire, "meta.json")
+    a_jour = os.path.exists(meta) and os.path.getmtime(meta) >= os.path.getmtime(chemin_csv)
+    if a_jour:
+        with open(meta, encoding="utf-8") as f:
+            a_jour = json.load(f)["features"] == list(features)
+    if not a_jour:
+        ecrire_dataset_flux(chemin_csv, repertoire, features)
+    X, y, _ = charger_features(repertoire)
+    if y is None:
+        raise ValueError(f"{chemin_csv} n'a pas de colonne resultat : pas de labels pour l'entraînement")
+    return X, y
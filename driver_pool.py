@@ -0,0 +1,220 @@
+import atexit
+import os
+from multiprocessing import util
+from urllib.parse import urldefrag
+
+import psutil
+from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+from metriques import mesurer, compter, jauger
+
+
+# --- Paramètres de recyclage du navigateur ---
+PAGES_MAX = 500          # pages chargées avant de relancer le navigateur
+RSS_MAX_MO = 1500        # mémoire (chromedriver + Chrome) au-delà de laquelle on relance
+FREQUENCE_CONTROLE = 25  # contrôle de la mémoire (et mesure des octets de la page courante) toutes les N pages
+TENTATIVES = 3           # essais d'une tâche si la session meurt en cours de route
+
+# --- Profil du navigateur ---
+# "leger" : headless, chargement "eager" (rend la main dès le DOM prêt, sans attendre images et sous-ressources),
+# images, médias, polices et traqueurs bloqués ; "complet" : webdriver.Chrome() par défaut (fenêtre visible)
+PROFIL_NAVIGATEUR = os.environ.get("FLASHCORE_NAVIGATEUR", "leger")
+ARGUMENTS_LEGERS = ["--headless=new", "--window-size=1280,900", "--disable-gpu", "--disable-extensions",
+                    "--disable-dev-shm-usage", "--disable-background-networking", "--mute-audio",
+                    "--no-first-run", "--disk-cache-size=52428800"]
+# Requêtes bloquées (Network.setBlockedURLs) : seuls quelques nœuds du DOM sont lus par page
+URLS_BLOQUEES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+                 "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.mp3",
+                 "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+                 "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*", "*criteo.*", "*taboola.com*",
+                 "*outbrain.com*", "*facebook.net*", "*hotjar.com*", "*scorecardresearch.com*", "*quantserve.com*"]
+# Octets reçus par le document courant et ses ressources (transferSize vaut 0 pour les réponses en cache
+# et pour les ressources d'autres domaines sans Timing-Allow-Origin : c'est un minorant). Lu sur une page
+# toutes les FREQUENCE_CONTROLE (échantillon, compteur "pages_mesurees") pour ne pas ajouter un aller-retour
+# chromedriver à chaque page
+SCRIPT_OCTETS = """
+return performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"))
+                  .reduce((total, e) => total + (e.transferSize || 0), 0);
+"""
+
+# Messages de Chrome indiquant une session inutilisable
+MESSAGES_SESSION_MORTE = ("chrome not reachable", "disconnected", "tab crashed",
+                          "session deleted", "no such session", "target window already closed")
+
+
+def session_morte(erreur):
+    """Indique si l'exception signifie que le navigateur est mort (et non une simple erreur de page)."""
+    if isinstance(erreur, (InvalidSessionIdException, NoSuchWindowException, MaxRetryError,
+                           ProtocolError, ConnectionError)):
+        return True
+    if isinstance(erreur, WebDriverException):
+        message = (erreur.msg or "").lower()
+        return any(m in message for m in MESSAGES_SESSION_MORTE)
+    return False
+
+def creer_navigateur(profil=None):
+    """Démarre Chrome avec le profil demandé (PROFIL_NAVIGATEUR par défaut) ; fabrique de GestionnaireDriver."""
+    profil = profil or PROFIL_NAVIGATEUR
+    if profil == "complet":
+        return webdriver.Chrome()
+    options = webdriver.ChromeOptions()
+    for argument in ARGUMENTS_LEGERS:
+        options.add_argument(argument)
+    options.page_load_strategy = "eager"
+    driver = webdriver.Chrome(options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEES})
+    return driver
+
+class GestionnaireDriver:
+    """
+    Un seul navigateur par processus, démarré à la première utilisation et réutilisé
+    d'une tâche à l'autre. Il est relancé après `pages_max` pages, quand sa mémoire
+    dépasse `rss_max_mo`, ou quand la session est morte.
+    """
+
+    def __init__(self, fabrique=creer_navigateur, pages_max=PAGES_MAX, rss_max_mo=RSS_MAX_MO):
+        self.fabrique = fabrique
+        self.pages_max = pages_max
+        self.rss_max_mo = rss_max_mo
+        self.driver = None
+        self.pages = 0
+        self.dernier_controle = 0
+        self.redemarrages = 0
+
+    def demarrer(self):
+        self.driver = self.fabrique()
+        self.pages = 0
+        self.dernier_controle = 0
+
+    def fermer(self):
+        """Ferme le navigateur ; si quit() échoue, tue l'arbre de processus restant."""
+        if self.driver is None:
+            return
+        processus = self.processus()
+        try:
+            self.driver.quit()
+        except Exception:
+            for p in processus:
+                try:
+                    p.kill()
+                except psutil.Error:
+                    pass
+        self.driver = None
+
+    def redemarrer(self, raison):
+        print(f"Redémarrage du navigateur ({raison}) après {self.pages} pages")
+        compter("redemarrages", raison.split(" :")[0])
+        self.fermer()
+        self.redemarrages += 1
+        self.demarrer()
+
+    def processus(self):
+        """Processus chromedriver et tous les processus Chrome qu'il a lancés."""
+        try:
+            racine = psutil.Process(self.driver.service.process.pid)
+            return [racine] + racine.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return []
+
+    def rss_mo(self):
+        total = 0
+        for p in self.processus():
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def vivant(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def obtenir(self):
+        """Renvoie un navigateur prêt à l'emploi, en le recyclant si nécessaire."""
+        if self.driver is None:
+            self.demarrer()
+        elif self.pages >= self.pages_max:
+            self.redemarrer("nombre de pages")
+        elif self.pages - self.dernier_controle >= FREQUENCE_CONTROLE:
+            self.dernier_controle = self.pages
+            self.mesurer_octets()
+            rss = self.rss_mo()
+            jauger("rss_navigateur_mo", rss)
+            jauger("rss_worker_mo", psutil.Process().memory_info().rss / (1024 * 1024))
+            if rss > self.rss_max_mo:
+                self.redemarrer("mémoire")
+        return self.driver
+
+    def mesurer_octets(self):
+        """
+        Compte les octets reçus pour la page courante (voir SCRIPT_OCTETS), appelé entre deux tâches :
+        la page de la tâche précédente est complète, onglets compris. Page ignorée si illisible.
+        """
+        try:
+            octets = self.driver.execute_script(SCRIPT_OCTETS)
+        except Exception:
+            return
+        if octets:
+            compter("octets", n=octets)
+            compter("pages_mesurees")
+
+    def get(self, url):
+        self.pages += 1
+        compter("pages")
+        with mesurer("navigateur.get"):
+            self.driver.get(url)
+
+    def naviguer(self, url):
+        """
+        Va sur `url`. Si seule l'ancre (#/...) diffère de la page courante, on change
+        d'onglet dans la page (route par ancre) au lieu de la recharger entièrement.
+        """
+        base, ancre = urldefrag(url)
+        if ancre and self.pages and urldefrag(self.driver.current_url)[0] == base:
+            with mesurer("navigateur.onglet"):
+                self.driver.execute_script("window.location.hash = arguments[0];", ancre)
+        else:
+            self.get(url)
+
+    def executer(self, fonction, *args, tentatives=TENTATIVES):
+        """
+        Exécute fonction(gestionnaire, *args), la fonction naviguant via gestionnaire.get().
+        Si la session meurt pendant l'exécution, le navigateur est remplacé et la
+        tâche relancée au lieu d'être perdue.
+        """
+        for essai in range(1, tentatives + 1):
+            self.obtenir()
+            try:
+                return fonction(self, *args)
+            except Exception as e:
+                if essai == tentatives or (not session_morte(e) and self.vivant()):
+                    raise
+                compter("relances", getattr(fonction, "__name__", ""))
+                self.redemarrer(f"session morte : {e.__class__.__name__}")
+
+
+# --- Gestionnaire propre à chaque processus ---
+gestionnaire = None
+
+def init_gestionnaire(**options):
+    """
+    Initialiseur de processus (Pool(initializer=...)) : crée le gestionnaire du processus
+    et garantit la fermeture du navigateur à la sortie, y compris dans les workers.
+    """
+    global gestionnaire
+    gestionnaire = GestionnaireDriver(**options)
+    util.Finalize(None, gestionnaire.fermer, exitpriority=10)
+    atexit.register(gestionnaire.fermer)
+    return gestionnaire
+
+def obtenir_gestionnaire():
+    """Gestionnaire du processus courant (créé à la volée hors d'un Pool)."""
+    if gestionnaire is None:
+        init_gestionnaire()
+    return gestionnaire
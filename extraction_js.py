@@ -0,0 +1,89 @@
+import os
+import re
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from match_ids import id_equipe
+
+
+# --- Extraction de toute la page en un seul appel au navigateur ---
+# Le script renvoie en JSON les textes lus par process_match : spans du score,
+# cellules de chaque ligne de statistiques, textes des éléments du score mi-temps,
+# liens des deux équipes (ou joueurs) et date du match affichés dans l'en-tête.
+SCRIPT_EXTRACTION = """
+const texte = el => (el.innerText || el.textContent || "").trim();
+const wrapper = document.querySelector("div.detailScore__wrapper");
+const debut = document.querySelector(".duelParticipant__startTime");
+return {
+    score: wrapper ? Array.from(wrapper.querySelectorAll("span"), texte) : null,
+    stats: Array.from(document.querySelectorAll('div[data-testid="wcl-statistics"]'), row =>
+        Array.from(row.querySelectorAll('[data-testid="wcl-scores-simpleText-01"]'), texte)),
+    mi_temps: Array.from(document.querySelectorAll('[data-testid^="wcl-scores-overline-02"]'), texte),
+    equipes: [".duelParticipant__home", ".duelParticipant__away"].map(cote =>
+        Array.from(document.querySelectorAll(cote + " a"), a => a.href).find(h => /\/(equipe|joueur)\//.test(h)) || null),
+    date: debut ? texte(debut) : null
+};
+"""
+
+DATE_PAGE = re.compile(r"(\d{2})\.(\d{2})\.(\d{4})\s+(\d{2}):(\d{2})")
+# Les dates des matchs sont enregistrées en UTC, quel que soit le mode d'extraction
+FORMAT_DATE = "%Y-%m-%d %H:%M"
+# Fuseau horaire des dates affichées par le navigateur (nom IANA), None = fuseau de la machine
+FUSEAU_PAGE = os.environ.get("FLASHCORE_FUSEAU")
+
+
+def lire_page(driver):
+    """Exécute SCRIPT_EXTRACTION et renvoie les textes de la page (un seul aller-retour avec chromedriver)."""
+    return driver.execute_script(SCRIPT_EXTRACTION)
+
+def remplir_score(result, donnees):
+    spans = donnees.get("score") or []
+    if len(spans) >= 3:
+        result["score_equipe_home"] = spans[0]
+        result["score_equipe_away"] = spans[2]
+    return donnees.get("score") is not None
+
+def remplir_stats(result, donnees, stats=None):
+    """
+    Une colonne _home/_away par catégorie. Avec un schéma `stats` (schema_stats.SchemaStats),
+    seules les catégories déclarées sont gardées, dans leur colonne fixe.
+    """
+    for tab in donnees.get("stats") or []:
+        if len(tab) >= 3:
+            category_name = tab[1]
+            colonne = stats.colonne(category_name) if stats is not None else category_name.replace(" ", "_")
+            if colonne is None:
+                continue
+            result[colonne + "_home"] = tab[0]
+            result[colonne + "_away"] = tab[2]
+
+def remplir_mi_temps(result, donnees):
+    ht_elements = donnees.get("mi_temps") or []
+    if len(ht_elements) > 1:
+        ht_text = ht_elements[1]
+        if "MI" in ht_text and len(ht_elements) > 2:
+            ht_text = ht_elements[2]
+        ht_text_clean = ht_text.replace(".", "").strip()
+        if "-" in ht_text_clean:
+            home, away = ht_text_clean.split("-")
+            result["score_mi_temps_home"] = home.strip()
+            result["score_mi_temps_away"] = away.strip()
+
+def date_match(texte):
+    """
+    Date affichée dans l'en-tête ("15.08.2024 21:00", heure locale du navigateur) convertie en UTC
+    au format "2024-08-15 19:00", comme celle du flux dc_1 en mode http ; None si illisible.
+    """
+    trouve = DATE_PAGE.search(texte or "")
+    if not trouve:
+        return None
+    jour, mois, annee, heure, minute = (int(valeur) for valeur in trouve.groups())
+    locale = datetime(annee, mois, jour, heure, minute, tzinfo=ZoneInfo(FUSEAU_PAGE) if FUSEAU_PAGE else None)
+    return locale.astimezone(timezone.utc).strftime(FORMAT_DATE)
+
+def remplir_equipes(result, donnees):
+    """Identifiants des deux équipes (equipe_home, equipe_away) et date du match (date_match)."""
+    equipes = donnees.get("equipes") or [None, None]
+    result["equipe_home"] = id_equipe(equipes[0])
+    result["equipe_away"] = id_equipe(equipes[1])
+    result["date_match"] = date_match(donnees.get("date"))
@@ -0,0 +1,299 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+from schema_stats import lire_enregistrements
+
+
+# --- Paramètres ---
+N_MATCHS = 5      # taille de la fenêtre de forme (derniers matchs de chaque équipe)
+MIN_MATCHS = 3    # historique minimal des deux équipes pour qu'un match entre dans la matrice
+RATIO_NEUTRE = 0.5
+
+# Statistiques d'un match du point de vue d'une équipe, additionnées sur la fenêtre
+STATS = ["points", "buts_pour", "buts_contre", "tirs_pour", "tirs_contre", "cadres_pour", "cadres_contre"]
+# Colonnes lues dans les matchs prétraités (data_<nom>.csv)
+COLONNES_FORME = ["date_match", "equipe_home", "equipe_away", "score_equipe_home", "score_equipe_away",
+                  "Tirs_au_but_home", "Tirs_au_but_away", "Tirs_cadrés_home", "Tirs_cadrés_away"]
+COLONNES_CLES = ["competition", "saison", "href"]
+COLONNES_CONTEXTE = ["date_match", "equipe_home", "equipe_away"]
+
+# Agrégats d'une fenêtre : moyennes par match et parts des tirs (somme de l'équipe / somme des deux équipes)
+AGREGATS = ["points", "buts_pour", "buts_contre", "ratio_tirs", "ratio_cadres"]
+AGREGATS_LIEU = AGREGATS[:3]
+# Features d'avant-match, pour chaque équipe : profondeur de l'historique, forme sur ses N derniers matchs,
+# jours de repos, et forme sur ses N derniers matchs à domicile (équipe home) / à l'extérieur (équipe away)
+FEATURES_FORME = [f"{cote}_{nom}" for cote, lieu in (("home", "domicile"), ("away", "exterieur"))
+                  for nom in ["matchs", *AGREGATS, "repos", *[f"{agregat}_{lieu}" for agregat in AGREGATS_LIEU]]]
+
+
+def agregats(sommes, compte):
+    """Agrégats (AGREGATS, dernier axe) à partir des sommes de STATS sur une fenêtre de `compte` matchs."""
+    sommes = np.asarray(sommes, dtype=np.float64)
+    compte = np.asarray(compte, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.stack([sommes[..., 0] / compte, sommes[..., 1] / compte, sommes[..., 2] / compte,
+                         sommes[..., 3] / (sommes[..., 3] + sommes[..., 4]),
+                         sommes[..., 5] / (sommes[..., 5] + sommes[..., 6])], axis=-1)
+
+def matchs_valides(df):
+    """Matchs dont les équipes, la date et le score sont connus, dans l'ordre chronologique (stable)."""
+    df = df.reindex(columns=list(dict.fromkeys([*df.columns, *COLONNES_FORME])))
+    valide = df[["date_match", "equipe_home", "equipe_away", "score_equipe_home", "score_equipe_away"]].notna().all(axis=1)
+    df = df[valide].copy()
+    df["date_match"] = pd.to_datetime(df["date_match"])
+    # Extraction brute : scores lus sur la page ("2"), illisibles -> match écarté
+    for col in ("score_equipe_home", "score_equipe_away"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["score_equipe_home", "score_equipe_away"])
+    return df.sort_values("date_match", kind="stable")
+
+def minutes(dates):
+    """Dates en minutes entières (même arithmétique dans le moteur incrémental et le calcul vectorisé)."""
+    return pd.to_datetime(dates).to_numpy(dtype="datetime64[m]").astype(np.int64)
+
+def statistiques(df):
+    """(stats home, stats away) : matrices (matchs x STATS) du point de vue de chaque équipe."""
+    buts_home = df["score_equipe_home"].to_numpy(dtype=np.float64)
+    buts_away = df["score_equipe_away"].to_numpy(dtype=np.float64)
+    # Statistique de tirs manquante (tennis, anciennes pages) : comptée 0
+    tirs_home, tirs_away, cadres_home, cadres_away = (
+        pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        for col in ["Tirs_au_but_home", "Tirs_au_but_away", "Tirs_cadrés_home", "Tirs_cadrés_away"])
+    points_home = np.where(buts_home > buts_away, 3.0, np.where(buts_home == buts_away, 1.0, 0.0))
+    points_away = np.where(buts_away > buts_home, 3.0, np.where(buts_home == buts_away, 1.0, 0.0))
+    return (np.column_stack([points_home, buts_home, buts_away, tirs_home, tirs_away, cadres_home, cadres_away]),
+            np.column_stack([points_away, buts_away, buts_home, tirs_away, tirs_home, cadres_away, cadres_home]))
+
+# --- Moteur incrémental : O(1) par match ---
+
+class Fenetre:
+    """Sommes de STATS sur les n derniers matchs d'une équipe (tampon circulaire : un ajout, un retrait)."""
+
+    def __init__(self, n):
+        self.valeurs = np.zeros((n, len(STATS)))
+        self.sommes = np.zeros(len(STATS))
+        self.position = 0
+        self.compte = 0
+
+    def ajouter(self, ligne):
+        if self.compte == len(self.valeurs):
+            self.sommes -= self.valeurs[self.position]
+        else:
+            self.compte += 1
+        self.valeurs[self.position] = ligne
+        self.sommes += ligne
+        self.position = (self.position + 1) % len(self.valeurs)
+
+class EtatEquipe:
+    def __init__(self, n):
+        self.tous = Fenetre(n)
+        self.domicile = Fenetre(n)
+        self.exterieur = Fenetre(n)
+        self.dernier = None  # date du dernier match (minutes)
+
+class MoteurForme:
+    """
+    Forme de chaque équipe, mise à jour match par match dans l'ordre chronologique :
+    caracteristiques() donne les features d'avant-match d'une affiche, ajouter() intègre
+    un match joué. Les deux sont en O(1) (indépendants de la longueur de l'historique).
+    """
+
+    def __init__(self, n=N_MATCHS):
+        self.n = n
+        self.equipes = {}
+
+    def etat(self, equipe):
+        if equipe not in self.equipes:
+            self.equipes[equipe] = EtatEquipe(self.n)
+        return self.equipes[equipe]
+
+    def caracteristiques(self, home, away, date):
+        """Vecteur FEATURES_FORME (float32, NaN si l'historique ne permet pas le calcul) d'un match à venir."""
+        date = minutes([date])[0] if not isinstance(date, (int, np.integer)) else date
+        vecteur = []
+        for equipe, lieu in ((home, "domicile"), (away, "exterieur")):
+            etat = self.equipes.get(equipe) or EtatEquipe(self.n)
+            fenetre_lieu = getattr(etat, lieu)
+            repos = (date - etat.dernier) / 1440 if etat.dernier is not None else np.nan
+            vecteur += [etat.tous.compte, *agregats(etat.tous.sommes, etat.tous.compte), repos,
+                        *agregats(fenetre_lieu.sommes, fenetre_lieu.compte)[:len(AGREGATS_LIEU)]]
+        return np.array(vecteur, dtype=np.float32)
+
+    def ajouter(self, home, away, date, stats_home, stats_away):
+        """Intègre un match joué (stats_* : STATS du point de vue de chaque équipe)."""
+        date = minutes([date])[0] if not isinstance(date, (int, np.integer)) else date
+        for equipe, lieu, ligne in ((home, "domicile", stats_home), (away, "exterieur", stats_away)):
+            etat = self.etat(equipe)
+            etat.tous.ajouter(ligne)
+            getattr(etat, lieu).ajouter(ligne)
+            etat.dernier = date
+
+    def traiter(self, df):
+        """
+        Features d'avant-match de chaque nouveau match de df (postérieurs à ceux déjà intégrés),
+        puis intégration de ces matchs. Renvoie un DataFrame FEATURES_FORME indexé comme les matchs valides de df.
+        """
+        df = matchs_valides(df)
+        stats_home, stats_away = statistiques(df)
+        dates = minutes(df["date_match"])
+        X = np.empty((len(df), len(FEATURES_FORME)), dtype=np.float32)
+        for i, (home, away) in enumerate(zip(df["equipe_home"], df["equipe_away"])):
+            X[i] = self.caracteristiques(home, away, dates[i])
+            self.ajouter(home, away, dates[i], stats_home[i], stats_away[i])
+        return pd.DataFrame(X, index=df.index, columns=FEATURES_FORME)
+
+    @classmethod
+    def depuis_historique(cls, df, n=N_MATCHS):
+        """État après tout l'historique de df, en ne rejouant que les n derniers matchs de chaque équipe et de chaque lieu."""
+        moteur = cls(n)
+        long = perspective(matchs_valides(df))
+        for (equipe, domicile), groupe in long.groupby(["equipe", "domicile"], sort=False):
+            fenetre = getattr(moteur.etat(equipe), "domicile" if domicile else "exterieur")
+            for ligne in groupe[STATS].to_numpy()[-n:]:
+                fenetre.ajouter(ligne)
+        for equipe, groupe in long.groupby("equipe", sort=False):
+            etat = moteur.etat(equipe)
+            for ligne in groupe[STATS].to_numpy()[-n:]:
+                etat.tous.ajouter(ligne)
+            etat.dernier = groupe["date"].iloc[-1]
+        return moteur
+
+    def sauvegarder(self, chemin):
+        with open(chemin, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def charger(chemin):
+        with open(chemin, "rb") as f:
+            return pickle.load(f)
+
+# --- Calcul vectorisé sur tout l'historique (rattrapage) ---
+
+def perspective(df):
+    """Format long : une ligne par (match, équipe) avec ses STATS, dans l'ordre chronologique des matchs."""
+    stats_home, stats_away = statistiques(df)
+    dates = minutes(df["date_match"])
+    parties = []
+    for equipes, domicile, stats in ((df["equipe_home"], True, stats_home), (df["equipe_away"], False, stats_away)):
+        partie = pd.DataFrame(stats, columns=STATS)
+        partie.insert(0, "match", np.arange(len(df)))
+        partie.insert(1, "equipe", equipes.to_numpy())
+        partie.insert(2, "domicile", domicile)
+        partie.insert(3, "date", dates)
+        parties.append(partie)
+    return pd.concat(parties, ignore_index=True).sort_values("match", kind="stable", ignore_index=True)
+
+def sommes_fenetre(long, cles, n):
+    """
+    Sommes de STATS sur les n matchs précédents de chaque groupe `cles` (match courant exclu) et nombre
+    de matchs dans la fenêtre : sommes cumulées exclusives moins leur valeur n matchs plus tôt.
+    """
+    groupes = long.groupby(cles, sort=False)
+    cumul = groupes[STATS].cumsum().to_numpy() - long[STATS].to_numpy()
+    exclus = long[cles].copy()
+    exclus[STATS] = cumul
+    avant = exclus.groupby(cles, sort=False)[STATS].shift(n).fillna(0).to_numpy()
+    return cumul - avant, np.minimum(groupes.cumcount().to_numpy(), n)
+
+def forme_vectorisee(df, n=N_MATCHS):
+    """Mêmes features que MoteurForme.traiter(df) sur un moteur vide, calculées en une passe vectorisée."""
+    valides = matchs_valides(df)
+    long = perspective(valides)
+    sommes, compte = sommes_fenetre(long, ["equipe"], n)
+    sommes_lieu, compte_lieu = sommes_fenetre(long, ["equipe", "domicile"], n)
+    precedente = long.groupby("equipe", sort=False)["date"].shift(1).to_numpy(dtype=np.float64)
+    blocs = [compte[:, None], agregats(sommes, compte), ((long["date"].to_numpy() - precedente) / 1440)[:, None],
+             agregats(sommes_lieu, compte_lieu)[:, :len(AGREGATS_LIEU)]]
+    par_equipe = np.hstack(blocs).astype(np.float32)
+    domicile = long["domicile"].to_numpy()
+    # Lignes longues triées par match : celles de l'équipe home puis celles de l'équipe away, dans l'ordre des matchs
+    X = np.hstack([par_equipe[domicile][np.argsort(long["match"].to_numpy()[domicile], kind="stable")],
+                   par_equipe[~domicile][np.argsort(long["match"].to_numpy()[~domicile], kind="stable")]])
+    return pd.DataFrame(X, index=valides.index, columns=FEATURES_FORME)
+
+# --- Matrice pour FootballNet ---
+
+def completer(caracteristiques, min_matchs=MIN_MATCHS):
+    """
+    Garde les matchs dont les deux équipes ont au moins min_matchs matchs d'historique et remplace les valeurs
+    non calculables : forme à domicile/à l'extérieur sans match -> forme générale, part de tirs sans tir -> 0.5.
+    """
+    X = caracteristiques[(caracteristiques["home_matchs"] >= min_matchs) & (caracteristiques["away_matchs"] >= min_matchs)].copy()
+    for cote, lieu in (("home", "domicile"), ("away", "exterieur")):
+        for agregat in AGREGATS_LIEU:
+            X[f"{cote}_{agregat}_{lieu}"] = X[f"{cote}_{agregat}_{lieu}"].fillna(X[f"{cote}_{agregat}"])
+        for ratio in ("ratio_tirs", "ratio_cadres"):
+            X[f"{cote}_{ratio}"] = X[f"{cote}_{ratio}"].fillna(RATIO_NEUTRE)
+    return X
+
+def lire_historique(chemin):
+    """
+    Colonnes utiles à la forme (clés, équipes, date, score, tirs) d'un CSV ou d'enregistrements .npy
+    (voir schema_stats) ; None si le fichier n'a pas d'équipes (extraction antérieure à leur capture).
+    """
+    if chemin.endswith(".npy"):
+        tableau = np.load(chemin, mmap_mode="r")
+        noms = [nom for nom in tableau.dtype.names if nom in ["competition", "saison", "id_match", *COLONNES_FORME]]
+        df = lire_enregistrements(tableau[noms])
+    else:
+        disponibles = pd.read_csv(chemin, nrows=0).columns
+        df = pd.read_csv(chemin, usecols=[col for col in COLONNES_CLES + COLONNES_FORME if col in disponibles])
+    if not set(COLONNES_CONTEXTE) <= set(df.columns):
+        return None
+    return df
+
+def avant_match(moteur, home, away, date):
+    """
+    Features d'avant-match (dict FEATURES_FORME) d'une affiche à venir, à partir de l'état du moteur
+    (voir ecrire_forme(etat=...)), valeurs non calculables remplacées comme dans completer.
+    Le nombre de matchs d'historique de chaque équipe reste dans home_matchs / away_matchs.
+    """
+    caracteristiques = pd.DataFrame([moteur.caracteristiques(home, away, date)], columns=FEATURES_FORME)
+    return completer(caracteristiques, min_matchs=0).iloc[0].to_dict()
+
+def ecrire_forme(entree, sortie, historique=None, etat=None, n=N_MATCHS, min_matchs=MIN_MATCHS):
+    """
+    Features d'avant-match des matchs prétraités de `entree` (data_<nom>.csv), écrites dans `sortie`
+    avec les clés et le résultat ; entraînement : IA_DONNEES=<sortie> IA_FEATURES=forme python ia.py.
+    La forme est calculée sur `historique` (extraction brute, `entree` par défaut) : les matchs écartés
+    au nettoyage faute d'une statistique comptent dans les fenêtres et les jours de repos ; les features
+    sont ensuite jointes aux lignes de `entree` par href. Avec `etat`, l'état du moteur incrémental après
+    tout l'historique y est sauvegardé (MoteurForme.charger, pour les affiches à venir : voir avant_match).
+    Renvoie le nombre de matchs écrits, None si l'historique n'a pas d'équipes ;
+    un avertissement signale les matchs joués dont les équipes manquent.
+    """
+    matchs = lire_historique(historique or entree)
+    if matchs is None:
+        return None
+    # Matchs joués sans équipes (extraits avant leur capture) : absents des fenêtres, qui auraient des trous
+    joues = matchs[["score_equipe_home", "score_equipe_away"]].notna().all(axis=1)
+    sans_equipes = joues & matchs[["equipe_home", "equipe_away"]].isna().any(axis=1)
+    if sans_equipes.any():
+        print(f"Attention : {sans_equipes.sum()} matchs joués sur {joues.sum()} sans équipes dans {historique or entree}, "
+              f"la forme des équipes ignore ces matchs (relancez leur extraction).")
+    if etat is not None:
+        MoteurForme.depuis_historique(matchs, n).sauvegarder(etat)
+    X = completer(forme_vectorisee(matchs, n), min_matchs)
+    caracteristiques = matchs.loc[X.index, ["href", *COLONNES_CONTEXTE]].join(X)
+    disponibles = pd.read_csv(entree, nrows=0).columns
+    lignes = pd.read_csv(entree, usecols=[col for col in COLONNES_CLES + ["resultat"] if col in disponibles])
+    df = lignes.merge(caracteristiques, on="href", how="inner")
+    colonnes = [col for col in COLONNES_CLES if col in df.columns] + COLONNES_CONTEXTE
+    df[colonnes + [col for col in df.columns if col not in colonnes]].to_csv(sortie, index=False)
+    return len(df)
+
+
+if __name__ == "__main__":
+    # Usage : python forme.py data_laliga2.csv [forme_laliga2.csv] [extraction_parallel.npy]
+    entree = sys.argv[1] if len(sys.argv) > 1 else "data_laliga2.csv"
+    sortie = sys.argv[2] if len(sys.argv) > 2 else entree.replace("data_", "forme_", 1)
+    lignes = ecrire_forme(entree, sortie, sys.argv[3] if len(sys.argv) > 3 else None,
+                          etat=os.path.splitext(sortie)[0] + ".etat")
+    if lignes is None:
+        print(f"{entree} ne contient pas les équipes et dates des matchs : relancez l'extraction.")
+    else:
+        print(f"{lignes} matchs avec features d'avant-match écrits dans {sortie}")
@@ -1,237 +1,599 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
-import time
 import pandas as pd
-from tqdm import tqdm
-import re
 import numpy as np
+import os
+import sys
 from multiprocessing import Pool
+from async_fetch import process_matches_http, REQUETES_PAR_MATCH, TENTATIVES as TENTATIVES_HTTP
+from driver_pool import init_gestionnaire, obtenir_gestionnaire, session_morte
+from waits import (attendre, score_present, statistiques_remplies, mi_temps_present, liste_agrandie,
+                   sauvegarder_attentes, charger_attentes, resume_attentes, reinitialiser_attentes)
+from multiprocessing import util
+import extraction_js
+from store import BaseResultats, BaseLiens, resultat_complet
+from competitions import COMPETITIONS, url_saison, saison_en_cours, periode_stats
+from schema_stats import SCHEMA_FOOTBALL, lire_enregistrements, morceaux_enregistrements
+from ordonnanceur import Ordonnanceur
+from forme import ecrire_forme
+from archive import obtenir_archive
+import metriques
+from metriques import mesurer, compter, profiler
+from dataset import ecrire_dataset, repertoire_dataset, EcrivainDataset, TAILLE_CHUNK, COLONNES_CONTEXTE
+from urllib.parse import urlparse
+from match_ids import id_match, id_equipe, url_match, url_stats, dedoublonner
 
+# Mode d'extraction des matchs : "selenium" (navigateur) ou "http" (flux de données, sans navigateur)
+MODE_EXTRACTION = os.environ.get("FLASHCORE_MODE", "selenium")
+# Lecture des pages en mode selenium : un script par page (True) ou élément par élément (False)
+EXTRACTION_JS = True
+# Répertoire d'archive du HTML des pages visitées (relecture hors ligne avec reparse.py), None = désactivé
+REPERTOIRE_ARCHIVE = os.environ.get("FLASHCORE_ARCHIVE")
+# Nettoyage et prétraitement par morceaux de TAILLE_CHUNK lignes plutôt qu'en mémoire
+TRAITEMENT_FLUX = os.environ.get("FLASHCORE_FLUX") == "1"
+# Nombre de matchs extraits par paquet en mode http (mémoire bornée)
+TAILLE_PAQUET_HTTP = 1000
+
+# Compétitions parcourues par défaut (noms du registre competitions.COMPETITIONS, séparés par des virgules)
+COMPETITIONS_DEFAUT = os.environ.get("FLASHCORE_COMPETITIONS", "laliga2").split(",")
+
+# --- Ordonnancement des pages (requêtes par seconde) ---
+DEBIT_GLOBAL = 5.0
+DEBIT_PAR_HOTE = 3.0
+NB_PROCESS = 10  # navigateurs partagés par toutes les compétitions (adaptez selon la machine)
+# Mode http : mêmes débits en matchs par seconde, exprimés en requêtes (REQUETES_PAR_MATCH par match ;
+# par hôte, les flux sont tous sur un hôte et les pages sur celui du site)
+DEBIT_GLOBAL_HTTP = DEBIT_GLOBAL * REQUETES_PAR_MATCH
+DEBIT_PAR_HOTE_HTTP = DEBIT_PAR_HOTE * REQUETES_PAR_MATCH
+
+# --- Découverte des liens ---
+NB_NAVIGATEURS_LIENS = 4  # saisons chargées en parallèle quand on ne récupère que les liens
+# Priorités dans l'Ordonnanceur : les pages de résultats d'abord (elles alimentent la file des matchs),
+# puis les matchs de la saison en cours, puis les autres
+PRIORITE_LIENS, PRIORITE_SAISON_EN_COURS, PRIORITE_MATCHS = 0, 1, 2
+# Identifiant et liens de chaque match affiché (id de la div : "g_1_<id>") ; arguments[0] = sélecteur des lignes
+SCRIPT_LIENS = """
+return Array.from(document.querySelectorAll(arguments[0]),
+                  d => [d.id.split("_").pop(), Array.from(d.querySelectorAll("a"), a => a.href).filter(h => h)]);
+"""
 
-# --- Variables globales pour chaque processus ---
-global global_driver
-global_driver= webdriver.Chrome()
 
 def init_driver():
-    """Initialise le driver une fois par processus."""
-    global global_driver
-    global_driver = webdriver.Chrome()
-
-def links():
-    """
-    Récupère les liens pour chaque saison et les enregistre dans un CSV.
-    """
-    all_hrefs = []
-    driver = webdriver.Chrome()
-    # Parcours des saisons de 2012-2013 à 2024-2025
-    for year in range(2012, 2025):
-        season_str = f"{year}-{year+1}"
-        print(f"Chargement de la saison : {season_str}")
-        if year == 2024:
-            url = f"https://www.flashscore.fr/football/espagne/laliga2/resultats/"
-        else:
-            url = f"https://www.flashscore.fr/football/espagne/laliga2-{season_str}/resultats/"
-        
-        driver.get(url)
-        time.sleep(1)  # Laisser le temps au chargement
-        actions = ActionChains(driver)
-        wait = WebDriverWait(driver, 5)
-        
-        # Cliquer sur "Montrer plus de matchs" tant que possible
-        while True:
-            try:
-                button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a.event__more.event__more--static")))
+    """Initialise le gestionnaire de driver une fois par processus (initializer du Pool)."""
+    metriques.nouveau_processus()
+    init_gestionnaire()
+    # Les durées d'attente et les métriques du worker sont écrites à sa sortie
+    util.Finalize(None, sauvegarder_attentes, exitpriority=20)
+    util.Finalize(None, metriques.sauvegarder, exitpriority=20)
+
+def liens_saison(gestionnaire, nom, year, ids_connus):
+    """
+    Charge la page de résultats d'une saison de la compétition `nom` et clique sur "Montrer plus de matchs"
+    jusqu'au bout, ou jusqu'à afficher un match déjà connu (ids_connus non vide).
+    Renvoie (compétition, saison, [(id_match, [hrefs])], parcours complet).
+    """
+    driver = gestionnaire.driver
+    config = COMPETITIONS[nom]
+    selecteur = config["selecteur_matchs"]
+    season_str, url = url_saison(config, year)
+    print(f"Chargement de la saison : {nom} {season_str}")
+    gestionnaire.get(url)
+    attendre(driver, "liste_matchs", liste_agrandie(selecteur, 0))
+    actions = ActionChains(driver)
+    complet = True
+    
+    # Cliquer sur "Montrer plus de matchs" tant que possible
+    while True:
+        matchs = driver.execute_script(SCRIPT_LIENS, selecteur)
+        if ids_connus and any(id_match in ids_connus for id_match, _ in matchs):
+            print(f"{nom} {season_str} : matchs déjà connus atteints, arrêt de la pagination.")
+            break
+        button = attendre(driver, "bouton_plus", EC.element_to_be_clickable((By.CSS_SELECTOR, "a.event__more.event__more--static")))
+        if button is None:
+            print("Plus de bouton 'Montrer plus de matchs' disponible pour cette saison.")
+            break
+        try:
+            with mesurer("liens.clic"):
                 actions.move_to_element(button).perform()
-                time.sleep(1)
                 button.click()
-                time.sleep(1)
-            except Exception:
-                print("Plus de bouton 'Montrer plus de matchs' disponible pour cette saison.")
-                break
-
-        # Récupérer tous les liens de matchs
-        matches = driver.find_elements(By.CSS_SELECTOR, "div.event__match")
-        for match in matches:
-            anchors = match.find_elements(By.TAG_NAME, "a")
-            for a in anchors:
-                link = a.get_attribute("href")
-                if link:
-                    all_hrefs.append((season_str, link))
-                    
-    driver.quit()
-    df = pd.DataFrame(all_hrefs, columns=["saison", "href"])
-    df.to_csv("flashscore_ligue2_links.csv", index=False)
+        except Exception as e:
+            if session_morte(e):
+                raise
+            print(f"Clic impossible sur 'Montrer plus de matchs' : {e}")
+            complet = False
+            break
+        # Attendre que la liste se soit agrandie plutôt qu'un délai fixe
+        if attendre(driver, "liste_agrandie", liste_agrandie(selecteur, len(matchs))) is None:
+            print("La liste des matchs ne s'est pas agrandie après le clic.")
+            complet = False
+            break
+
+    # Récupérer tous les liens de matchs en un seul appel
+    return nom, season_str, driver.execute_script(SCRIPT_LIENS, selecteur), complet
+
+def tache_saison(args):
+    """Tâche de Pool : découverte des liens d'une saison avec le navigateur du worker."""
+    with mesurer("liens.saison"):
+        return obtenir_gestionnaire().executer(liens_saison, *args)
+
+def enregistrer_liens(base, nom, season_str, matchs, complet):
+    """Enregistre les liens d'une saison parcourue ; renvoie ses liens canoniques (saison, href)."""
+    # Un seul lien canonique par match, quel que soit le nombre d'ancres ou de saisons où il apparaît
+    liens = []
+    for id_div, anchors in matchs:
+        for link in anchors:
+            identifiant = id_match(link) or id_div
+            liens.append((identifiant, url_match(identifiant)))
+    nouveaux = base.ajouter(nom, season_str, liens)
+    print(f"{nom} {season_str} : {nouveaux} nouveaux matchs, {len(liens) - nouveaux} liens redondants écartés")
+    if complet:
+        base.marquer_saison(nom, season_str, terminee=season_str != saison_en_cours(COMPETITIONS[nom]))
+    return [(season_str, href) for _, href in liens]
+
+def saisons_a_parcourir(base, nom):
+    """Tâches (nom, année, ids connus) des saisons de la compétition qui ne sont pas terminées."""
+    config = COMPETITIONS[nom]
+    taches = []
+    for year in config["saisons"]:
+        season_str, _ = url_saison(config, year)
+        parcourue, terminee = base.etat_saison(nom, season_str)
+        if terminee:
+            print(f"Saison {nom} {season_str} déjà récupérée.")
+            continue
+        taches.append((nom, year, base.ids_connus(nom, season_str) if parcourue else set()))
+    return taches
+
+def crawler(noms=COMPETITIONS_DEFAUT, nb_process=NB_PROCESS, chemin_base="resultats.sqlite", liens=True, matchs=True):
+    """
+    Parcourt les compétitions `noms` avec un seul Pool de navigateurs : les pages de résultats
+    (découverte des liens, si `liens`) et les pages de matchs (si `matchs`) de toutes les compétitions
+    passent par le même Ordonnanceur. Chaque saison parcourue ajoute aussitôt ses matchs à la file,
+    si bien qu'aucun worker n'attend la fin d'une compétition pour commencer la suivante.
+    Les matchs déjà connus mais pas encore extraits sont repris dès le départ.
+    Renvoie les tâches abandonnées (voir Ordonnanceur.executer).
+    """
+    base = BaseLiens(chemin_base)
+    store = BaseResultats(chemin_base)
+    vus = set()
+
+    def ajouter_matchs(nom, links_list):
+        # Un seul chargement par match : liens canoniques et sans doublons, toutes compétitions confondues
+        links_list, _ = dedoublonner(links_list, vus)
+        en_cours = saison_en_cours(COMPETITIONS[nom])
+        for saison, href in store.a_traiter(links_list):
+            ordonnanceur.ajouter(href, process_match, ((saison, href), nom),
+                                 priorite=PRIORITE_SAISON_EN_COURS if saison == en_cours else PRIORITE_MATCHS,
+                                 hote=urlparse(href).netloc, valider=resultat_complet)
+
+    def sur_resultat(tache, resultat):
+        if tache.fonction is tache_saison:
+            nom, season_str, matchs_saison, complet = resultat
+            nouveaux_liens = enregistrer_liens(base, nom, season_str, matchs_saison, complet)
+            if matchs:
+                ajouter_matchs(nom, nouveaux_liens)
+        else:
+            store.enregistrer(resultat)
+
+    def sur_echec(tache, erreur, resultat):
+        if tache.fonction is tache_saison:
+            print(f"Abandon de la saison {tache.cle} : {erreur}")
+        elif resultat:
+            store.enregistrer(resultat)
+        else:
+            # Exception à chaque tentative : l'échec est compté pour ne pas retenter le match indéfiniment
+            (saison, href), nom = tache.args
+            store.enregistrer_echec(href, saison, nom)
+
+    # Un navigateur par worker (démarré à la première page), fermé proprement à la fin du Pool
+    with Pool(processes=nb_process, initializer=init_driver) as pool:
+        ordonnanceur = Ordonnanceur(pool, concurrence_max=nb_process, debit_global=DEBIT_GLOBAL, debit_par_hote=DEBIT_PAR_HOTE)
+        for nom in noms:
+            if liens:
+                for args in saisons_a_parcourir(base, nom):
+                    season_str, url = url_saison(COMPETITIONS[nom], args[1])
+                    ordonnanceur.ajouter(f"{nom} {season_str}", tache_saison, (args,),
+                                         priorite=PRIORITE_LIENS, hote=urlparse(url).netloc)
+            if matchs:
+                ajouter_matchs(nom, base.liens(nom))
+        morts = ordonnanceur.executer(sur_resultat=sur_resultat, sur_echec=sur_echec)
+        pool.close()
+        pool.join()
+    base.fermer()
+    store.fermer()
+    return morts
+
+def exporter_liens(nom, chemin_base="resultats.sqlite"):
+    """Écrit les liens connus de la compétition dans son CSV de liens."""
+    base = BaseLiens(chemin_base)
+    df = pd.DataFrame(base.liens(nom), columns=["saison", "href"])
+    base.fermer()
+    df.to_csv(COMPETITIONS[nom]["fichiers"]["liens"], index=False)
+    return df
+
+def links(noms=COMPETITIONS_DEFAUT, nb_navigateurs=NB_NAVIGATEURS_LIENS, chemin_base="resultats.sqlite"):
+    """
+    Récupère les liens de chaque saison des compétitions `noms` et les enregistre dans leurs CSV.
+    Les saisons closes déjà parcourues sont lues en base ; les autres sont chargées
+    en parallèle (un navigateur par worker) et la saison en cours s'arrête aux matchs déjà connus.
+    Renvoie les liens (saison, href) de toutes les compétitions.
+    """
+    crawler(noms, nb_navigateurs, chemin_base, matchs=False)
+    df = pd.concat([exporter_liens(nom, chemin_base) for nom in noms], ignore_index=True)
     print("Fin de l'extraction des liens. Le fichier CSV a été enregistré.")
     return df
 
-def process_match(match_tuple):
+def process_match(match_tuple, nom=None):
     """
-    Pour un match donné (saison, href), cette fonction :
-      - Ouvre une instance Selenium
-      - Extrait le score complet et les statistiques via l'URL "/statistiques-du-match/1"
-      - Extrait le score mi-temps via l'URL de base
-      - Ferme le driver et renvoie un dictionnaire des résultats.
+    Pour un match donné (saison, href) de la compétition `nom` (première de COMPETITIONS_DEFAUT par défaut),
+    cette fonction :
+      - Utilise le navigateur du processus (relancé automatiquement s'il meurt)
+      - Charge une seule fois la page du match et en extrait le score mi-temps (si la compétition en a un)
+      - Bascule sur l'onglet statistiques de la compétition sans recharger pour le score complet et les statistiques
+      - Renvoie un dictionnaire des résultats.
     """
+    # Une fraction des matchs (FLASHCORE_PROFIL) passe sous cProfile
+    return profiler(obtenir_gestionnaire().executer, extraire_match, match_tuple, nom or COMPETITIONS_DEFAUT[0])
+
+def extraire_match(gestionnaire, match_tuple, nom):
+    """Extraction d'un match avec le navigateur du gestionnaire (voir process_match)."""
     saison, href = match_tuple
-    result = {"saison": saison, "href": href,
+    config = COMPETITIONS[nom]
+    result = {"saison": saison, "href": href, "competition": nom,
               "score_equipe_home": None, "score_equipe_away": None,
               "score_mi_temps_home": None, "score_mi_temps_away": None}
-    global global_driver    
-    try:
-        # --- Extraction des statistiques et score complet ---
+    driver = gestionnaire.driver
+    identifiant = id_match(href)
+    lire_mi_temps, lire_score_et_stats = LECTEURS[EXTRACTION_JS]
+    # Durée de chaque phase (metriques) ; chargements et attentes sont mesurés par driver_pool et waits
+    with mesurer("match"):
+        # --- Extraction du score mi-temps (page de résumé, seul chargement complet) ---
         try:
-            global_driver.get(href + "/statistiques-du-match/1")
-            time.sleep(1)
-            try:
-                score_wrapper = global_driver.find_element(By.CSS_SELECTOR, "div.detailScore__wrapper")
-                spans = score_wrapper.find_elements(By.TAG_NAME, "span")
-                if len(spans) >= 3:
-                    result["score_equipe_home"] = spans[0].text
-                    result["score_equipe_away"] = spans[2].text
-            except NoSuchElementException:
-                print(f"Score introuvable pour {href}")
-            time.sleep(1)
-            try:
-                stat_rows = global_driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="wcl-statistics"]')
-                for row in stat_rows:
-                    try:
-                        tab = row.find_elements(By.CSS_SELECTOR, '[data-testid="wcl-scores-simpleText-01"]')
-                        if len(tab) >= 3:
-                            category_name = tab[1].text  # ex: "Possession"
-                            home_value = tab[0].text     # ex: "52%"
-                            away_value = tab[2].text     # ex: "48%"
-                            # Création dynamique des colonnes selon la catégorie
-                            col_name_home = category_name.replace(" ", "_") + "_home"
-                            col_name_away = category_name.replace(" ", "_") + "_away"
-                            result[col_name_home] = home_value
-                            result[col_name_away] = away_value
-                    except NoSuchElementException:
-                        pass
-            except NoSuchElementException:
-                print(f"Tableau des statistiques introuvable pour {href}")
+            gestionnaire.get(url_match(identifiant) if identifiant else href)
+            if config["mi_temps"]:
+                attendre(driver, "mi_temps", mi_temps_present)
+                with mesurer("match.lecture_mi_temps"):
+                    lire_mi_temps(driver, result)
+            if REPERTOIRE_ARCHIVE:
+                with mesurer("match.archive"):
+                    obtenir_archive(REPERTOIRE_ARCHIVE).ajouter(href, saison, "resume", driver.page_source, nom)
         except Exception as e:
-            print(f"Erreur lors du chargement des stats pour {href}: {e}")
-        
-        # --- Extraction du score mi-temps ---
+            if session_morte(e):
+                raise
+            compter("erreurs", "match.resume")
+            print(f"Impossible de trouver le score mi-temps pour {href} : {e}")
+
+        # --- Extraction des statistiques et score complet (onglet ouvert dans la même page) ---
         try:
-            global_driver.get(href)
-            time.sleep(0.5)
-            ht_elements = global_driver.find_elements(By.CSS_SELECTOR, '[data-testid^="wcl-scores-overline-02"]')
-            if len(ht_elements) > 1:
-                ht_text = ht_elements[1].text
-                if "MI" in ht_text and len(ht_elements) > 2:
-                    ht_text = ht_elements[2].text
-                ht_text_clean = ht_text.replace(".", "").strip()
-                if "-" in ht_text_clean:
-                    home, away = ht_text_clean.split("-")
-                    result["score_mi_temps_home"] = home.strip()
-                    result["score_mi_temps_away"] = away.strip()
+            gestionnaire.naviguer(url_stats(identifiant, config["onglet_stats"]) if identifiant else href + config["onglet_stats"])
+            attendre(driver, "score", score_present)
+            attendre(driver, "statistiques", statistiques_remplies)
+            with mesurer("match.lecture_stats"):
+                lire_score_et_stats(driver, result, config["stats"])
+            if REPERTOIRE_ARCHIVE:
+                with mesurer("match.archive"):
+                    obtenir_archive(REPERTOIRE_ARCHIVE).ajouter(href, saison, "statistiques", driver.page_source, nom)
         except Exception as e:
-            print(f"Impossible de trouver le score mi-temps pour {href} : {e}")
-    finally:
-        print("fin")
-        
+            if session_morte(e):
+                raise
+            compter("erreurs", "match.statistiques")
+            print(f"Erreur lors du chargement des stats pour {href}: {e}")
+    compter("matchs", "complet" if resultat_complet(result) else "incomplet")
     return result
 
+def lire_mi_temps_elements(driver, result):
+    """Score mi-temps lu élément par élément (un appel chromedriver par élément et par texte)."""
+    ht_elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid^="wcl-scores-overline-02"]')
+    if len(ht_elements) > 1:
+        ht_text = ht_elements[1].text
+        if "MI" in ht_text and len(ht_elements) > 2:
+            ht_text = ht_elements[2].text
+        ht_text_clean = ht_text.replace(".", "").strip()
+        if "-" in ht_text_clean:
+            home, away = ht_text_clean.split("-")
+            result["score_mi_temps_home"] = home.strip()
+            result["score_mi_temps_away"] = away.strip()
+
+def lire_score_et_stats_elements(driver, result, stats=None):
+    """Score complet, statistiques, équipes et date lus élément par élément (`stats` : schéma des catégories retenues)."""
+    href = result["href"]
+    try:
+        score_wrapper = driver.find_element(By.CSS_SELECTOR, "div.detailScore__wrapper")
+        spans = score_wrapper.find_elements(By.TAG_NAME, "span")
+        if len(spans) >= 3:
+            result["score_equipe_home"] = spans[0].text
+            result["score_equipe_away"] = spans[2].text
+    except NoSuchElementException:
+        print(f"Score introuvable pour {href}")
+    try:
+        stat_rows = driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="wcl-statistics"]')
+        for row in stat_rows:
+            try:
+                tab = row.find_elements(By.CSS_SELECTOR, '[data-testid="wcl-scores-simpleText-01"]')
+                if len(tab) >= 3:
+                    category_name = tab[1].text  # ex: "Possession"
+                    colonne = stats.colonne(category_name) if stats is not None else category_name.replace(" ", "_")
+                    if colonne is None:
+                        continue
+                    home_value = tab[0].text     # ex: "52%"
+                    away_value = tab[2].text     # ex: "48%"
+                    # Colonnes selon la catégorie
+                    col_name_home = colonne + "_home"
+                    col_name_away = colonne + "_away"
+                    result[col_name_home] = home_value
+                    result[col_name_away] = away_value
+            except NoSuchElementException:
+                pass
+    except NoSuchElementException:
+        print(f"Tableau des statistiques introuvable pour {href}")
+    # Équipes et date (en-tête de la page)
+    equipes = []
+    for cote in ("home", "away"):
+        liens = [a.get_attribute("href") for a in driver.find_elements(By.CSS_SELECTOR, f".duelParticipant__{cote} a")]
+        equipes.append(next((lien for lien in liens if id_equipe(lien)), None))
+    debut = driver.find_elements(By.CSS_SELECTOR, ".duelParticipant__startTime")
+    extraction_js.remplir_equipes(result, {"equipes": equipes, "date": debut[0].text if debut else None})
+
+def lire_mi_temps_js(driver, result):
+    """Score mi-temps lu avec un seul script exécuté dans la page."""
+    extraction_js.remplir_mi_temps(result, extraction_js.lire_page(driver))
+
+def lire_score_et_stats_js(driver, result, stats=None):
+    """Score complet, statistiques, équipes et date lus avec un seul script exécuté dans la page."""
+    donnees = extraction_js.lire_page(driver)
+    if not extraction_js.remplir_score(result, donnees):
+        print(f"Score introuvable pour {result['href']}")
+    extraction_js.remplir_stats(result, donnees, stats)
+    extraction_js.remplir_equipes(result, donnees)
+
+# Lecteurs (mi-temps, score et stats) selon EXTRACTION_JS
+LECTEURS = {True: (lire_mi_temps_js, lire_score_et_stats_js),
+            False: (lire_mi_temps_elements, lire_score_et_stats_elements)}
+
 def merge(df1, df2):
     """
     Concatène verticalement deux DataFrames et enregistre le résultat dans un CSV.
     """
     df_merged = pd.concat([df1, df2], axis=0, ignore_index=True)
     df_merged.to_csv("merged_data.csv", index=False)
+    ecrire_dataset(df_merged, repertoire_dataset("merged_data.csv"))
     return df_merged
 
-def nettoyage(df):
+# Colonnes supprimées au nettoyage
+COLONNES_INUTILES = ["Touches_dans_la_surface_adverse_home","Tacles_away","Tacles_home",
+                     "Touches_dans_la_surface_adverse_away","Expected_Goals_(xG)_home",
+                     "Expected_Goals_(xG)_away","Centres_home","Centres_away","Sauvetages_home","Sauvetages_away",
+                     "Buts_de_la_tête_home","Buts_de_la_tête_away","Passes_dans_le_dernier_tiers_away","Passes_dans_le_dernier_tiers_home",
+                     "Montant_touché_away","Montant_touché_home","Tirs_en_dehors_de_la_surface_away","Tirs_en_dehors_de_la_surface_home",
+                     "Tirs_à_l'intérieur_de_la_surface_away","Tirs_à_l'intérieur_de_la_surface_home","Grosses_occasions_away",
+                     "Grosses_occasions_home","Interceptions_home","Interceptions_away","Touche_away","Touche_home"]
+# Colonnes de cartons : absentes de la page quand il n'y en a pas, donc remplacées par 0
+COLONNES_CARTONS = ["Cartons_Rouges_home", "Cartons_Rouges_away", "Cartons_Jaunes_away", "Cartons_Jaunes_home"]
+
+def nettoyage(df, sortie="matchs_utilisable_l1.csv"):
     """
-    Nettoyage du DataFrame : suppression de colonnes inutiles, remplissage et suppression des valeurs manquantes.
+    Nettoyage du DataFrame : suppression de colonnes inutiles, remplissage et suppression des valeurs manquantes
+    (sauf dans les colonnes de contexte, équipes et date, absentes des anciens matchs).
     """
-    cols_to_drop = ["Touches_dans_la_surface_adverse_home","Tacles_away","Tacles_home",
-                    "Touches_dans_la_surface_adverse_away","Expected_Goals_(xG)_home",
-                    "Expected_Goals_(xG)_away","Centres_home","Centres_away","Sauvetages_home","Sauvetages_away",
-                    "Buts_de_la_tête_home","Buts_de_la_tête_away","Passes_dans_le_dernier_tiers_away","Passes_dans_le_dernier_tiers_home",
-                    "Montant_touché_away","Montant_touché_home","Tirs_en_dehors_de_la_surface_away","Tirs_en_dehors_de_la_surface_home",
-                    "Tirs_à_l'intérieur_de_la_surface_away","Tirs_à_l'intérieur_de_la_surface_home","Grosses_occasions_away",
-                    "Grosses_occasions_home","Interceptions_home","Interceptions_away","Touche_away","Touche_home"]
-    df.drop(columns=cols_to_drop, axis=1, inplace=True, errors='ignore')
-    
-    # Remplissage des cartons si ces colonnes existent
-    for col in ["Cartons_Rouges_home", "Cartons_Rouges_away", "Cartons_Jaunes_away", "Cartons_Jaunes_home"]:
-        if col in df.columns:
-            df[col] = df[col].fillna(0)
-    
-    df.dropna(inplace=True)
-    df.reset_index(inplace=True, drop=True)
-    df.to_csv("matchs_utilisable_l1.csv", index=False)
+    with mesurer("traitement.nettoyage"):
+        df.drop(columns=COLONNES_INUTILES, inplace=True, errors='ignore')
+
+        # Remplissage des cartons si ces colonnes existent
+        for col in COLONNES_CARTONS:
+            if col in df.columns:
+                df[col] = df[col].fillna(0)
+
+        df.dropna(subset=[col for col in df.columns if col not in COLONNES_CONTEXTE], inplace=True)
+        df.reset_index(inplace=True, drop=True)
+        df.to_csv(sortie, index=False)
     return df
 
+# --- Schéma du prétraitement : colonne -> conversion ---
+#   "possession" : "52%" -> 0.52 (float32)
+#   "passes"     : "81% (300/370)" -> 0.81 (float32)
+#   "entier"     : nombre, en entier compact (int8/int16) si aucune valeur manquante, sinon float32
+# (colonnes de score et catégories du schéma des statistiques, voir schema_stats.CATEGORIES_FOOTBALL)
+SCHEMA_PRETRAITEMENT = dict(SCHEMA_FOOTBALL.conversions)
+
+def convertir_colonne(serie, conversion):
+    """Conversion vectorisée d'une colonne selon SCHEMA_PRETRAITEMENT."""
+    if conversion == 'entier':
+        if not pd.api.types.is_numeric_dtype(serie):
+            serie = pd.to_numeric(serie, errors='coerce')
+        valeurs = serie.to_numpy(dtype='float32')
+        if len(valeurs) and not np.isnan(valeurs).any() and (valeurs == np.trunc(valeurs)).all():
+            for type_entier in (np.int8, np.int16, np.int32):
+                limites = np.iinfo(type_entier)
+                if limites.min <= valeurs.min() and valeurs.max() <= limites.max:
+                    return pd.Series(valeurs.astype(type_entier), index=serie.index)
+        return pd.Series(valeurs, index=serie.index)
+    if not pd.api.types.is_numeric_dtype(serie):
+        if conversion == 'possession':
+            serie = serie.str.rstrip('%').astype(float) / 100
+        else:
+            # Premier nombre suivi de '%' (ex: "81% (300/370)"), valeur manquante sinon
+            nombre = serie.str.replace(r'(?s)^.*?(\d+)%.*$', r'\1', regex=True)
+            serie = nombre.where(serie.str.contains(r'\d%')).astype(float) / 100
+    return serie.astype('float32')
+
+def convertir_types(df):
+    """
+    Conversion de toutes les colonnes du schéma en un seul passage et calcul du résultat :
+    -1 si l'équipe à domicile gagne, 0 en cas d'égalité, 1 sinon (score manquant compris).
+    """
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    colonnes = {col: convertir_colonne(df[col], conversion)
+                for col, conversion in SCHEMA_PRETRAITEMENT.items() if col in df.columns}
+    if 'score_equipe_home' in colonnes and 'score_equipe_away' in colonnes:
+        ecart = colonnes['score_equipe_away'].astype('float32') - colonnes['score_equipe_home'].astype('float32')
+        colonnes['resultat'] = np.sign(ecart).fillna(1).astype('int8')
+    return df.assign(**colonnes)
+
 def pretraitement(df,name):
     """
     Prétraitement : suppression de colonnes inutiles, conversion de pourcentages et calcul de résultats.
     """
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-    
-    # Conversion des pourcentages pour la possession de balle si les colonnes existent
-    for col in ['Possession_de_balle_home', 'Possession_de_balle_away']:
-        if col in df.columns:
-            df[col] = df[col].str.rstrip('%').astype(float) / 100
-    
-    def extract_percentage(value):
-        match = re.search(r'(\d+)%', str(value))
-        if match:
-            return float(match.group(1)) / 100
-        return None
-
-    for col in ['Passes_home', 'Passes_away']:
-        if col in df.columns:
-            df[col] = df[col].apply(extract_percentage)
-    
-    colonnes_numeriques = [
-        'score_equipe_home', 'score_equipe_away', 'Tirs_au_but_home', 'Tirs_au_but_away',
-        'Tirs_cadrés_home', 'Tirs_cadrés_away', 'Tirs_non_cadrés_home', 'Tirs_non_cadrés_away',
-        'Tirs_bloqués_home', 'Tirs_bloqués_away', 'Corners_home', 'Corners_away',
-        'Sauvetages_du_gardien_home', 'Sauvetages_du_gardien_away', 'Coup_francs_home', 'Coup_francs_away',
-        'Hors-jeu_home', 'Hors-jeu_away', 'Fautes_home', 'Fautes_away', 'Cartons_Jaunes_home',
-        'Cartons_Jaunes_away', 'Passes_home', 'Passes_away', 'Cartons_Rouges_home', 'Cartons_Rouges_away'
-    ]
-    for col in colonnes_numeriques:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    if 'score_equipe_home' in df.columns and 'score_equipe_away' in df.columns:
-        df['resultat'] = np.where(df['score_equipe_home'] > df['score_equipe_away'], -1,
-                           np.where(df['score_equipe_home'] == df['score_equipe_away'], 0, 1))
-    df.to_csv(f"data_{name}.csv", index=False)
+    with mesurer("traitement.pretraitement"):
+        df = convertir_types(df)
+        df.to_csv(f"data_{name}.csv", index=False)
+        ecrire_dataset(df, repertoire_dataset(f"data_{name}.csv"))
     return df
 
-if __name__ == "__main__":
-    
-    df_links = links()
+# --- Traitement par morceaux (mémoire bornée, mêmes résultats que merge/nettoyage/pretraitement) ---
 
-    name = "laliga2"
-    
-    # Création de la liste des tuples (saison, href) pour le multiprocessing
-    links_list = list(df_links.itertuples(index=False, name=None))
- 
-    # --- Étape 2 : Extraction des statistiques en parallèle ---
-    nb_process = 10  # Adaptez selon les ressources de votre machine
-    with Pool(processes=nb_process) as pool:
-        results = list(tqdm(pool.imap(process_match, links_list), total=len(links_list), desc="Extraction en parallèle"))
-
-    df_results = pd.DataFrame(results)
-    df_results.to_csv("extraction_parallel.csv", index=False)
-    
-    # --- Étape 3 : Nettoyage ---
-    df_clean = nettoyage(df_results)
-    
-    # --- Étape 4 : Prétraitement ---
-    df_final = pretraitement(df_clean,name)
-    
-    print("Traitement terminé. Les fichiers CSV ont été sauvegardés.")
+def ecrire_morceaux(morceaux, sortie, colonnes=None):
+    """Écrit une suite de DataFrames dans un seul CSV (en-tête une fois) ; renvoie le nombre de lignes."""
+    lignes = 0
+    entete = True
+    for morceau in morceaux:
+        morceau.to_csv(sortie, mode="w" if entete else "a", header=entete, index=False)
+        entete = False
+        lignes += len(morceau)
+    if entete:
+        pd.DataFrame(columns=colonnes or []).to_csv(sortie, index=False)
+    return lignes
 
-    global_driver.quit()
+def merge_flux(chemins, sortie="merged_data.csv", taille_chunk=TAILLE_CHUNK):
+    """
+    Concatène verticalement un nombre quelconque de CSV sans les charger entièrement.
+    Les colonnes sont l'union de celles des fichiers, dans l'ordre d'apparition (comme pd.concat).
+    """
+    colonnes = list(dict.fromkeys(col for chemin in chemins for col in pd.read_csv(chemin, nrows=0).columns))
+    ecrivain = EcrivainDataset(repertoire_dataset(sortie))
+    def morceaux():
+        for chemin in chemins:
+            for morceau in pd.read_csv(chemin, chunksize=taille_chunk):
+                morceau = morceau.reindex(columns=colonnes)
+                ecrivain.ajouter(morceau)
+                yield morceau
+    lignes = ecrire_morceaux(morceaux(), sortie, colonnes)
+    ecrivain.fermer()
+    return lignes
 
-    
+def lire_extraction(entree, taille_chunk=None):
+    """
+    Résultats bruts depuis un CSV ou un fichier d'enregistrements typés (.npy, voir schema_stats) :
+    un DataFrame, ou des morceaux de taille_chunk lignes si taille_chunk est donné.
+    """
+    if entree.endswith(".npy"):
+        if taille_chunk is None:
+            return lire_enregistrements(entree)
+        return morceaux_enregistrements(entree, taille_chunk)
+    return pd.read_csv(entree, chunksize=taille_chunk)
+
+def nettoyage_flux(entree="extraction_parallel.csv", sortie="matchs_utilisable_l1.csv", taille_chunk=TAILLE_CHUNK):
+    """Équivalent de nettoyage() appliqué morceau par morceau (toutes les opérations sont ligne à ligne)."""
+    entete = lire_enregistrements(np.load(entree, mmap_mode="r")[:0]) if entree.endswith(".npy") else pd.read_csv(entree, nrows=0)
+    colonnes = [col for col in entete.columns if col not in COLONNES_INUTILES]
+    def morceaux():
+        for morceau in lire_extraction(entree, taille_chunk):
+            morceau = morceau.drop(columns=COLONNES_INUTILES, errors='ignore')
+            for col in COLONNES_CARTONS:
+                if col in morceau.columns:
+                    morceau[col] = morceau[col].fillna(0)
+            yield morceau.dropna(subset=[col for col in morceau.columns if col not in COLONNES_CONTEXTE])
+    with mesurer("traitement.nettoyage_flux"):
+        return ecrire_morceaux(morceaux(), sortie, colonnes)
+
+def pretraitement_flux(entree, name, taille_chunk=TAILLE_CHUNK):
+    """Équivalent de pretraitement() appliqué morceau par morceau ; écrit data_{name}.csv et son format colonnaire."""
+    sortie = f"data_{name}.csv"
+    ecrivain = EcrivainDataset(repertoire_dataset(sortie))
+    def morceaux():
+        for morceau in pd.read_csv(entree, chunksize=taille_chunk):
+            morceau = convertir_types(morceau)
+            ecrivain.ajouter(morceau)
+            yield morceau
+    with mesurer("traitement.pretraitement_flux"):
+        lignes = ecrire_morceaux(morceaux(), sortie)
+        ecrivain.fermer()
+    return lignes
+
+def pipeline(noms=COMPETITIONS_DEFAUT, nb_process=NB_PROCESS, chemin_base="resultats.sqlite"):
+    """
+    Liens, extraction, nettoyage et prétraitement de toutes les compétitions `noms`,
+    sur un seul Pool de navigateurs ; les fichiers de chaque compétition sont ceux du registre.
+    Les métriques de tous les processus sont exportées toutes les metriques.PERIODE secondes et à la fin.
+    """
+    metriques.reinitialiser()
+    reinitialiser_attentes()
+    arreter_export = metriques.exporter_periodiquement()
+    if MODE_EXTRACTION == "http":
+        # Liens d'abord (navigateur), puis les flux de données pour tous les matchs, sans navigateur
+        links(noms, nb_process, chemin_base)
+        base = BaseLiens(chemin_base)
+        store = BaseResultats(chemin_base)
+        vus = set()
+        flux_abandonnes = []
+        for nom in noms:
+            config = COMPETITIONS[nom]
+            links_list, nb_doublons = dedoublonner(base.liens(nom), vus)
+            print(f"{nom} : {nb_doublons} chargements redondants évités")
+            a_faire = store.a_traiter(links_list)
+            print(f"{nom} : {len(links_list) - len(a_faire)} matchs déjà extraits ou abandonnés, {len(a_faire)} à traiter")
+            for debut in range(0, len(a_faire), TAILLE_PAQUET_HTTP):
+                paquet = a_faire[debut:debut + TAILLE_PAQUET_HTTP]
+                for result in process_matches_http(paquet, stats=config["stats"], periode=periode_stats(config),
+                                                   mi_temps=config["mi_temps"],
+                                                   debit_global=DEBIT_GLOBAL_HTTP, debit_par_hote=DEBIT_PAR_HOTE_HTTP,
+                                                   morts=flux_abandonnes):
+                    result["competition"] = nom
+                    store.enregistrer(result)
+        base.fermer()
+        store.fermer()
+        print(f"{len(flux_abandonnes)} flux abandonnés après {TENTATIVES_HTTP} tentatives")
+        # Repli sur Selenium pour les matchs que les flux n'ont pas permis d'extraire
+        morts = crawler(noms, nb_process, chemin_base, liens=False)
+    else:
+        # Pages de résultats et pages de matchs de toutes les compétitions entrelacées sur les mêmes navigateurs
+        morts = crawler(noms, nb_process, chemin_base)
+    if morts:
+        pd.DataFrame([{"href": tache.cle, "tentatives": tache.tentatives, "erreur": str(erreur)} for tache, erreur, _ in morts]).to_csv("echecs.csv", index=False)
+
+    # Durées réelles des attentes (tous processus confondus) pour ajuster waits.DELAIS
+    sauvegarder_attentes()
+    print(resume_attentes(charger_attentes()))
+
+    store = BaseResultats(chemin_base)
+    print(store.compter())
+    for nom in noms:
+        fichiers = COMPETITIONS[nom]["fichiers"]
+        exporter_liens(nom, chemin_base)
+        schema = COMPETITIONS[nom]["stats"]
+        if schema is not None:
+            # Schéma fixe : enregistrements typés de taille fixe, relus sans reconstruire de colonnes
+            extraction = fichiers["enregistrements"]
+            store.exporter_enregistrements(extraction, schema, competition=nom)
+        else:
+            extraction = fichiers["extraction"]
+            store.exporter_csv(extraction, competition=nom)
+
+        if TRAITEMENT_FLUX:
+            # --- Étapes 3 et 4 par morceaux : mémoire constante quel que soit le volume ---
+            nettoyage_flux(extraction, fichiers["utilisable"])
+            pretraitement_flux(fichiers["utilisable"], nom)
+        else:
+            df_results = lire_extraction(extraction)
+
+            # --- Étape 3 : Nettoyage ---
+            df_clean = nettoyage(df_results, fichiers["utilisable"])
+
+            # --- Étape 4 : Prétraitement ---
+            pretraitement(df_clean, nom)
+
+        # --- Étape 5 : Forme des équipes avant chaque match (features utilisables avant le coup d'envoi) ---
+        # Historique = extraction brute : le nettoyage a retiré les matchs dont une statistique manque.
+        # forme_<nom>.etat : état du moteur incrémental pour les affiches à venir (prediction.py affiche)
+        with mesurer("traitement.forme"):
+            lignes = ecrire_forme(f"data_{nom}.csv", f"forme_{nom}.csv", historique=extraction, etat=f"forme_{nom}.etat")
+        if lignes is not None:
+            print(f"{nom} : {lignes} matchs avec features d'avant-match dans forme_{nom}.csv")
+    store.fermer()
+
+    metriques.afficher(arreter_export())
+    print("Traitement terminé. Les fichiers CSV ont été sauvegardés.")
+
+if __name__ == "__main__":
+    # Usage : python frashcore.py [compétition ...]  (noms du registre competitions.COMPETITIONS)
+    pipeline(sys.argv[1:] or COMPETITIONS_DEFAUT)
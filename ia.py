@@ -1,67 +1,82 @@
+import os
 import pandas as pd
 import numpy as np
 import torch
 from torch import nn, optim
-from torch.utils.data import Dataset, DataLoader
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from dataset import FEATURES, charger_dataset
+from forme import FEATURES_FORME
 
 
-df = pd.read_csv("merged_data.csv")
-features = [
-    'Possession_de_balle_home', 'Possession_de_balle_away',
-    'Tirs_au_but_home', 'Tirs_au_but_away', 'Tirs_cadrés_home',
-    'Tirs_cadrés_away', 'Tirs_non_cadrés_home', 'Tirs_non_cadrés_away',
-    'Tirs_bloqués_home', 'Tirs_bloqués_away', 'Corners_home',
-    'Corners_away', 'Sauvetages_du_gardien_home',
-    'Sauvetages_du_gardien_away', 'Coup_francs_home', 'Coup_francs_away',
-    'Hors-jeu_home', 'Hors-jeu_away', 'Fautes_home', 'Fautes_away',
-    'Cartons_Jaunes_home', 'Cartons_Jaunes_away', 'Passes_home',
-    'Passes_away', 'Cartons_Rouges_home', 'Cartons_Rouges_away',
-    'score_mi_temps_home', 'score_mi_temps_away'
-]
+# Taille des batchs d'entraînement et nombre de threads CPU utilisés par PyTorch
+# (pour un réseau de cette taille, un seul thread est le plus rapide)
+BATCH_SIZE = int(os.environ.get("IA_BATCH_SIZE", 16))
+NB_THREADS = int(os.environ.get("IA_THREADS", 1))
+# Données d'entraînement et features : statistiques du match ("match", merged_data.csv)
+# ou forme d'avant-match des équipes ("forme", fichier écrit par forme.py, utilisable avant le coup d'envoi)
+DONNEES = os.environ.get("IA_DONNEES", "merged_data.csv")
+JEUX_FEATURES = {"match": FEATURES, "forme": FEATURES_FORME}
+JEU_FEATURES = os.environ.get("IA_FEATURES", "match")
 
-# Extraction des features
-X = df[features].copy()
 
-# Extraction du label (résultat) :
-# 'resultat' vaut -1 si l'équipe 1 gagne, 0 en cas d'égalité et 1 si l'équipe 2 gagne.
-# Pour l'entraînement avec CrossEntropyLoss, on mappe ces valeurs en 0, 1, 2.
-y = df['resultat'].copy()
-y = y.replace({-1: 0, 0: 1, 1: 2})
+def charger_donnees(chemin="merged_data.csv", features=FEATURES):
+    """
+    Charge features et labels, sépare train/test et normalise.
+    Renvoie X_train, X_test, y_train, y_test (tenseurs) et le scaler ajusté sur le train.
+    """
+    # Chargement des seules features et du label depuis le format colonnaire (mmap, float32),
+    # construit une fois à partir de merged_data.csv
+    X, y = charger_dataset(chemin, features)
 
-print(y.value_counts())
+    # Extraction du label (résultat) :
+    # 'resultat' vaut -1 si l'équipe 1 gagne, 0 en cas d'égalité et 1 si l'équipe 2 gagne.
+    # Pour l'entraînement avec CrossEntropyLoss, on mappe ces valeurs en 0, 1, 2.
+    y = y.astype(np.int64) + 1
 
+    print(pd.Series(y).value_counts())
 
-# Division train/test
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Division train/test
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Normalisation des features
-scaler = StandardScaler()
-X_train = scaler.fit_transform(X_train)
-X_test = scaler.transform(X_test)
+    # Normalisation des features
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+    return (torch.as_tensor(X_train, dtype=torch.float32), torch.as_tensor(X_test, dtype=torch.float32),
+            torch.as_tensor(y_train, dtype=torch.long), torch.as_tensor(y_test, dtype=torch.long), scaler)
 
 
 # ----------------------------
-# 2. Création du Dataset personnalisé
+# 2. Chargement des batchs
 # ----------------------------
 
-class FootballDataset(Dataset):
-    def __init__(self, features, targets):
-        self.features = torch.tensor(features, dtype=torch.float32)
-        self.targets = torch.tensor(targets.values, dtype=torch.long)
-        
-    def __len__(self):
-        return len(self.targets)
-    
-    def __getitem__(self, idx):
-        return self.features[idx], self.targets[idx]
+class ChargeurTenseurs:
+    """
+    Remplace Dataset + DataLoader : toute la matrice reste un seul tenseur et chaque batch
+    est obtenu par découpage d'index (mélangés à chaque époque si shuffle=True),
+    sans appel à __getitem__ ni assemblage échantillon par échantillon.
+    """
 
-train_dataset = FootballDataset(X_train, y_train)
-test_dataset = FootballDataset(X_test, y_test)
+    def __init__(self, features, targets, batch_size=BATCH_SIZE, shuffle=False):
+        self.features = features
+        self.targets = targets
+        self.batch_size = batch_size
+        self.shuffle = shuffle
 
-train_loader = DataLoader(train_dataset, batch_size=16, shuffle=True)
-test_loader = DataLoader(test_dataset, batch_size=16)
+    def __len__(self):
+        return (len(self.targets) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        n = len(self.targets)
+        if self.shuffle:
+            index = torch.randperm(n)
+            for debut in range(0, n, self.batch_size):
+                batch = index[debut:debut + self.batch_size]
+                yield self.features[batch], self.targets[batch]
+        else:
+            for debut in range(0, n, self.batch_size):
+                yield self.features[debut:debut + self.batch_size], self.targets[debut:debut + self.batch_size]
 
 # ----------------------------
 # 3. Définition du modèle avec PyTorch
@@ -84,53 +99,63 @@ class FootballNet(nn.Module):
         x = self.fc3(x)
         return x
 
-
-
-
-input_dim = len(features)
-hidden_dim = 32
-output_dim = 3  # Trois classes : victoire équipe 1, match nul, victoire équipe 2
-
-model = FootballNet(input_dim, hidden_dim, output_dim)
-
 # ----------------------------
 # 4. Entraînement du modèle
 # ----------------------------
 
-criterion = nn.CrossEntropyLoss()
-optimizer = optim.Adam(model.parameters(), lr=0.0001, weight_decay=1e-4)
-num_epochs = 150
-accur = []
-for epoch in range(num_epochs):
+def creer_optimiseur(model, lr=0.0001, weight_decay=1e-4):
+    """Adam en version fusionnée (une seule opération pour tous les paramètres) quand PyTorch la propose sur CPU."""
+    try:
+        return optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay, fused=True)
+    except (RuntimeError, TypeError):
+        return optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+
+def evaluer(model, X, y):
+    """Précision sur tout un jeu de données en une seule passe avant."""
+    model.eval()
+    with torch.no_grad():
+        predicted = model(X).argmax(dim=1)
+    return (predicted == y).float().mean().item()
+
+def entrainer_epoque(model, train_loader, criterion, optimizer):
+    """Une époque d'entraînement ; renvoie la loss moyenne."""
     model.train()
-    running_loss = 0.0
+    running_loss = torch.zeros(())
     for batch_features, batch_targets in train_loader:
         optimizer.zero_grad()
         outputs = model(batch_features)
         loss = criterion(outputs, batch_targets)
         loss.backward()
         optimizer.step()
-        running_loss += loss.item() * batch_features.size(0)
-    
-    epoch_loss = running_loss / len(train_dataset)
-    print(f"Epoch {epoch+1}/{num_epochs}, Loss: {epoch_loss:.4f}")
-    model.eval()
-    correct = 0
-    total = 0
-    with torch.no_grad():
-        for batch_features, batch_targets in test_loader:
-            outputs = model(batch_features)
-            _, predicted = torch.max(outputs, 1)
-            total += batch_targets.size(0)
-            correct += (predicted == batch_targets).sum().item()
-    accuracy = correct / total
-    accur.append(accuracy)
-    print(f"Test Accuracy: {accuracy*100:.2f}%")
-print(max(accur))
-
-# ----------------------------
-# 5. Évaluation du modèle sur le jeu de test
-# ----------------------------
-
-
-
+        running_loss += loss.detach() * batch_features.size(0)
+    return running_loss.item() / len(train_loader.targets)
+
+
+if __name__ == "__main__":
+    torch.set_num_threads(NB_THREADS)
+    features = JEUX_FEATURES[JEU_FEATURES]
+    X_train, X_test, y_train, y_test, scaler = charger_donnees(DONNEES, features)
+    train_loader = ChargeurTenseurs(X_train, y_train, batch_size=BATCH_SIZE, shuffle=True)
+
+    input_dim = len(features)
+    hidden_dim = 32
+    output_dim = 3  # Trois classes : victoire équipe 1, match nul, victoire équipe 2
+
+    model = FootballNet(input_dim, hidden_dim, output_dim)
+
+    criterion = nn.CrossEntropyLoss()
+    optimizer = creer_optimiseur(model, lr=0.0001, weight_decay=1e-4)
+    num_epochs = 150
+    accur = []
+    for epoch in range(num_epochs):
+        epoch_loss = entrainer_epoque(model, train_loader, criterion, optimizer)
+        print(f"Epoch {epoch+1}/{num_epochs}, Loss: {epoch_loss:.4f}")
+        accuracy = evaluer(model, X_test, y_test)
+        accur.append(accuracy)
+        print(f"Test Accuracy: {accuracy*100:.2f}%")
+    print(max(accur))
+
+    # Sauvegarde du modèle et du scaler pour prediction.py
+    from prediction import sauvegarder_modele, CHEMIN_MODELE
+    sauvegarder_modele(model, scaler, CHEMIN_MODELE, features, torchscript=True)
+    print(f"Modèle sauvegardé dans {CHEMIN_MODELE}")
@@ -0,0 +1,48 @@
+import os
+import re
+
+
+# Site parcouru (remplaçable par un serveur local, voir serveur_local.demarrer_site)
+SITE = os.environ.get("FLASHCORE_SITE", "https://www.flashscore.fr")
+URL_MATCH = SITE + "/match/{id}/#/resume-du-match"
+ONGLET_STATS = "/statistiques-du-match/1"
+
+
+def id_match(href):
+    """Extrait l'identifiant Flashscore d'un lien de match (ex: SOLVXEbk), None si ce n'est pas un lien de match."""
+    match = re.search(r"/match/([A-Za-z0-9]+)", href or "")
+    return match.group(1) if match else None
+
+def id_equipe(href):
+    """Identifiant Flashscore d'une équipe (ou d'un joueur en tennis) à partir du lien de sa page, None sinon."""
+    match = re.search(r"/(?:equipe|joueur)/[^/]+/([A-Za-z0-9]+)", href or "")
+    return match.group(1) if match else None
+
+def url_match(identifiant):
+    """URL canonique de la page de résumé d'un match."""
+    return URL_MATCH.format(id=identifiant)
+
+def url_stats(identifiant, onglet=ONGLET_STATS):
+    """URL canonique de l'onglet statistiques (même page, route par ancre)."""
+    return url_match(identifiant) + onglet
+
+def canonique(href):
+    """Remplace un lien de match (avec ou sans ancre, paramètres...) par son URL canonique."""
+    identifiant = id_match(href)
+    return url_match(identifiant) if identifiant else href
+
+def dedoublonner(links_list, vus=None):
+    """
+    Ramène chaque (saison, href) à son URL canonique et ne garde que la première
+    occurrence de chaque match. `vus` (ensemble d'identifiants) peut être partagé
+    entre plusieurs appels (saisons, ligues). Renvoie (liste unique, nombre de doublons retirés).
+    """
+    vus = set() if vus is None else vus
+    uniques = []
+    for saison, href in links_list:
+        cle = id_match(href) or href
+        if cle in vus:
+            continue
+        vus.add(cle)
+        uniques.append((saison, canonique(href)))
+    return uniques, len(links_list) - len(uniques)
@@ -0,0 +1,256 @@
+import cProfile
+import glob
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# --- Paramètres ---
+REPERTOIRE = os.environ.get("FLASHCORE_METRIQUES", "metriques")
+PERIODE = 30.0  # secondes entre deux écritures des mesures d'un processus / deux exports
+# Fraction des matchs exécutés sous cProfile (0 = désactivé), ex: FLASHCORE_PROFIL=0.01
+TAUX_PROFIL = float(os.environ.get("FLASHCORE_PROFIL", 0))
+# Bornes (s) des histogrammes de durée, plus une case au-delà de la dernière
+BORNES = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+
+class Metriques:
+    """
+    Mesures d'un processus, de coût constant par appel (pas de liste de durées) :
+      - histogrammes[etape] : nombre d'appels par case de BORNES, somme des durées
+      - compteurs[nom][etape] : pages chargées, erreurs, relances, redémarrages, octets reçus...
+      - jauges[nom] : dernière valeur et maximum d'une grandeur instantanée (mémoire du navigateur...)
+    """
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.histogrammes = {}
+        self.compteurs = defaultdict(lambda: defaultdict(float))
+        self.jauges = {}
+        self.derniere_ecriture = time.monotonic()
+
+    def observer(self, etape, duree):
+        with self.verrou:
+            if etape not in self.histogrammes:
+                self.histogrammes[etape] = {"comptes": [0] * (len(BORNES) + 1), "somme": 0.0}
+            histogramme = self.histogrammes[etape]
+            histogramme["comptes"][bisect_left(BORNES, duree)] += 1
+            histogramme["somme"] += duree
+
+    def compter(self, nom, etape="", n=1):
+        with self.verrou:
+            self.compteurs[nom][etape] += n
+
+    def jauger(self, nom, valeur):
+        with self.verrou:
+            jauge = self.jauges.setdefault(nom, {"valeur": valeur, "max": valeur})
+            jauge["valeur"] = valeur
+            jauge["max"] = max(jauge["max"], valeur)
+
+    def instantane(self):
+        with self.verrou:
+            return {"pid": os.getpid(),
+                    "histogrammes": {etape: {"comptes": list(h["comptes"]), "somme": h["somme"]}
+                                     for etape, h in self.histogrammes.items()},
+                    "compteurs": {nom: dict(par_etape) for nom, par_etape in self.compteurs.items()},
+                    "jauges": {nom: dict(jauge) for nom, jauge in self.jauges.items()}}
+
+# --- Mesures du processus courant ---
+metriques = Metriques()
+
+def nouveau_processus():
+    """
+    Mesures vierges pour un processus créé par fork (initializer du Pool) : sans cela, le worker hérite
+    des compteurs du parent, qui seraient comptés deux fois à l'export, et d'un verrou peut-être pris
+    par le thread d'export au moment du fork.
+    """
+    global metriques
+    metriques = Metriques()
+
+def observer(etape, duree):
+    """Enregistre une durée ; écrit les mesures du processus au plus toutes les PERIODE secondes."""
+    metriques.observer(etape, duree)
+    if time.monotonic() - metriques.derniere_ecriture > PERIODE:
+        sauvegarder()
+
+def compter(nom, etape="", n=1):
+    metriques.compter(nom, etape, n)
+
+def jauger(nom, valeur):
+    metriques.jauger(nom, valeur)
+
+@contextmanager
+def mesurer(etape):
+    """Chronomètre le bloc ; une exception est comptée comme erreur de l'étape puis relancée."""
+    debut = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        metriques.compter("erreurs", etape)
+        raise
+    finally:
+        observer(etape, time.perf_counter() - debut)
+
+def profiler(fonction, *args, taux=None):
+    """
+    Exécute fonction(*args) ; une fraction `taux` (TAUX_PROFIL par défaut) des appels, tirés au hasard,
+    passe sous cProfile et ses statistiques sont écrites dans REPERTOIRE/profils/ (lisibles avec pstats).
+    """
+    taux = TAUX_PROFIL if taux is None else taux
+    if not taux or random.random() >= taux:
+        return fonction(*args)
+    profil = cProfile.Profile()
+    try:
+        return profil.runcall(fonction, *args)
+    finally:
+        repertoire = os.path.join(REPERTOIRE, "profils")
+        os.makedirs(repertoire, exist_ok=True)
+        profil.dump_stats(os.path.join(repertoire, f"{getattr(fonction, '__name__', 'appel')}_{os.getpid()}_{time.time_ns()}.prof"))
+        compter("profils")
+
+# --- Écriture par processus et agrégation ---
+
+def ecrire_atomique(chemin, contenu):
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        f.write(contenu)
+    os.replace(temporaire, chemin)
+
+def sauvegarder():
+    """Écrit les mesures du processus dans REPERTOIRE/processus/<pid>.json (remplacé à chaque fois)."""
+    metriques.derniere_ecriture = time.monotonic()
+    repertoire = os.path.join(REPERTOIRE, "processus")
+    os.makedirs(repertoire, exist_ok=True)
+    ecrire_atomique(os.path.join(repertoire, f"{os.getpid()}.json"), json.dumps(metriques.instantane()))
+
+def reinitialiser():
+    """Oublie les mesures des exécutions précédentes (à appeler au début d'un run, dans le processus principal)."""
+    for chemin in glob.glob(os.path.join(REPERTOIRE, "processus", "*.json")):
+        os.remove(chemin)
+
+def percentile(comptes, p):
+    """Percentile estimé à partir d'un histogramme (interpolation linéaire dans la case qui le contient)."""
+    seuil = p * sum(comptes)
+    cumul = 0
+    for i, compte in enumerate(comptes):
+        if compte and cumul + compte >= seuil:
+            if i == len(BORNES):
+                return BORNES[-1]  # au-delà de la dernière borne
+            bas = BORNES[i - 1] if i else 0.0
+            return bas + (BORNES[i] - bas) * (seuil - cumul) / compte
+        cumul += compte
+    return None
+
+def agreger(instantanes):
+    """Résumé de tous les processus : histogrammes fusionnés par étape, compteurs et jauges par worker."""
+    etapes = {}
+    workers = {}
+    for inst in instantanes:
+        worker = workers.setdefault(str(inst["pid"]), {"compteurs": inst["compteurs"], "jauges": inst.get("jauges", {}),
+                                                       "etapes": {}})
+        for etape, h in inst["histogrammes"].items():
+            total = etapes.setdefault(etape, {"comptes": [0] * (len(BORNES) + 1), "somme": 0.0})
+            total["comptes"] = [a + b for a, b in zip(total["comptes"], h["comptes"])]
+            total["somme"] += h["somme"]
+            n = sum(h["comptes"])
+            worker["etapes"][etape] = {"n": n, "somme": h["somme"], "moyenne": h["somme"] / n if n else None}
+    resume = {}
+    for etape, h in sorted(etapes.items()):
+        n = sum(h["comptes"])
+        erreurs = sum(inst["compteurs"].get("erreurs", {}).get(etape, 0) for inst in instantanes)
+        resume[etape] = {"n": n, "erreurs": erreurs, "somme": h["somme"], "moyenne": h["somme"] / n if n else None,
+                         "p50": percentile(h["comptes"], 0.5), "p95": percentile(h["comptes"], 0.95),
+                         "comptes": h["comptes"]}
+    totaux = defaultdict(lambda: defaultdict(float))
+    for inst in instantanes:
+        for nom, par_etape in inst["compteurs"].items():
+            for etape, valeur in par_etape.items():
+                totaux[nom][etape] += valeur
+    return {"bornes": BORNES, "etapes": resume, "compteurs": {nom: dict(v) for nom, v in totaux.items()},
+            "workers": workers, "horodatage": time.time()}
+
+def etiquette(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_prometheus(resume):
+    """Format texte de Prometheus (collecteur textfile de node_exporter)."""
+    lignes = ["# HELP flashcore_duree_secondes Durée de chaque étape du pipeline.",
+              "# TYPE flashcore_duree_secondes histogram"]
+    for etape, r in resume["etapes"].items():
+        cumul = 0
+        for borne, compte in zip([*BORNES, "+Inf"], r["comptes"]):
+            cumul += compte
+            lignes.append(f'flashcore_duree_secondes_bucket{{etape="{etiquette(etape)}",le="{borne}"}} {cumul}')
+        lignes.append(f'flashcore_duree_secondes_sum{{etape="{etiquette(etape)}"}} {r["somme"]}')
+        lignes.append(f'flashcore_duree_secondes_count{{etape="{etiquette(etape)}"}} {r["n"]}')
+    noms = sorted({nom for w in resume["workers"].values() for nom in w["compteurs"]})
+    for nom in noms:
+        lignes.append(f"# TYPE flashcore_{nom}_total counter")
+        for pid, w in resume["workers"].items():
+            for etape, valeur in w["compteurs"].get(nom, {}).items():
+                lignes.append(f'flashcore_{nom}_total{{worker="{pid}",etape="{etiquette(etape)}"}} {valeur}')
+    for nom in sorted({nom for w in resume["workers"].values() for nom in w["jauges"]}):
+        lignes.append(f"# TYPE flashcore_{nom} gauge")
+        for pid, w in resume["workers"].items():
+            if nom in w["jauges"]:
+                lignes.append(f'flashcore_{nom}{{worker="{pid}"}} {w["jauges"][nom]["valeur"]}')
+    lignes.append("# HELP flashcore_worker_duree_secondes_total Temps passé par chaque worker dans chaque étape.")
+    lignes.append("# TYPE flashcore_worker_duree_secondes_total counter")
+    for pid, w in resume["workers"].items():
+        for etape, e in w["etapes"].items():
+            lignes.append(f'flashcore_worker_duree_secondes_total{{worker="{pid}",etape="{etiquette(etape)}"}} {e["somme"]}')
+    return "\n".join(lignes) + "\n"
+
+def exporter():
+    """
+    Fusionne les mesures de tous les processus (y compris le courant) et écrit
+    REPERTOIRE/resume.json et REPERTOIRE/flashcore.prom ; renvoie le résumé.
+    """
+    sauvegarder()
+    instantanes = []
+    for chemin in glob.glob(os.path.join(REPERTOIRE, "processus", "*.json")):
+        try:
+            with open(chemin, encoding="utf-8") as f:
+                instantanes.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    resume = agreger(instantanes)
+    ecrire_atomique(os.path.join(REPERTOIRE, "resume.json"), json.dumps(resume, ensure_ascii=False, indent=1))
+    ecrire_atomique(os.path.join(REPERTOIRE, "flashcore.prom"), format_prometheus(resume))
+    return resume
+
+def exporter_periodiquement(periode=PERIODE):
+    """Exporte toutes les `periode` secondes dans un thread ; renvoie la fonction d'arrêt (qui fait l'export final)."""
+    arret = threading.Event()
+
+    def boucle():
+        while not arret.wait(periode):
+            exporter()
+
+    threading.Thread(target=boucle, daemon=True).start()
+
+    def arreter():
+        arret.set()
+        return exporter()
+    return arreter
+
+def afficher(resume):
+    """Tableau lisible des étapes : nombre d'appels, erreurs, moyenne et percentiles (s)."""
+    print(f"{'étape':<32}{'n':>8}{'erreurs':>9}{'moyenne':>10}{'p50':>8}{'p95':>8}")
+    for etape, r in resume["etapes"].items():
+        print(f"{etape:<32}{r['n']:>8}{r['erreurs']:>9.0f}{r['moyenne']:>10.3f}{r['p50']:>8.3f}{r['p95']:>8.3f}")
+    for nom, par_etape in resume["compteurs"].items():
+        if nom != "erreurs":
+            print(f"{nom} : {sum(par_etape.values()):.0f}")
+    octets, mesurees = resume["compteurs"].get("octets", {}), resume["compteurs"].get("pages_mesurees", {})
+    if octets and sum(mesurees.values()):
+        print(f"reçu par page : {sum(octets.values()) / sum(mesurees.values()) / 1024:.0f} Ko "
+              f"({sum(mesurees.values()):.0f} pages mesurées)")
+    for pid, w in resume["workers"].items():
+        for nom, jauge in w["jauges"].items():
+            print(f"worker {pid} {nom} : {jauge['valeur']:.0f} (max {jauge['max']:.0f})")
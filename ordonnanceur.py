@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import queue
+import random
+import time
+from collections import deque
+
+from tqdm import tqdm
+
+from metriques import compter
+
+
+class Seau:
+    """Limiteur de débit à jetons : `debit` requêtes par seconde, rafales jusqu'à `capacite`."""
+
+    def __init__(self, debit, capacite=None):
+        self.debit = debit
+        self.capacite = capacite or max(1.0, debit)
+        self.jetons = self.capacite
+        self.dernier = time.monotonic()
+
+    def remplir(self):
+        maintenant = time.monotonic()
+        self.jetons = min(self.capacite, self.jetons + (maintenant - self.dernier) * self.debit)
+        self.dernier = maintenant
+
+    def attente(self):
+        """Secondes avant qu'un jeton soit disponible (0 si disponible)."""
+        self.remplir()
+        return 0.0 if self.jetons >= 1 else (1 - self.jetons) / self.debit
+
+    def prendre(self):
+        self.jetons -= 1
+
+class Tache:
+    def __init__(self, cle, fonction, args, priorite=0, hote=None, valider=None):
+        self.cle = cle
+        self.fonction = fonction
+        self.args = args
+        self.priorite = priorite
+        self.hote = hote
+        self.valider = valider
+        self.tentatives = 0
+
+class Ordonnanceur:
+    """
+    Distribue des tâches à un Pool de workers :
+      - par priorité croissante (0 = la plus urgente), puis dans l'ordre d'ajout
+      - avec un débit maximal global et par hôte (requêtes/s)
+      - en relançant les échecs (exception ou résultat refusé par `valider`) avec un délai
+        exponentiel et aléatoire, jusqu'à `tentatives` essais, puis en les rangeant dans `morts`
+      - en réduisant de moitié la concurrence quand le taux d'erreurs dépasse `seuil_erreurs`
+        sur les `fenetre` dernières tâches, et en la remontant d'une unité quand tout va bien.
+    """
+
+    def __init__(self, pool, concurrence_max=10, concurrence_min=1, debit_global=5.0, debit_par_hote=2.0,
+                 tentatives=4, delai_base=2.0, delai_max=120.0, seuil_erreurs=0.3, fenetre=20):
+        self.pool = pool
+        self.concurrence_max = concurrence_max
+        self.concurrence_min = concurrence_min
+        self.concurrence = concurrence_max
+        self.seau_global = Seau(debit_global) if debit_global else None
+        self.debit_par_hote = debit_par_hote
+        self.seaux_hotes = {}
+        self.tentatives = tentatives
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self.seuil_erreurs = seuil_erreurs
+        self.issues = deque(maxlen=fenetre)
+        self.depuis_ajustement = 0
+
+        self.compteur = itertools.count()
+        self.prets = {}      # hôte -> tas (priorite, ordre, tache) ; une file par hôte
+        self.differes = []   # (instant de reprise, ordre, tache)
+        self.terminees = queue.Queue()
+        self.en_cours = 0
+        self.morts = []      # (tache, dernière erreur, dernier résultat)
+        self.relances = 0
+        self.barre = tqdm(total=0, desc="Extraction en parallèle")
+
+    def ajouter(self, cle, fonction, args, priorite=0, hote=None, valider=None):
+        """Ajoute une tâche fonction(*args) ; `valider(resultat)` faux signifie un échec à relancer."""
+        self.mettre_prete(Tache(cle, fonction, args, priorite, hote, valider))
+        self.barre.total += 1
+        self.barre.refresh()
+
+    def seau_hote(self, hote):
+        if hote is None or not self.debit_par_hote:
+            return None
+        if hote not in self.seaux_hotes:
+            self.seaux_hotes[hote] = Seau(self.debit_par_hote)
+        return self.seaux_hotes[hote]
+
+    def mettre_prete(self, tache):
+        heapq.heappush(self.prets.setdefault(tache.hote, []), (tache.priorite, next(self.compteur), tache))
+
+    def nb_pretes(self):
+        return sum(len(file) for file in self.prets.values())
+
+    def reprendre_differes(self):
+        maintenant = time.monotonic()
+        while self.differes and self.differes[0][0] <= maintenant:
+            _, _, tache = heapq.heappop(self.differes)
+            self.mettre_prete(tache)
+
+    def choisir(self):
+        """
+        Hôte dont la tâche en tête est la plus prioritaire parmi ceux qui ont un jeton disponible,
+        et sinon l'attente avant le prochain jeton. Les tâches d'un hôte limité restent dans sa file :
+        elles ne repassent pas par `differes`, ce qui garde chaque lancement en O(log N).
+        """
+        meilleur, attente = None, None
+        for hote, file in self.prets.items():
+            if not file:
+                continue
+            seau = self.seau_hote(hote)
+            delai = seau.attente() if seau is not None else 0.0
+            if delai > 0:
+                attente = delai if attente is None else min(attente, delai)
+            elif meilleur is None or file[0] < self.prets[meilleur][0]:
+                meilleur = hote
+        return meilleur, attente
+
+    def distribuer(self):
+        """Lance des tâches tant que la concurrence et les débits le permettent ; renvoie l'attente conseillée."""
+        self.reprendre_differes()
+        attente_hote = None
+        while self.en_cours < self.concurrence:
+            hote, attente_hote = self.choisir()
+            if hote is None:
+                break
+            if self.seau_global is not None:
+                attente = self.seau_global.attente()
+                if attente > 0:
+                    return attente
+            _, _, tache = heapq.heappop(self.prets[hote])
+            seau = self.seau_hote(hote)
+            if self.seau_global is not None:
+                self.seau_global.prendre()
+            if seau is not None:
+                seau.prendre()
+            tache.tentatives += 1
+            self.en_cours += 1
+            self.pool.apply_async(tache.fonction, tache.args,
+                                  callback=lambda r, t=tache: self.terminees.put((t, r, None)),
+                                  error_callback=lambda e, t=tache: self.terminees.put((t, None, e)))
+        attentes = [attente_hote] if attente_hote is not None else []
+        if self.differes:
+            attentes.append(max(0.0, self.differes[0][0] - time.monotonic()))
+        return min(attentes) if attentes else None
+
+    def ajuster(self, succes):
+        """Ajustement de la concurrence (réduction multiplicative, augmentation additive)."""
+        self.issues.append(succes)
+        self.depuis_ajustement += 1
+        if self.depuis_ajustement < self.issues.maxlen:
+            return
+        taux_erreurs = self.issues.count(False) / len(self.issues)
+        if taux_erreurs > self.seuil_erreurs and self.concurrence > self.concurrence_min:
+            self.concurrence = max(self.concurrence_min, self.concurrence // 2)
+            print(f"Taux d'erreurs {taux_erreurs:.0%} : concurrence réduite à {self.concurrence}")
+            self.depuis_ajustement = 0
+        elif taux_erreurs == 0 and self.concurrence < self.concurrence_max:
+            self.concurrence += 1
+            self.depuis_ajustement = 0
+
+    def delai(self, tentative):
+        """Délai avant la tentative suivante : exponentiel, plafonné, avec gigue aléatoire."""
+        return random.uniform(0, min(self.delai_max, self.delai_base * 2 ** (tentative - 1)))
+
+    def executer(self, sur_resultat=None, sur_echec=None):
+        """
+        Traite toutes les tâches (y compris celles ajoutées pendant l'exécution, ex: par sur_resultat).
+        sur_resultat(tache, resultat) est appelé à chaque succès, sur_echec(tache, erreur, resultat)
+        quand une tâche a épuisé ses tentatives.
+        """
+        while self.nb_pretes() or self.differes or self.en_cours:
+            attente = self.distribuer()
+            try:
+                tache, resultat, erreur = self.terminees.get(timeout=attente if attente is not None else 1.0)
+            except queue.Empty:
+                continue
+            self.en_cours -= 1
+            if erreur is None and tache.valider is not None and not tache.valider(resultat):
+                erreur = "résultat incomplet"
+            self.ajuster(erreur is None)
+            if erreur is None:
+                self.barre.update(1)
+                if sur_resultat is not None:
+                    sur_resultat(tache, resultat)
+            elif tache.tentatives < self.tentatives:
+                self.relances += 1
+                compter("relances", getattr(tache.fonction, "__name__", ""))
+                heapq.heappush(self.differes, (time.monotonic() + self.delai(tache.tentatives), next(self.compteur), tache))
+            else:
+                self.barre.update(1)
+                compter("abandons", getattr(tache.fonction, "__name__", ""))
+                self.morts.append((tache, erreur, resultat))
+                if sur_echec is not None:
+                    sur_echec(tache, erreur, resultat)
+        self.barre.close()
+        print(f"{self.relances} relances, {len(self.morts)} tâches abandonnées, concurrence finale {self.concurrence}")
+        return self.morts
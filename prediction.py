@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+
+from dataset import FEATURES, TAILLE_CHUNK, matrice_features
+from forme import MoteurForme, avant_match
+from ia import FootballNet, NB_THREADS
+
+
+CHEMIN_MODELE = os.environ.get("IA_MODELE", "modele.pt")
+TAILLE_BATCH = 256  # matchs regroupés par passe avant en mode flux / CSV
+# Ordre des classes en sortie (resultat -1, 0, 1 décalé de +1 à l'entraînement)
+CLASSES = ["proba_home", "proba_nul", "proba_away"]
+
+
+class ModeleComplet(nn.Module):
+    """
+    FootballNet précédé de la normalisation (moyenne et écart-type du StandardScaler, gardés en buffers)
+    et suivi du softmax : une seule opération des features brutes aux probabilités.
+    Une feature manquante (NaN) est remplacée par la moyenne du train.
+    """
+
+    def __init__(self, input_dim, hidden_dim, output_dim=3, dropout_rate=0.5):
+        super().__init__()
+        self.reseau = FootballNet(input_dim, hidden_dim, output_dim, dropout_rate)
+        self.register_buffer("moyenne", torch.zeros(input_dim))
+        self.register_buffer("echelle", torch.ones(input_dim))
+
+    def forward(self, x):
+        x = torch.nan_to_num((x - self.moyenne) / self.echelle)
+        return torch.softmax(self.reseau(x), dim=1)
+
+
+def sauvegarder_modele(model, scaler, chemin=CHEMIN_MODELE, features=FEATURES, torchscript=False):
+    """
+    Écrit l'artefact d'inférence : poids du réseau, paramètres du scaler et hyperparamètres.
+    Avec torchscript=True, écrit aussi <chemin>.ts, chargeable sans le code Python du modèle.
+    """
+    complet = ModeleComplet(model.fc1.in_features, model.fc1.out_features, model.fc3.out_features, model.dropout.p)
+    complet.reseau.load_state_dict(model.state_dict())
+    complet.moyenne.copy_(torch.as_tensor(scaler.mean_, dtype=torch.float32))
+    complet.echelle.copy_(torch.as_tensor(scaler.scale_, dtype=torch.float32))
+    torch.save({"features": list(features),
+                "hidden_dim": complet.reseau.fc1.out_features,
+                "output_dim": complet.reseau.fc3.out_features,
+                "dropout_rate": complet.reseau.dropout.p,
+                "etat": complet.state_dict()}, chemin)
+    if torchscript:
+        complet.eval()
+        torch.jit.script(complet).save(chemin + ".ts", _extra_files={"features.json": json.dumps(list(features))})
+
+def charger_modele(chemin=CHEMIN_MODELE):
+    """Renvoie (module en mode évaluation, features) depuis un artefact .pt ou un export TorchScript .ts."""
+    if chemin.endswith(".ts"):
+        extra = {"features.json": ""}
+        module = torch.jit.load(chemin, _extra_files=extra)
+        return module.eval(), json.loads(extra["features.json"])
+    artefact = torch.load(chemin, weights_only=True)
+    module = ModeleComplet(len(artefact["features"]), artefact["hidden_dim"], artefact["output_dim"], artefact["dropout_rate"])
+    module.load_state_dict(artefact["etat"])
+    return module.eval(), artefact["features"]
+
+
+class Predicteur:
+    """
+    Modèle chargé une seule fois et gardé en mémoire : chaque appel ne coûte que la passe avant.
+    Accepte un match (dict), une matrice, un DataFrame, un CSV ou un flux de matchs.
+    """
+
+    def __init__(self, chemin=CHEMIN_MODELE, taille_batch=TAILLE_BATCH):
+        self.module, self.features = charger_modele(chemin)
+        self.taille_batch = taille_batch
+
+    def predire(self, X):
+        """Probabilités (n x 3) pour une matrice de features brutes (colonnes dans l'ordre de self.features)."""
+        with torch.inference_mode():
+            return self.module(torch.as_tensor(np.asarray(X, dtype=np.float32))).numpy()
+
+    def predire_match(self, match):
+        """Un match (dict colonne -> valeur) : renvoie {classe: probabilité}."""
+        return dict(zip(CLASSES, self.predire(self.ligne_match(match))[0].tolist()))
+
+    def ligne_match(self, match):
+        """Ligne de features d'un seul match, sans passer par un DataFrame (valeur absente ou non numérique -> NaN)."""
+        ligne = np.full((1, len(self.features)), np.nan, dtype=np.float32)
+        for i, colonne in enumerate(self.features):
+            try:
+                ligne[0, i] = float(match[colonne])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return ligne
+
+    def predire_dataframe(self, df):
+        """Ajoute les colonnes de probabilités à un DataFrame contenant les features."""
+        probas = self.predire(matrice_features(df, self.features))
+        return df.assign(**{classe: probas[:, i] for i, classe in enumerate(CLASSES)})
+
+    def predire_csv(self, entree, sortie, taille_chunk=TAILLE_CHUNK):
+        """Prédit un CSV de matchs morceau par morceau et écrit le résultat (mémoire constante)."""
+        for i, morceau in enumerate(pd.read_csv(entree, chunksize=taille_chunk)):
+            self.predire_dataframe(morceau).to_csv(sortie, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+    def predire_flux(self, matchs):
+        """Itère sur des matchs (dicts) et renvoie leurs probabilités dans l'ordre, par paquets de taille_batch."""
+        paquet = []
+        for match in matchs:
+            paquet.append(match)
+            if len(paquet) == self.taille_batch:
+                yield from self.predire_paquet(paquet)
+                paquet = []
+        if paquet:
+            yield from self.predire_paquet(paquet)
+
+    def predire_paquet(self, matchs):
+        probas = self.predire(matrice_features(pd.DataFrame(matchs), self.features))
+        return [dict(zip(CLASSES, ligne)) for ligne in probas.tolist()]
+
+    def predire_affiche(self, moteur, home, away, date):
+        """
+        Match à venir, pour un modèle entraîné sur la forme (IA_FEATURES=forme) : features d'avant-match
+        calculées avec l'état `moteur` (forme.MoteurForme) ; renvoie {classe: probabilité} et les features.
+        """
+        caracteristiques = avant_match(moteur, home, away, date)
+        return self.predire_match(caracteristiques), caracteristiques
+
+
+if __name__ == "__main__":
+    # Usage :
+    #   python prediction.py matchs.csv [predictions.csv]   CSV avec les colonnes features
+    #   python prediction.py - [taille_batch]               un match JSON par ligne sur stdin -> JSON sur stdout
+    #                                                       (taille_batch=1 pour répondre ligne par ligne)
+    #   python prediction.py affiche forme_laliga2.etat <équipe home> <équipe away> "2025-01-18 20:00" (UTC)
+    #                                                       match à venir (modèle entraîné sur la forme)
+    if len(sys.argv) < 2 or (sys.argv[1] == "affiche" and len(sys.argv) < 6):
+        sys.exit("Usage : python prediction.py matchs.csv [predictions.csv] | - [taille_batch] | "
+                 "affiche <état forme> <équipe home> <équipe away> <date UTC>")
+    torch.set_num_threads(NB_THREADS)
+    predicteur = Predicteur()
+    if sys.argv[1] == "affiche":
+        probas, caracteristiques = predicteur.predire_affiche(MoteurForme.charger(sys.argv[2]), *sys.argv[3:6])
+        print(f"historique : {caracteristiques['home_matchs']:.0f} matchs (home), {caracteristiques['away_matchs']:.0f} (away)")
+        print(json.dumps(probas))
+    elif sys.argv[1] == "-":
+        predicteur.taille_batch = int(sys.argv[2]) if len(sys.argv) > 2 else TAILLE_BATCH
+        for probas in predicteur.predire_flux(json.loads(ligne) for ligne in sys.stdin if ligne.strip()):
+            print(json.dumps(probas), flush=True)
+    else:
+        predicteur.predire_csv(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "predictions.csv")
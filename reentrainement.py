@@ -0,0 +1,218 @@
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from torch import nn
+from sklearn.preprocessing import StandardScaler
+
+from dataset import charger_colonnes, charger_dataset, repertoire_dataset
+from ia import (BATCH_SIZE, DONNEES, JEU_FEATURES, JEUX_FEATURES, NB_THREADS, ChargeurTenseurs, FootballNet,
+                creer_optimiseur, entrainer_epoque, evaluer)
+from match_ids import id_match
+from prediction import CHEMIN_MODELE, sauvegarder_modele
+
+
+# --- Paramètres ---
+CHEMIN_POINT = os.environ.get("IA_POINT_REPRISE", "point_reprise.pt")
+EPOQUES_COMPLETES = 150    # entraînement depuis zéro (comme ia.py)
+EPOQUES_INCREMENTALES = 20
+RATIO_REJEU = 4            # anciennes lignes rejouées par nouvelle ligne (limite l'oubli des anciens matchs)
+PART_TEST = 0.2
+TOLERANCE = 0.01           # perte de précision admise face à un réentraînement complet
+HIDDEN_DIM, LR, WEIGHT_DECAY = 32, 1e-4, 1e-4
+
+
+def identifiants(chemin=DONNEES):
+    """id_match de chaque ligne du jeu de données (href à défaut), dans l'ordre des lignes de charger_dataset."""
+    hrefs = charger_colonnes(repertoire_dataset(chemin), ["href"])["href"]
+    return np.array([id_match(href) or href for href in hrefs], dtype=object)
+
+def masque_test(ids):
+    """
+    Lignes de test : tirage fixé par match (empreinte de son id_match), pas par position. Un match de test
+    le reste quand des lignes sont ajoutées ou insérées n'importe où dans les données (export du store
+    dans l'ordre des href) : il ne sert jamais à l'entraînement, quel que soit le nombre de réentraînements.
+    """
+    empreintes = np.array([int.from_bytes(hashlib.blake2b(str(i).encode(), digest_size=8).digest(), "big")
+                           for i in ids], dtype=np.uint64)
+    return empreintes / 2.0 ** 64 < PART_TEST
+
+def tenseurs(X, y, scaler):
+    return (torch.as_tensor(scaler.transform(X), dtype=torch.float32),
+            torch.as_tensor(y.astype(np.int64) + 1, dtype=torch.long))
+
+def entrainer(model, optimizer, X, y, epoques):
+    train_loader = ChargeurTenseurs(X, y, batch_size=BATCH_SIZE, shuffle=True)
+    criterion = nn.CrossEntropyLoss()
+    for _ in range(epoques):
+        entrainer_epoque(model, train_loader, criterion, optimizer)
+
+def recaler(model, ancienne_moyenne, ancienne_echelle, scaler):
+    """
+    Reporte le changement de normalisation dans la première couche : le réseau calcule exactement
+    la même fonction des features brutes avec le scaler mis à jour qu'avec l'ancien.
+    """
+    rapport = torch.as_tensor(scaler.scale_ / ancienne_echelle, dtype=torch.float32)
+    decalage = torch.as_tensor((scaler.mean_ - ancienne_moyenne) / ancienne_echelle, dtype=torch.float32)
+    with torch.no_grad():
+        model.fc1.bias += model.fc1.weight @ decalage
+        model.fc1.weight *= rapport
+
+class PointReprise:
+    """
+    État complet d'un entraînement : poids du réseau, état de l'optimiseur (moments d'Adam),
+    statistiques cumulées du scaler et identifiants des matchs déjà pris en compte.
+    """
+
+    def __init__(self, features, hidden_dim=HIDDEN_DIM, lr=LR, weight_decay=WEIGHT_DECAY):
+        self.features = list(features)
+        self.model = FootballNet(len(features), hidden_dim, 3)
+        self.optimizer = creer_optimiseur(self.model, lr=lr, weight_decay=weight_decay)
+        self.scaler = StandardScaler()
+        self.ids_vus = set()
+
+    def precision(self, X, y, masque):
+        X_test, y_test = tenseurs(X[masque], y[masque], self.scaler)
+        return evaluer(self.model, X_test, y_test)
+
+    def sauvegarder(self, chemin=CHEMIN_POINT):
+        torch.save({"features": self.features,
+                    "hidden_dim": self.model.fc1.out_features,
+                    "modele": self.model.state_dict(),
+                    "optimiseur": self.optimizer.state_dict(),
+                    "scaler": {"moyenne": torch.as_tensor(self.scaler.mean_), "variance": torch.as_tensor(self.scaler.var_),
+                               "echelle": torch.as_tensor(self.scaler.scale_),
+                               "n": torch.as_tensor(self.scaler.n_samples_seen_)},
+                    "ids_vus": sorted(self.ids_vus)}, chemin)
+
+    @classmethod
+    def charger(cls, chemin=CHEMIN_POINT):
+        etat = torch.load(chemin, weights_only=True)
+        if "ids_vus" not in etat:
+            raise ValueError(f"{chemin} ne contient pas les identifiants des matchs vus : entraînement complet nécessaire")
+        point = cls(etat["features"], etat["hidden_dim"])
+        point.model.load_state_dict(etat["modele"])
+        point.optimizer.load_state_dict(etat["optimiseur"])
+        scaler = etat["scaler"]
+        point.scaler.mean_ = scaler["moyenne"].numpy()
+        point.scaler.var_ = scaler["variance"].numpy()
+        point.scaler.scale_ = scaler["echelle"].numpy()
+        n = scaler["n"].numpy()
+        point.scaler.n_samples_seen_ = n[()] if n.ndim == 0 else n
+        point.scaler.n_features_in_ = len(point.features)
+        point.ids_vus = set(etat["ids_vus"])
+        return point
+
+def entrainement_complet(X, y, ids, features, epoques=EPOQUES_COMPLETES, graine=0):
+    """Entraînement depuis zéro sur toutes les lignes d'entraînement ; renvoie le point de reprise."""
+    torch.manual_seed(graine)
+    point = PointReprise(features)
+    entrainement = ~masque_test(ids)
+    point.scaler.fit(X[entrainement])
+    point.model.train()
+    entrainer(point.model, point.optimizer, *tenseurs(X[entrainement], y[entrainement], point.scaler), epoques)
+    point.ids_vus = set(ids)
+    return point
+
+def affiner(point, X, y, ids, epoques=EPOQUES_INCREMENTALES, ratio_rejeu=RATIO_REJEU, graine=0):
+    """
+    Reprise de l'entraînement sur les matchs absents de point.ids_vus (où qu'ils soient dans les données)
+    et un échantillon d'anciens matchs : scaler mis à jour par partial_fit, première couche recalée,
+    optimiseur repris avec ses moments. Renvoie (nouvelles lignes, lignes rejouées).
+    """
+    vues = np.fromiter((i in point.ids_vus for i in ids), dtype=bool, count=len(ids))
+    entrainement = ~masque_test(ids)
+    index = np.arange(len(y))
+    nouvelles = index[~vues & entrainement]
+    anciennes = index[vues & entrainement]
+    if len(nouvelles) == 0:
+        point.ids_vus.update(ids)
+        return 0, 0
+    rng = np.random.default_rng(graine)
+    rejouees = rng.choice(anciennes, min(len(anciennes), ratio_rejeu * len(nouvelles)), replace=False)
+
+    ancienne_moyenne, ancienne_echelle = point.scaler.mean_.copy(), point.scaler.scale_.copy()
+    point.scaler.partial_fit(X[nouvelles])
+    recaler(point.model, ancienne_moyenne, ancienne_echelle, point.scaler)
+
+    torch.manual_seed(graine)
+    lignes = np.concatenate([nouvelles, rejouees])
+    entrainer(point.model, point.optimizer, *tenseurs(X[lignes], y[lignes], point.scaler), epoques)
+    point.ids_vus.update(ids)
+    return len(nouvelles), len(rejouees)
+
+def rapport(incremental, complet, X, y, ids):
+    """Précision des deux modèles sur les lignes de test ; la précision incrémentale est-elle tenue ?"""
+    masque = masque_test(ids)
+    precision_incrementale = incremental.precision(X, y, masque)
+    precision_complete = complet.precision(X, y, masque)
+    tenue = precision_incrementale >= precision_complete - TOLERANCE
+    print(f"précision incrémentale {precision_incrementale:.2%}, réentraînement complet {precision_complete:.2%} "
+          f"-> {'tenue' if tenue else 'dégradée : entraînement complet conseillé'} (tolérance {TOLERANCE:.0%})")
+    return {"incremental": precision_incrementale, "complet": precision_complete, "tenue": tenue}
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, time.perf_counter() - debut
+
+def publier(point, chemin_point=CHEMIN_POINT):
+    """Écrit le point de reprise et l'artefact d'inférence de prediction.py."""
+    point.sauvegarder(chemin_point)
+    sauvegarder_modele(point.model, point.scaler, CHEMIN_MODELE, point.features, torchscript=True)
+
+
+if __name__ == "__main__":
+    # Usage : python reentrainement.py [incremental | complet | comparer | simuler [fraction]]
+    #   incremental (défaut) : reprise depuis IA_POINT_REPRISE sur les matchs nouveaux de IA_DONNEES
+    #   complet              : entraînement depuis zéro, crée le point de reprise
+    #   comparer             : incrémental puis réentraînement complet, comparaison des précisions ; publie
+    #                          le modèle incrémental si sa précision est tenue, le modèle complet sinon
+    #   simuler              : rejoue l'historique (complet sur les premières lignes, incrémental sur la fin)
+    torch.set_num_threads(NB_THREADS)
+    mode = sys.argv[1] if len(sys.argv) > 1 else "incremental"
+    features = JEUX_FEATURES[JEU_FEATURES]
+    X, y = charger_dataset(DONNEES, features)
+    X, y = np.asarray(X), np.asarray(y)
+    ids = identifiants(DONNEES)
+    masque = masque_test(ids)
+
+    if mode == "complet":
+        point, duree = chronometrer(entrainement_complet, X, y, ids, features)
+        print(f"Entraînement complet ({len(y)} lignes) en {duree:.1f} s, précision {point.precision(X, y, masque):.2%}")
+        publier(point)
+    elif mode in ("incremental", "comparer"):
+        if not os.path.exists(CHEMIN_POINT):
+            sys.exit(f"Pas de point de reprise {CHEMIN_POINT} : lancez d'abord python reentrainement.py complet")
+        try:
+            point = PointReprise.charger(CHEMIN_POINT)
+        except ValueError as e:
+            sys.exit(str(e))
+        if point.features != list(features):
+            sys.exit("Les features du point de reprise diffèrent de IA_FEATURES : entraînement complet nécessaire")
+        avant = point.precision(X, y, masque)
+        (nouvelles, rejouees), duree = chronometrer(affiner, point, X, y, ids)
+        print(f"{nouvelles} nouvelles lignes + {rejouees} rejouées en {duree:.1f} s, "
+              f"précision {avant:.2%} -> {point.precision(X, y, masque):.2%}")
+        if mode == "comparer":
+            complet, duree = chronometrer(entrainement_complet, X, y, ids, features)
+            print(f"Réentraînement complet en {duree:.1f} s")
+            if not rapport(point, complet, X, y, ids)["tenue"]:
+                print("Publication du modèle complet")
+                point = complet
+        publier(point)
+    elif mode == "simuler":
+        fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+        coupe = int(len(y) * fraction)
+        point, duree = chronometrer(entrainement_complet, X[:coupe], y[:coupe], ids[:coupe], features)
+        print(f"Historique : {coupe} lignes, entraînement complet en {duree:.1f} s")
+        (nouvelles, rejouees), duree_incrementale = chronometrer(affiner, point, X, y, ids)
+        print(f"Ajout de {len(y) - coupe} lignes : {nouvelles} nouvelles + {rejouees} rejouées en {duree_incrementale:.1f} s")
+        complet, duree_complete = chronometrer(entrainement_complet, X, y, ids, features)
+        print(f"Réentraînement complet en {duree_complete:.1f} s (x{duree_complete / duree_incrementale:.0f})")
+        rapport(point, complet, X, y, ids)
+    else:
+        sys.exit(f"Mode inconnu : {mode}")
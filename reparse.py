@@ -0,0 +1,79 @@
+import os
+import sys
+from multiprocessing import Pool
+
+import pandas as pd
+from lxml import html as lxml_html
+from tqdm import tqdm
+
+import extraction_js
+from archive import ArchivePages
+from competitions import COMPETITIONS
+from match_ids import id_equipe
+
+
+# Mêmes éléments que SCRIPT_EXTRACTION, en XPath
+XPATH_SCORE = "//div[contains(concat(' ', normalize-space(@class), ' '), ' detailScore__wrapper ')]"
+XPATH_STATS = '//div[@data-testid="wcl-statistics"]'
+XPATH_CELLULES = './/*[@data-testid="wcl-scores-simpleText-01"]'
+XPATH_MI_TEMPS = '//*[starts-with(@data-testid, "wcl-scores-overline-02")]'
+XPATH_EQUIPE = "//*[contains(concat(' ', normalize-space(@class), ' '), ' duelParticipant__{cote} ')]//a/@href"
+XPATH_DEBUT = "//*[contains(concat(' ', normalize-space(@class), ' '), ' duelParticipant__startTime ')]"
+
+archive = None
+
+
+def texte(element):
+    return " ".join(element.text_content().split())
+
+def lire_page(page):
+    """Équivalent hors ligne de extraction_js.lire_page sur du HTML archivé."""
+    arbre = lxml_html.fromstring(page)
+    wrappers = arbre.xpath(XPATH_SCORE)
+    debut = arbre.xpath(XPATH_DEBUT)
+    return {
+        "score": [texte(span) for span in wrappers[0].iter("span")] if wrappers else None,
+        "stats": [[texte(cellule) for cellule in row.xpath(XPATH_CELLULES)] for row in arbre.xpath(XPATH_STATS)],
+        # Le navigateur affiche ces libellés en majuscules (CSS) : on fait de même pour le test "MI"
+        "mi_temps": [texte(element).upper() for element in arbre.xpath(XPATH_MI_TEMPS)],
+        "equipes": [next((lien for lien in arbre.xpath(XPATH_EQUIPE.format(cote=cote)) if id_equipe(lien)), None)
+                    for cote in ("home", "away")],
+        "date": texte(debut[0]) if debut else None,
+    }
+
+def init_reparse(repertoire):
+    global archive
+    archive = ArchivePages(repertoire)
+
+def reparser_match(match):
+    """
+    Reconstruit le dictionnaire de résultats de process_match à partir des pages archivées,
+    avec le schéma des statistiques de la compétition du match (mêmes colonnes qu'en direct).
+    """
+    saison, href, nom, vues = match
+    config = COMPETITIONS.get(nom) or {}
+    result = {"saison": saison, "href": href, "competition": nom,
+              "score_equipe_home": None, "score_equipe_away": None,
+              "score_mi_temps_home": None, "score_mi_temps_away": None}
+    if "resume" in vues:
+        extraction_js.remplir_mi_temps(result, lire_page(archive.lire(vues["resume"])))
+    if "statistiques" in vues:
+        donnees = lire_page(archive.lire(vues["statistiques"]))
+        extraction_js.remplir_score(result, donnees)
+        extraction_js.remplir_stats(result, donnees, config.get("stats"))
+        extraction_js.remplir_equipes(result, donnees)
+    return result
+
+def reparser(repertoire="archive", sortie="extraction_reparse.csv", processus=None):
+    """Reconstruit toutes les lignes de résultats depuis l'archive, en parallèle sur tous les cœurs, sans navigateur."""
+    base = ArchivePages(repertoire)
+    matchs = base.matchs()
+    base.fermer()
+    with Pool(processes=processus or os.cpu_count(), initializer=init_reparse, initargs=(repertoire,)) as pool:
+        results = list(tqdm(pool.imap(reparser_match, matchs, chunksize=64), total=len(matchs), desc="Relecture de l'archive"))
+    df = pd.DataFrame(results)
+    df.to_csv(sortie, index=False)
+    return df
+
+if __name__ == "__main__":
+    reparser(*sys.argv[1:2])
@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from match_ids import id_match, url_match
+
+
+# Valeur manquante dans une colonne entière (int8) ; les statistiques sont toujours positives
+MANQUANT = -1
+MAX_INT8 = int(np.iinfo(np.int8).max)
+POURCENTAGE = re.compile(r"(\d+(?:\.\d+)?)%")
+# Stockage de chaque conversion dans un enregistrement
+TYPES = {"entier": np.int8, "possession": np.float32, "passes": np.float32}
+# Colonnes de score, présentes pour toutes les compétitions
+COLONNES_SCORE = ["score_equipe_home", "score_equipe_away", "score_mi_temps_home", "score_mi_temps_away"]
+# Identification d'un match dans un enregistrement (octets de taille fixe), puis équipes et date
+# (vides / NaT pour les matchs extraits avant leur ajout)
+CHAMPS_CLES = [("competition", "S16"), ("saison", "S9"), ("id_match", "S12"),
+               ("equipe_home", "S12"), ("equipe_away", "S12"), ("date_match", "datetime64[m]")]
+# Taille (octets) des champs clés textuels : numpy tronquerait sans erreur une valeur plus longue
+TAILLES_CLES = {nom: np.dtype(type_champ).itemsize for nom, type_champ in CHAMPS_CLES if type_champ.startswith("S")}
+
+# --- Catégories de statistiques retenues en football ---
+# colonne -> (conversion, libellés affichés par Flashscore, anciens compris) ; la casse est ignorée.
+# Les autres catégories (tacles, xG, centres...) ne sont pas extraites.
+CATEGORIES_FOOTBALL = {
+    "Possession_de_balle": ("possession", ["Possession de balle", "Possession"]),
+    "Tirs_au_but": ("entier", ["Tirs au but", "Total des tirs"]),
+    "Tirs_cadrés": ("entier", ["Tirs cadrés"]),
+    "Tirs_non_cadrés": ("entier", ["Tirs non cadrés"]),
+    "Tirs_bloqués": ("entier", ["Tirs bloqués"]),
+    "Corners": ("entier", ["Corners", "Corner"]),
+    "Sauvetages_du_gardien": ("entier", ["Sauvetages du gardien", "Arrêts du gardien"]),
+    "Coup_francs": ("entier", ["Coup francs", "Coups francs"]),
+    "Hors-jeu": ("entier", ["Hors-jeu", "Hors-jeux"]),
+    "Fautes": ("entier", ["Fautes"]),
+    "Cartons_Jaunes": ("entier", ["Cartons jaunes"]),
+    "Cartons_Rouges": ("entier", ["Cartons rouges"]),
+    "Passes": ("passes", ["Passes", "Passes réussies"]),
+}
+
+
+def octets(nom, valeur):
+    """Valeur d'un champ clé textuel en octets ; ValueError si elle ne tient pas dans le champ (TAILLES_CLES)."""
+    donnees = str(valeur or "").encode()
+    if len(donnees) > TAILLES_CLES[nom]:
+        raise ValueError(f"{nom} {valeur!r} : {len(donnees)} octets, le champ de l'enregistrement en a {TAILLES_CLES[nom]}")
+    return donnees
+
+def normaliser(libelle):
+    return " ".join(libelle.lower().split())
+
+def convertir(conversion, texte):
+    """
+    Valeur typée d'une statistique lue sur la page :
+      "entier"     : "12" -> 12 (MANQUANT si absent ou hors de l'int8)
+      "possession" : "52%" -> 0.52
+      "passes"     : "81% (300/370)" -> 0.81
+    """
+    if conversion == "entier":
+        try:
+            valeur = int(texte)
+        except (TypeError, ValueError):
+            try:
+                valeur = int(float(texte))
+            except (TypeError, ValueError):
+                return MANQUANT
+        return valeur if 0 <= valeur <= MAX_INT8 else MANQUANT
+    trouve = POURCENTAGE.search(texte) if isinstance(texte, str) else None
+    return float(trouve.group(1)) / 100 if trouve else np.nan
+
+class SchemaStats:
+    """
+    Schéma fixe des résultats d'une compétition : chaque libellé de statistique (ou l'un de ses alias)
+    est rangé dans sa colonne <colonne>_home / <colonne>_away, les catégories non déclarées sont ignorées
+    dès l'extraction. Définit aussi l'enregistrement de taille fixe d'un match (tableau numpy structuré :
+    clés en octets, statistiques en int8/float32).
+    """
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.index = {normaliser(libelle): colonne
+                      for colonne, (_, libelles) in categories.items() for libelle in [colonne.replace("_", " ")] + libelles}
+        self.conversions = {**{col: "entier" for col in COLONNES_SCORE},
+                            **{f"{colonne}_{cote}": conversion
+                               for colonne, (conversion, _) in categories.items() for cote in ("home", "away")}}
+        self.dtype = np.dtype(CHAMPS_CLES + [(col, TYPES[conversion]) for col, conversion in self.conversions.items()])
+        self.champs = list(self.conversions.items())
+
+    def colonne(self, libelle):
+        """Colonne (sans _home/_away) d'un libellé affiché, None si la catégorie n'est pas retenue."""
+        return self.index.get(normaliser(libelle))
+
+    def enregistrements(self, results):
+        """
+        Tableau structuré (une ligne de taille fixe par match) à partir des dictionnaires de résultats.
+        Une clé plus longue que son champ lève ValueError plutôt que d'être tronquée.
+        """
+        lignes = []
+        for result in results:
+            href = result.get("href")
+            lignes.append((octets("competition", result.get("competition")), octets("saison", result.get("saison")),
+                           octets("id_match", id_match(href)), octets("equipe_home", result.get("equipe_home")),
+                           octets("equipe_away", result.get("equipe_away")),
+                           np.datetime64(result.get("date_match") or "NaT", "m"),
+                           *[convertir(conversion, result.get(col)) for col, conversion in self.champs]))
+        return np.array(lignes, dtype=self.dtype)
+
+def lire_enregistrements(source):
+    """
+    DataFrame des résultats à partir d'enregistrements (fichier .npy ou tableau structuré) :
+    href canonique reconstruit, colonnes entières en int8, ou en float32 avec NaN si une valeur manque,
+    équipes absentes à None, date en datetime64 (NaT si absente).
+    """
+    tableau = np.load(source, mmap_mode="r") if isinstance(source, str) else source
+    colonnes = {"saison": np.char.decode(tableau["saison"]).astype(object),
+                "href": [url_match(identifiant) for identifiant in np.char.decode(tableau["id_match"])],
+                "competition": np.char.decode(tableau["competition"]).astype(object)}
+    for nom in ("equipe_home", "equipe_away"):
+        if nom in tableau.dtype.names:
+            equipes = np.char.decode(tableau[nom]).astype(object)
+            equipes[equipes == ""] = None
+            colonnes[nom] = equipes
+    if "date_match" in tableau.dtype.names:
+        colonnes["date_match"] = np.asarray(tableau["date_match"]).astype("datetime64[s]")
+    for nom in tableau.dtype.names:
+        if nom in dict(CHAMPS_CLES):
+            continue
+        valeurs = np.asarray(tableau[nom])
+        if valeurs.dtype == np.int8 and (valeurs == MANQUANT).any():
+            valeurs = np.where(valeurs == MANQUANT, np.nan, valeurs).astype(np.float32)
+        colonnes[nom] = valeurs
+    return pd.DataFrame(colonnes)
+
+def morceaux_enregistrements(chemin, taille_chunk):
+    """Parcourt un fichier d'enregistrements par DataFrames de taille_chunk lignes (projection mmap)."""
+    tableau = np.load(chemin, mmap_mode="r")
+    for debut in range(0, len(tableau), taille_chunk):
+        yield lire_enregistrements(tableau[debut:debut + taille_chunk])
+
+
+SCHEMA_FOOTBALL = SchemaStats(CATEGORIES_FOOTBALL)
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+# Catégories affichées sur les pages de match du site local (les dernières ne sont pas retenues par le schéma)
+CATEGORIES = ["Possession de balle", "Tirs au but", "Tirs cadrés", "Tirs non cadrés", "Tirs bloqués",
+              "Corners", "Sauvetages du gardien", "Coup francs", "Hors-jeu", "Fautes",
+              "Cartons Jaunes", "Passes", "Cartons Rouges", "Tacles", "Interceptions"]
+# Équipes des matchs du site local : (nom, identifiant)
+EQUIPES = [(f"equipe-{i}", hashlib.sha1(f"equipe{i}".encode()).hexdigest()[:8]) for i in range(20)]
+
+# Page de résultats : les matchs s'affichent par paquets de `taille`, le bouton "Montrer plus de matchs"
+# ajoute le paquet suivant après `delai` ms puis disparaît quand tout est affiché (comme sur Flashscore)
+PAGE_RESULTATS = """<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>
+<div class="sportName {sport}" id="liste"></div>
+<a class="event__more event__more--static" href="#" id="plus">Montrer plus de matchs</a>
+<script>
+const ids = {ids}, taille = {taille}, delai = {delai}, site = {site};
+const liste = document.getElementById("liste"), bouton = document.getElementById("plus");
+let affiches = 0;
+function afficher() {{
+    for (const id of ids.slice(affiches, affiches + taille)) {{
+        const div = document.createElement("div");
+        div.className = "event__match";
+        div.id = "g_1_" + id;
+        div.innerHTML = `<a href="${{site}}/match/${{id}}/#/resume-du-match">${{id}}</a>`;
+        liste.appendChild(div);
+    }}
+    affiches += taille;
+    if (affiches >= ids.length) bouton.remove();
+}}
+bouton.addEventListener("click", e => {{ e.preventDefault(); setTimeout(afficher, delai); }});
+afficher();
+</script></body></html>"""
+
+# Page de match : équipes et date dans l'en-tête, rendu par script comme sur Flashscore (le HTML brut ne contient
+# que l'objet window.environment ; date en heure locale du navigateur), score et mi-temps sur le résumé,
+# lignes de statistiques de la période de l'onglet rendues quand l'ancre passe sur l'onglet statistiques
+# (route par ancre, sans rechargement)
+PAGE_MATCH = """<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>
+<script>window.environment = {environnement};</script>
+<div class="duelParticipant__startTime"><div id="debut"></div></div>
+<div class="duelParticipant__home"></div>
+<div class="duelParticipant__away"></div>
+<div class="detailOver"><a href="#/resume-du-match">Résumé</a>{onglet_stats}</div>
+<div class="detailScore__wrapper"><span>{home}</span><span>-</span><span>{away}</span></div>
+<div data-testid="wcl-scores-overline-02">TERMINÉ</div>
+<div data-testid="wcl-scores-overline-02">1ÈRE MI-TEMPS</div>
+<div data-testid="wcl-scores-overline-02">{mi_temps_home} - {mi_temps_away}</div>
+<div id="statistiques"></div>
+<script>
+const lignes = {lignes}, delai = {delai};
+const debut = new Date({horodatage} * 1000), deux = n => String(n).padStart(2, "0");
+document.getElementById("debut").textContent = `${{deux(debut.getDate())}}.${{deux(debut.getMonth() + 1)}}.` +
+    `${{debut.getFullYear()}} ${{deux(debut.getHours())}}:${{deux(debut.getMinutes())}}`;
+for (const cote of ["home", "away"]) {{
+    const equipe = window.environment.participantsData[cote][0];
+    document.querySelector(".duelParticipant__" + cote).innerHTML =
+        `<a class="participant__participantName" href="${{equipe.detail_link}}">${{equipe.name}}</a>`;
+}}
+function onglet() {{
+    const periode = location.hash.split("statistiques-du-match/")[1];
+    document.getElementById("statistiques").innerHTML = periode === undefined ? "" : lignes[parseInt(periode)] || "";
+}}
+addEventListener("hashchange", () => setTimeout(onglet, delai));
+onglet();
+</script></body></html>"""
+# Part des matchs du site local sans statistiques
+PART_SANS_STATS = 0.1
+# Chemin des flux de données (async_fetch.URL_FLUX) sur le site local
+CHEMIN_FLUX = "/2/x/feed/"
+
+
+def flux(enregistrements):
+    """Texte d'un flux Flashscore (voir async_fetch.lire_flux) à partir d'une liste de dictionnaires de champs."""
+    return "".join("¬".join(f"{cle}÷{valeur}" for cle, valeur in champs.items()) + "¬~" for champs in enregistrements)
+
+class GestionnaireEnregistrements(SimpleHTTPRequestHandler):
+    """Sert les réponses enregistrées (un fichier par chemin) sans journaliser chaque requête."""
+
+    def guess_type(self, path):
+        if os.path.splitext(path)[1] in ("", ".txt"):
+            return "text/plain; charset=utf-8"
+        return super().guess_type(path)
+
+    def log_message(self, format, *args):
+        pass
+
+class GestionnaireFlashscore(BaseHTTPRequestHandler):
+    """
+    Site Flashscore de substitution, généré à la volée (aucun enregistrement nécessaire) :
+      - .../resultats/ : `nb_matchs` matchs par page (identifiants stables, dérivés du chemin), affichés
+        par paquets de `taille_page` avec le bouton "Montrer plus de matchs"
+      - /match/<id>/   : équipes, date, score, score mi-temps et statistiques (déterministes pour un identifiant),
+        l'en-tête étant rendu par script à partir de window.environment ; certains matchs n'ont pas de statistiques
+        (ni onglet, ni lignes, flux df_st_1 vide)
+      - /2/x/feed/dc_1_<id>, df_st_1_<id>, df_sui_1_<id> : les mêmes données dans les flux lus en mode http
+    Chaque réponse est retardée de `latence` secondes et chaque rendu côté page de `delai_js` ms.
+    """
+
+    def __init__(self, *args, nb_matchs=100, taille_page=20, latence=0.0, delai_js=0, **kwargs):
+        self.nb_matchs = nb_matchs
+        self.taille_page = taille_page
+        self.latence = latence
+        self.delai_js = delai_js
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        chemin = urlsplit(self.path).path
+        if self.latence:
+            time.sleep(self.latence)
+        if chemin.endswith("/resultats/"):
+            self.repondre(self.page_resultats(chemin))
+        elif chemin.startswith("/match/"):
+            self.repondre(self.page_match(chemin.split("/")[2]))
+        elif chemin.startswith(CHEMIN_FLUX):
+            texte = self.flux_match(chemin[len(CHEMIN_FLUX):])
+            if texte is None:
+                self.send_error(404)
+            else:
+                self.repondre(texte, "text/plain")
+        else:
+            self.send_error(404)
+
+    def repondre(self, html, type_contenu="text/html"):
+        contenu = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{type_contenu}; charset=utf-8")
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def page_resultats(self, chemin):
+        ids = [hashlib.sha1(f"{chemin}{i}".encode()).hexdigest()[:8] for i in range(self.nb_matchs)]
+        return PAGE_RESULTATS.format(sport="tennis" if "/tennis/" in chemin else "soccer", ids=json.dumps(ids),
+                                     taille=self.taille_page, delai=self.delai_js,
+                                     site=json.dumps(f"http://{self.headers['Host']}"))
+
+    def page_match(self, identifiant):
+        match = donnees_match(identifiant)
+        environnement = {"event_id_c": identifiant,
+                         "participantsData": {cote: [{"id": equipe_id, "name": equipe_nom,
+                                                      "detail_link": f"/equipe/{equipe_nom}/{equipe_id}/"}]
+                                              for cote, (equipe_nom, equipe_id) in zip(("home", "away"), match["equipes"])}}
+        lignes = ["".join(f'<div data-testid="wcl-statistics"><span data-testid="wcl-scores-simpleText-01">{home}</span>'
+                          f'<span data-testid="wcl-scores-simpleText-01">{nom}</span>'
+                          f'<span data-testid="wcl-scores-simpleText-01">{away}</span></div>' for nom, home, away in stats)
+                  for stats in periodes_stats(match)]
+        onglet_stats = '<a href="#/resume-du-match/statistiques-du-match/1">Statistiques</a>' if match["stats"] else ""
+        return PAGE_MATCH.format(environnement=json.dumps(environnement), onglet_stats=onglet_stats,
+                                 horodatage=match["horodatage"],
+                                 home=match["score"][0], away=match["score"][1],
+                                 mi_temps_home=match["mi_temps"][0], mi_temps_away=match["mi_temps"][1],
+                                 lignes=json.dumps(lignes), delai=self.delai_js)
+
+    def flux_match(self, nom):
+        """
+        Flux dc_1 (date et score), df_st_1 (statistiques des périodes 0 et 1, voir periodes_stats)
+        et df_sui_1 (score mi-temps) ; None si le flux est inconnu.
+        """
+        for prefixe in ("dc_1_", "df_st_1_", "df_sui_1_"):
+            if nom.startswith(prefixe):
+                match = donnees_match(nom[len(prefixe):])
+                break
+        else:
+            return None
+        if prefixe == "dc_1_":
+            return flux([{"DA": 3, "DC": match["horodatage"], "DE": match["score"][0], "DF": match["score"][1]}])
+        if prefixe == "df_sui_1_":
+            return flux([{"AC": "1ère mi-temps", "IG": match["mi_temps"][0], "IH": match["mi_temps"][1]},
+                         {"AC": "2ème mi-temps", "IG": match["score"][0] - match["mi_temps"][0],
+                          "IH": match["score"][1] - match["mi_temps"][1]}])
+        if not match["stats"]:
+            return ""
+        enregistrements = []
+        for periode, stats in zip(("Match", "1ère mi-temps"), periodes_stats(match)):
+            enregistrements.append({"SE": periode})
+            enregistrements += [{"SG": categorie, "SH": home, "SI": away} for categorie, home, away in stats]
+        return flux(enregistrements)
+
+    def log_message(self, format, *args):
+        pass
+
+def donnees_match(identifiant):
+    """
+    Match du site local, déterministe pour un identifiant : équipes, horodatage UTC, scores et statistiques
+    (aucune pour PART_SANS_STATS des matchs, comme les saisons anciennes de Flashscore).
+    """
+    alea = random.Random(identifiant)
+    equipes = alea.sample(EQUIPES, 2)
+    horodatage = int(datetime(alea.randint(2012, 2024), alea.randint(1, 12), alea.randint(1, 28), alea.randint(12, 21),
+                              tzinfo=timezone.utc).timestamp())
+    mi_temps = (alea.randint(0, 2), alea.randint(0, 2))
+    stats = []
+    for nom in CATEGORIES:
+        if nom == "Possession de balle":
+            home = alea.randint(30, 70)
+            valeurs = (f"{home}%", f"{100 - home}%")
+        elif nom == "Passes":
+            valeurs = tuple(f"{alea.randint(60, 90)}% ({alea.randint(200, 400)}/{alea.randint(400, 500)})" for _ in "ha")
+        else:
+            valeurs = (alea.randint(0, 20), alea.randint(0, 20))
+        stats.append((nom, *valeurs))
+    score = (mi_temps[0] + alea.randint(0, 2), mi_temps[1] + alea.randint(0, 2))
+    if alea.random() < PART_SANS_STATS:
+        stats = []
+    return {"equipes": equipes, "horodatage": horodatage, "mi_temps": mi_temps, "score": score, "stats": stats}
+
+def periodes_stats(match):
+    """
+    Statistiques (catégorie, domicile, extérieur) de chaque période, dans l'ordre des onglets : 0 (tout le match,
+    valeurs inversées pour qu'une lecture de la mauvaise période se voie) puis 1 (statistiques du match).
+    """
+    return [[(nom, away, home) for nom, home, away in match["stats"]], match["stats"]]
+
+def servir(gestionnaire, port=0):
+    """Démarre un serveur HTTP local en tâche de fond ; renvoie le serveur et son URL de base."""
+    serveur = ThreadingHTTPServer(("127.0.0.1", port), gestionnaire)
+    serveur.daemon_threads = True
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    return serveur, f"http://127.0.0.1:{serveur.server_address[1]}/"
+
+def demarrer_serveur(repertoire, port=0):
+    """
+    Démarre en tâche de fond un serveur HTTP local qui rejoue les réponses
+    enregistrées dans `repertoire` (ex: flux et pages sauvegardés par process_matches_http).
+    Renvoie le serveur et son URL de base ; arrêter avec serveur.shutdown().
+    """
+    return servir(partial(GestionnaireEnregistrements, directory=repertoire), port)
+
+def demarrer_site(nb_matchs=100, taille_page=20, latence=0.0, delai_js=0, port=0):
+    """
+    Démarre le site de substitution (voir GestionnaireFlashscore). Pour que le scraper le parcoure,
+    FLASHCORE_SITE doit valoir son URL (sans / final) avant l'import de match_ids et competitions.
+    """
+    return servir(partial(GestionnaireFlashscore, nb_matchs=nb_matchs, taille_page=taille_page,
+                          latence=latence, delai_js=delai_js), port)
+
+if __name__ == "__main__":
+    # Usage : python serveur_local.py [répertoire d'enregistrements | site]
+    repertoire = sys.argv[1] if len(sys.argv) > 1 else "enregistrements"
+    if repertoire == "site":
+        serveur, url = demarrer_site(port=8765)
+        print(f"Site de substitution servi sur {url} (FLASHCORE_SITE={url.rstrip('/')})")
+    else:
+        serveur, url = demarrer_serveur(repertoire, port=8765)
+        print(f"Réponses de {repertoire} servies sur {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        serveur.shutdown()
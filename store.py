@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+
+TENTATIVES_MAX = 3  # au-delà, un match en échec n'est plus retenté
+
+
+def resultat_complet(result):
+    """Un match est considéré comme extrait quand son score final est connu."""
+    return result.get("score_equipe_home") is not None
+
+class BaseResultats:
+    """
+    Stockage durable des résultats par match (SQLite, clé = href).
+    Chaque résultat est validé dès réception : une reprise après un arrêt
+    ne refait que les matchs absents ou en échec (moins de `tentatives_max` essais).
+    """
+
+    def __init__(self, chemin="resultats.sqlite", tentatives_max=TENTATIVES_MAX):
+        self.tentatives_max = tentatives_max
+        self.conn = sqlite3.connect(chemin)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS matchs (
+                                 href TEXT PRIMARY KEY,
+                                 saison TEXT,
+                                 statut TEXT,
+                                 tentatives INTEGER NOT NULL DEFAULT 0,
+                                 donnees TEXT,
+                                 maj REAL,
+                                 competition TEXT)""")
+        self.conn.commit()
+
+    def a_traiter(self, links_list):
+        """Filtre la liste (saison, href) : retire les matchs déjà extraits ou abandonnés."""
+        termines = {href for (href,) in self.conn.execute(
+            "SELECT href FROM matchs WHERE statut = 'ok' OR tentatives >= ?", (self.tentatives_max,))}
+        return [(saison, href) for saison, href in links_list if href not in termines]
+
+    def enregistrer(self, result):
+        """Enregistre (ou remplace) le résultat d'un match et le valide immédiatement."""
+        statut = "ok" if resultat_complet(result) else "echec"
+        self.conn.execute("""INSERT INTO matchs (href, saison, statut, tentatives, donnees, maj, competition)
+                             VALUES (?, ?, ?, 1, ?, ?, ?)
+                             ON CONFLICT(href) DO UPDATE SET
+                                 statut = excluded.statut,
+                                 tentatives = matchs.tentatives + 1,
+                                 donnees = excluded.donnees,
+                                 maj = excluded.maj,
+                                 competition = excluded.competition""",
+                          (result["href"], result["saison"], statut, json.dumps(result), time.time(),
+                           result.get("competition")))
+        self.conn.commit()
+        return statut
+
+    def enregistrer_echec(self, href, saison, competition=None):
+        """
+        Enregistre l'échec d'un match sans résultat (exception à chaque tentative) : une tentative de plus,
+        statut "echec", données déjà connues conservées. Après `tentatives_max` échecs le match n'est plus retenté.
+        """
+        donnees = {"saison": saison, "href": href, "competition": competition,
+                   "score_equipe_home": None, "score_equipe_away": None,
+                   "score_mi_temps_home": None, "score_mi_temps_away": None}
+        self.conn.execute("""INSERT INTO matchs (href, saison, statut, tentatives, donnees, maj, competition)
+                             VALUES (?, ?, 'echec', 1, ?, ?, ?)
+                             ON CONFLICT(href) DO UPDATE SET
+                                 statut = CASE WHEN matchs.statut = 'ok' THEN 'ok' ELSE 'echec' END,
+                                 tentatives = matchs.tentatives + 1,
+                                 maj = excluded.maj,
+                                 competition = excluded.competition""",
+                          (href, saison, json.dumps(donnees), time.time(), competition))
+        self.conn.commit()
+
+    def compter(self):
+        """Nombre de matchs par statut."""
+        return dict(self.conn.execute("SELECT statut, COUNT(*) FROM matchs GROUP BY statut"))
+
+    def iter_resultats(self, taille=1000, competition=None):
+        """Parcourt les résultats (d'une compétition ou de toutes) par paquets de `taille` dictionnaires, dans l'ordre d'insertion."""
+        if competition is None:
+            curseur = self.conn.execute("SELECT donnees FROM matchs ORDER BY rowid")
+        else:
+            curseur = self.conn.execute("SELECT donnees FROM matchs WHERE competition = ? ORDER BY rowid", (competition,))
+        while True:
+            lignes = curseur.fetchmany(taille)
+            if not lignes:
+                break
+            yield [json.loads(donnees) for (donnees,) in lignes]
+
+    def exporter_csv(self, chemin="extraction_parallel.csv", taille=1000, competition=None):
+        """
+        Écrit tous les résultats (ou ceux d'une compétition) dans un CSV par paquets (mémoire constante).
+        Les colonnes sont l'union des clés, dans l'ordre d'apparition, comme pd.DataFrame(results).
+        """
+        colonnes = {}
+        for paquet in self.iter_resultats(taille, competition):
+            for result in paquet:
+                colonnes.update(dict.fromkeys(result))
+        entete = True
+        for paquet in self.iter_resultats(taille, competition):
+            pd.DataFrame(paquet, columns=list(colonnes)).to_csv(chemin, mode="w" if entete else "a",
+                                                                 header=entete, index=False)
+            entete = False
+        if entete:
+            pd.DataFrame(columns=list(colonnes)).to_csv(chemin, index=False)
+
+    def exporter_enregistrements(self, chemin, schema, taille=1000, competition=None):
+        """
+        Écrit les résultats en enregistrements de taille fixe (schema.dtype) dans un .npy,
+        paquet par paquet et sans réconcilier de colonnes : toutes les lignes ont le même format.
+        Renvoie le nombre de matchs écrits.
+        """
+        if competition is None:
+            (nombre,) = self.conn.execute("SELECT COUNT(*) FROM matchs").fetchone()
+        else:
+            (nombre,) = self.conn.execute("SELECT COUNT(*) FROM matchs WHERE competition = ?", (competition,)).fetchone()
+        destination = np.lib.format.open_memmap(chemin, mode="w+", dtype=schema.dtype, shape=(nombre,))
+        position = 0
+        for paquet in self.iter_resultats(taille, competition):
+            destination[position:position + len(paquet)] = schema.enregistrements(paquet)
+            position += len(paquet)
+        destination.flush()
+        del destination
+        return position
+
+    def fermer(self):
+        self.conn.close()
+
+class BaseLiens:
+    """
+    Liens de matchs découverts par compétition et par saison (même fichier SQLite que les résultats),
+    indexés par identifiant de match : un match n'est enregistré qu'une fois, toutes saisons et exécutions confondues.
+    Une saison close entièrement parcourue est marquée terminée et n'est plus rechargée ;
+    pour une saison déjà parcourue une fois, on peut arrêter la pagination au premier match connu.
+    """
+
+    def __init__(self, chemin="resultats.sqlite"):
+        self.conn = sqlite3.connect(chemin)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS saisons (
+                                 competition TEXT,
+                                 saison TEXT,
+                                 parcourue INTEGER NOT NULL DEFAULT 0,
+                                 terminee INTEGER NOT NULL DEFAULT 0,
+                                 maj REAL,
+                                 PRIMARY KEY (competition, saison))""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS liens (
+                                 id_match TEXT PRIMARY KEY,
+                                 saison TEXT,
+                                 href TEXT,
+                                 competition TEXT)""")
+        self.conn.commit()
+
+    def etat_saison(self, competition, saison):
+        """(parcourue entièrement au moins une fois, terminée) pour la saison."""
+        ligne = self.conn.execute("SELECT parcourue, terminee FROM saisons WHERE competition = ? AND saison = ?",
+                                  (competition, saison)).fetchone()
+        return (bool(ligne[0]), bool(ligne[1])) if ligne else (False, False)
+
+    def marquer_saison(self, competition, saison, terminee):
+        """Enregistre qu'une saison a été parcourue jusqu'au bout (et si elle est close)."""
+        self.conn.execute("""INSERT INTO saisons (competition, saison, parcourue, terminee, maj) VALUES (?, ?, 1, ?, ?)
+                             ON CONFLICT(competition, saison) DO UPDATE SET
+                                 parcourue = 1, terminee = excluded.terminee, maj = excluded.maj""",
+                          (competition, saison, int(terminee), time.time()))
+        self.conn.commit()
+
+    def ids_connus(self, competition, saison):
+        return {id_match for (id_match,) in self.conn.execute(
+            "SELECT id_match FROM liens WHERE competition = ? AND saison = ?", (competition, saison))}
+
+    def ajouter(self, competition, saison, liens):
+        """Ajoute les liens (id_match, href) de la saison ; renvoie le nombre de nouveaux matchs."""
+        avant = self.conn.total_changes
+        self.conn.executemany("INSERT OR IGNORE INTO liens (competition, saison, href, id_match) VALUES (?, ?, ?, ?)",
+                              [(competition, saison, href, id_match) for id_match, href in liens])
+        self.conn.commit()
+        return self.conn.total_changes - avant
+
+    def liens(self, competition):
+        """Tous les liens (saison, href) de la compétition dans l'ordre de découverte."""
+        return self.conn.execute("SELECT saison, href FROM liens WHERE competition = ? ORDER BY rowid",
+                                 (competition,)).fetchall()
+
+    def fermer(self):
+        self.conn.close()
@@ -0,0 +1,115 @@
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from tqdm import tqdm
+
+from dataset import FEATURES, charger_dataset
+from ia import FootballNet, ChargeurTenseurs, creer_optimiseur, entrainer_epoque, evaluer
+
+
+# --- Grille explorée (produit cartésien) ---
+GRILLE = {
+    "hidden_dim": [16, 32, 64, 128],
+    "dropout_rate": [0.2, 0.5],
+    "lr": [1e-4, 1e-3],
+    "weight_decay": [0.0, 1e-4],
+    "seed": [0, 1, 2],
+}
+BATCH_SIZE = 64
+EPOQUES_MAX = 300
+PATIENCE = 15  # époques sans amélioration de la loss de validation avant l'arrêt
+
+# Données partagées par les tâches d'un même worker (chargées une fois par processus)
+donnees = None
+
+
+def preparer_donnees(chemin="merged_data.csv"):
+    """Découpage train/validation/test (60/20/20) et normalisation ajustée sur le train seul."""
+    X, y = charger_dataset(chemin, FEATURES)
+    y = y.astype(np.int64) + 1
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.25, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    return {nom: (scaler.transform(X_part).astype(np.float32), y_part)
+            for nom, X_part, y_part in [("train", X_train, y_train), ("val", X_val, y_val), ("test", X_test, y_test)]}
+
+def init_worker(parts):
+    """Un thread PyTorch par processus : les configurations tournent en parallèle sur les cœurs."""
+    global donnees
+    torch.set_num_threads(1)
+    donnees = {nom: (torch.as_tensor(X), torch.as_tensor(y)) for nom, (X, y) in parts.items()}
+
+def entrainer_config(config):
+    """Entraîne une configuration avec arrêt précoce sur la loss de validation ; renvoie une ligne de résultats."""
+    torch.manual_seed(config["seed"])
+    X_train, y_train = donnees["train"]
+    X_val, y_val = donnees["val"]
+    X_test, y_test = donnees["test"]
+    model = FootballNet(len(FEATURES), config["hidden_dim"], 3, config["dropout_rate"])
+    criterion = nn.CrossEntropyLoss()
+    optimizer = creer_optimiseur(model, lr=config["lr"], weight_decay=config["weight_decay"])
+    train_loader = ChargeurTenseurs(X_train, y_train, batch_size=BATCH_SIZE, shuffle=True)
+
+    debut = time.perf_counter()
+    meilleure_loss, meilleure_epoque, meilleur_etat = float("inf"), 0, None
+    for epoch in range(1, EPOQUES_MAX + 1):
+        entrainer_epoque(model, train_loader, criterion, optimizer)
+        model.eval()
+        with torch.no_grad():
+            val_loss = criterion(model(X_val), y_val).item()
+        if val_loss < meilleure_loss:
+            meilleure_loss, meilleure_epoque = val_loss, epoch
+            meilleur_etat = {cle: valeur.clone() for cle, valeur in model.state_dict().items()}
+        elif epoch - meilleure_epoque >= PATIENCE:
+            break
+    if meilleur_etat is None:
+        # Loss de validation NaN à chaque époque (divergence) : configuration en échec, le sweep continue
+        return {**config, "statut": "echec", "epoques": epoch, "meilleure_epoque": None, "val_loss": np.nan,
+                "val_accuracy": np.nan, "test_accuracy": np.nan, "duree_s": time.perf_counter() - debut}
+    model.load_state_dict(meilleur_etat)
+    return {**config,
+            "statut": "ok",
+            "epoques": epoch,
+            "meilleure_epoque": meilleure_epoque,
+            "val_loss": meilleure_loss,
+            "val_accuracy": evaluer(model, X_val, y_val),
+            "test_accuracy": evaluer(model, X_test, y_test),
+            "duree_s": time.perf_counter() - debut}
+
+def configurations(grille=GRILLE):
+    noms = list(grille)
+    return [dict(zip(noms, valeurs)) for valeurs in itertools.product(*grille.values())]
+
+def sweep(chemin="merged_data.csv", grille=GRILLE, processus=None, sortie="sweep_resultats.csv"):
+    """Entraîne toutes les configurations de la grille en parallèle et écrit le tableau des résultats."""
+    configs = configurations(grille)
+    parts = preparer_donnees(chemin)
+    lignes = []
+    with ProcessPoolExecutor(max_workers=processus or os.cpu_count(), initializer=init_worker, initargs=(parts,)) as executor:
+        futures = [executor.submit(entrainer_config, config) for config in configs]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Sweep"):
+            lignes.append(future.result())
+    # Classement sur la validation ; le test n'est qu'une mesure finale (configurations en échec à la fin)
+    resultats = pd.DataFrame(lignes).sort_values("val_accuracy", ascending=False).reset_index(drop=True)
+    resultats.to_csv(sortie, index=False)
+    echecs = (resultats["statut"] == "echec").sum()
+    if echecs:
+        print(f"{echecs} configurations en échec (loss de validation NaN à chaque époque)")
+    return resultats
+
+if __name__ == "__main__":
+    resultats = sweep(*sys.argv[1:2])
+    print(resultats.head(10).to_string())
+    # Moyenne sur les graines de chaque configuration, plus fiable qu'un seul entraînement
+    hyperparametres = [nom for nom in GRILLE if nom != "seed"]
+    print(resultats.groupby(hyperparametres)[["val_accuracy", "test_accuracy"]].mean()
+          .sort_values("val_accuracy", ascending=False).head(5).to_string())
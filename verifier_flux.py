@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bench_pretraitement import donnees_brutes
+from dataset import repertoire_dataset
+from frashcore import (COLONNES_CARTONS, merge, merge_flux, nettoyage, nettoyage_flux, pretraitement,
+                       pretraitement_flux)
+
+
+def fichiers_bruts(source, nb_lignes, graine=0):
+    """
+    Deux extractions brutes tirées de `source` : valeurs manquantes injectées (cartons, statistiques, contexte)
+    et colonnes différentes (la seconde perd une statistique et gagne une colonne supprimée au nettoyage).
+    """
+    alea = np.random.default_rng(graine)
+    df = donnees_brutes(source, nb_lignes)
+    df["equipe_home"] = alea.choice(["a", "b", "c"], len(df))
+    df["equipe_away"] = alea.choice(["d", "e", "f"], len(df))
+    df["date_match"] = "2024-08-15 19:00"
+    for col in [*COLONNES_CARTONS, "Corners_home", "Fautes_away", "Passes_home", "equipe_home", "date_match"]:
+        df.loc[alea.random(len(df)) < 0.05, col] = np.nan
+    premier, second = df.iloc[:nb_lignes // 2].copy(), df.iloc[nb_lignes // 2:].copy()
+    second = second.drop(columns=["Hors-jeu_away"])
+    second["Tacles_home"] = alea.integers(0, 20, len(second))
+    return premier, second
+
+def comparer_csv(chemin_memoire, chemin_flux):
+    memoire, flux = pd.read_csv(chemin_memoire), pd.read_csv(chemin_flux)
+    try:
+        pd.testing.assert_frame_equal(memoire, flux, check_dtype=False, rtol=1e-6)
+    except AssertionError as e:
+        print(f"{chemin_memoire} != {chemin_flux} :\n{e}")
+        return False
+    return True
+
+def comparer_dataset(chemin_memoire, chemin_flux):
+    """Matrices des features et labels (absents sans colonne resultat) des deux formats colonnaires."""
+    def charger(repertoire):
+        labels = os.path.join(repertoire, "labels.npy")
+        return np.load(os.path.join(repertoire, "features.npy")), np.load(labels) if os.path.exists(labels) else None
+    (X_memoire, y_memoire), (X_flux, y_flux) = charger(repertoire_dataset(chemin_memoire)), charger(repertoire_dataset(chemin_flux))
+    identiques = (X_memoire.shape == X_flux.shape and np.allclose(X_memoire, X_flux, equal_nan=True, atol=1e-6)
+                  and (y_memoire is None) == (y_flux is None)
+                  and (y_memoire is None or np.array_equal(y_memoire, y_flux)))
+    if not identiques:
+        print(f"Formats colonnaires différents : {repertoire_dataset(chemin_memoire)} / {repertoire_dataset(chemin_flux)}")
+    return identiques
+
+if __name__ == "__main__":
+    # Usage : python verifier_flux.py [nb_lignes] [taille_chunk] [merged_data.csv]
+    # merge/nettoyage/pretraitement en mémoire et leurs versions par morceaux doivent écrire les mêmes lignes
+    # et les mêmes valeurs. Code de sortie 1 en cas d'écart.
+    nb_lignes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    taille_chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 700
+    source = os.path.abspath(sys.argv[3] if len(sys.argv) > 3 else "merged_data.csv")
+    repertoire = tempfile.mkdtemp(prefix="verifier_flux_")
+    os.chdir(repertoire)
+    try:
+        premier, second = fichiers_bruts(source, nb_lignes)
+        premier.to_csv("brut_1.csv", index=False)
+        second.to_csv("brut_2.csv", index=False)
+
+        # En mémoire (merge écrit merged_data.csv)
+        df = merge(pd.read_csv("brut_1.csv"), pd.read_csv("brut_2.csv"))
+        df = nettoyage(df, "utilisable_memoire.csv")
+        pretraitement(df, "memoire")
+
+        # Par morceaux
+        merge_flux(["brut_1.csv", "brut_2.csv"], "merged_flux.csv", taille_chunk)
+        nettoyage_flux("merged_flux.csv", "utilisable_flux.csv", taille_chunk)
+        pretraitement_flux("utilisable_flux.csv", "flux", taille_chunk)
+
+        verifications = {"merge": comparer_csv("merged_data.csv", "merged_flux.csv"),
+                         "merge (colonnaire)": comparer_dataset("merged_data.csv", "merged_flux.csv"),
+                         "nettoyage": comparer_csv("utilisable_memoire.csv", "utilisable_flux.csv"),
+                         "pretraitement": comparer_csv("data_memoire.csv", "data_flux.csv"),
+                         "pretraitement (colonnaire)": comparer_dataset("data_memoire.csv", "data_flux.csv")}
+        lignes = len(pd.read_csv("data_flux.csv", usecols=["resultat"]))
+    finally:
+        os.chdir(os.path.dirname(source))
+        shutil.rmtree(repertoire, ignore_errors=True)
+    for etape, identique in verifications.items():
+        print(f"{etape:<28}: {'identique' if identique else 'DIFFÉRENT'}")
+    print(f"{nb_lignes} lignes brutes, morceaux de {taille_chunk}, {lignes} lignes prétraitées")
+    sys.exit(0 if all(verifications.values()) else 1)
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from forme import (AGREGATS_LIEU, FEATURES_FORME, STATS, MoteurForme, agregats, forme_vectorisee, matchs_valides,
+                   minutes, statistiques)
+
+
+def matchs_synthetiques(nb_matchs, nb_equipes=40, graine=0):
+    """Historique aléatoire : équipes, dates (parfois identiques), scores, tirs, et quelques matchs incomplets."""
+    alea = np.random.default_rng(graine)
+    equipes = np.array([f"e{i}" for i in range(nb_equipes)])
+    paires = np.array([alea.choice(nb_equipes, 2, replace=False) for _ in range(nb_matchs)])
+    debut = np.datetime64("2015-08-01T18:00")
+    df = pd.DataFrame({"href": [f"m{i}" for i in range(nb_matchs)],
+                       "equipe_home": equipes[paires[:, 0]], "equipe_away": equipes[paires[:, 1]],
+                       "date_match": (debut + np.sort(alea.integers(0, 60 * 24 * 365 * 8, nb_matchs)).astype("timedelta64[m]"))
+                                     .astype(str),
+                       "score_equipe_home": alea.integers(0, 5, nb_matchs).astype(float),
+                       "score_equipe_away": alea.integers(0, 5, nb_matchs).astype(float),
+                       "Tirs_au_but_home": alea.integers(0, 25, nb_matchs).astype(float),
+                       "Tirs_au_but_away": alea.integers(0, 25, nb_matchs).astype(float),
+                       "Tirs_cadrés_home": alea.integers(0, 10, nb_matchs).astype(float),
+                       "Tirs_cadrés_away": alea.integers(0, 10, nb_matchs).astype(float)})
+    df.loc[alea.random(nb_matchs) < 0.02, "score_equipe_home"] = np.nan
+    df.loc[alea.random(nb_matchs) < 0.02, "Tirs_au_but_away"] = np.nan
+    df.loc[alea.random(nb_matchs) < 0.01, "equipe_away"] = None
+    return df
+
+def forme_naive(df, n):
+    """Référence : pour chaque match, relecture de tout l'historique de chaque équipe (O(N) par match)."""
+    valides = matchs_valides(df)
+    stats_home, stats_away = statistiques(valides)
+    dates = minutes(valides["date_match"])
+    joues = []  # (équipe, domicile, date, stats) des matchs déjà intégrés
+    X = []
+    for i, (home, away) in enumerate(zip(valides["equipe_home"], valides["equipe_away"])):
+        vecteur = []
+        for equipe, domicile in ((home, True), (away, False)):
+            passes = [match for match in joues if match[0] == equipe]
+            tous = np.array([match[3] for match in passes[-n:]]).reshape(-1, len(STATS))
+            lieu = np.array([match[3] for match in passes if match[1] == domicile][-n:]).reshape(-1, len(STATS))
+            repos = (dates[i] - passes[-1][2]) / 1440 if passes else np.nan
+            vecteur += [len(tous), *agregats(tous.sum(axis=0), len(tous)), repos,
+                        *agregats(lieu.sum(axis=0), len(lieu))[:len(AGREGATS_LIEU)]]
+        X.append(vecteur)
+        joues += [(home, True, dates[i], stats_home[i]), (away, False, dates[i], stats_away[i])]
+    return pd.DataFrame(np.array(X, dtype=np.float32).reshape(-1, len(FEATURES_FORME)), index=valides.index,
+                        columns=FEATURES_FORME)
+
+def identiques(reference, autre):
+    return (reference.index.equals(autre.index)
+            and np.allclose(reference.to_numpy(), autre.to_numpy(), equal_nan=True, rtol=1e-6, atol=1e-6))
+
+if __name__ == "__main__":
+    # Usage : python verifier_forme.py [nb_matchs] [taille_fenetre]
+    # Le calcul vectorisé (rattrapage), le moteur incrémental, une relecture naïve de l'historique et un moteur
+    # repris en cours de route (depuis_historique, sauvegarde puis chargement) doivent donner les mêmes features.
+    # Code de sortie 1 en cas d'écart.
+    nb_matchs = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    df = matchs_synthetiques(nb_matchs)
+
+    debut = time.perf_counter()
+    vectorise = forme_vectorisee(df, n)
+    duree_vectorise = time.perf_counter() - debut
+    debut = time.perf_counter()
+    incremental = MoteurForme(n).traiter(df)
+    duree_incremental = time.perf_counter() - debut
+    naif = forme_naive(df, n)
+
+    # Reprise : état reconstruit sur la première partie de l'historique, sauvegardé, rechargé, puis la suite
+    valides = matchs_valides(df)
+    coupure = valides.index[len(valides) * 2 // 3]
+    position = df.index.get_loc(coupure)
+    with tempfile.TemporaryDirectory() as repertoire:
+        chemin = os.path.join(repertoire, "forme.etat")
+        MoteurForme.depuis_historique(df.iloc[:position], n).sauvegarder(chemin)
+        reprise = MoteurForme.charger(chemin).traiter(df.iloc[position:])
+
+    verifications = {"moteur incrémental": identiques(vectorise, incremental),
+                     "relecture naïve": identiques(vectorise, naif),
+                     "moteur repris": identiques(vectorise.loc[reprise.index], reprise)}
+    for nom, identique in verifications.items():
+        print(f"{nom:<20}: {'identique' if identique else 'DIFFÉRENT'} au calcul vectorisé")
+    print(f"{len(valides)} matchs valides sur {nb_matchs} : vectorisé {duree_vectorise * 1000:.0f} ms, "
+          f"incrémental {duree_incremental / len(valides) * 1e6:.0f} µs par match")
+    sys.exit(0 if all(verifications.values()) else 1)
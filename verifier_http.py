@@ -0,0 +1,109 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+from serveur_local import CATEGORIES, CHEMIN_FLUX, demarrer_serveur, demarrer_site, donnees_match, periodes_stats
+
+
+# Colonnes comparées entre le mode http et la page (clés de contexte et de score, puis statistiques du schéma)
+COLONNES_COMMUNES = ["score_equipe_home", "score_equipe_away", "score_mi_temps_home", "score_mi_temps_away",
+                     "equipe_home", "equipe_away", "date_match"]
+
+
+def liens_test(nb_matchs, url):
+    """Liens (saison, href) de matchs du site local (identifiants arbitraires, données dérivées de l'identifiant)."""
+    from match_ids import url_match
+    ids = [hashlib.sha1(f"verification{i}".encode()).hexdigest()[:8] for i in range(nb_matchs)]
+    return [("2024-2025", url_match(identifiant)) for identifiant in ids]
+
+def colonne_stat(stats, categorie):
+    """Colonne d'une catégorie (schéma de la compétition, ou nom de la catégorie sans schéma), None si non retenue."""
+    return stats.colonne(categorie) if stats is not None else categorie.replace(" ", "_")
+
+def attendu(href, config):
+    """
+    Résultat que doit donner l'extraction d'un match du site local pour une compétition du registre
+    (même format que process_match : période de l'onglet statistiques, score mi-temps seulement si lu).
+    """
+    from datetime import datetime, timezone
+    from competitions import periode_stats
+    from extraction_js import FORMAT_DATE
+    from match_ids import id_match
+    match = donnees_match(id_match(href))
+    mi_temps = [str(but) if config["mi_temps"] else None for but in match["mi_temps"]]
+    result = {"score_equipe_home": str(match["score"][0]), "score_equipe_away": str(match["score"][1]),
+              "score_mi_temps_home": mi_temps[0], "score_mi_temps_away": mi_temps[1],
+              "equipe_home": match["equipes"][0][1], "equipe_away": match["equipes"][1][1],
+              "date_match": datetime.fromtimestamp(match["horodatage"], tz=timezone.utc).strftime(FORMAT_DATE)}
+    for categorie, home, away in periodes_stats(match)[periode_stats(config)]:
+        colonne = colonne_stat(config["stats"], categorie)
+        if colonne is not None:
+            result[colonne + "_home"], result[colonne + "_away"] = str(home), str(away)
+    return result
+
+def extraction_selenium(links_list, nom):
+    """Résultats de process_match (un navigateur) pour les mêmes matchs, None si aucun navigateur ne démarre."""
+    from driver_pool import GestionnaireDriver
+    from frashcore import extraire_match
+    gestionnaire = GestionnaireDriver()
+    try:
+        gestionnaire.demarrer()
+        return [gestionnaire.executer(extraire_match, match_tuple, nom) for match_tuple in links_list]
+    except Exception as e:
+        print(f"Navigateur indisponible ({e.__class__.__name__}) : comparaison avec les données du site local")
+        return None
+    finally:
+        gestionnaire.fermer()
+
+def differences(references, results, colonnes):
+    """Écarts (href, colonne, référence, http) sur les colonnes données."""
+    ecarts = []
+    for reference, result in zip(references, results):
+        for col in colonnes:
+            if str(reference.get(col)) != str(result.get(col)):
+                ecarts.append((result["href"], col, reference.get(col), result.get(col)))
+    return ecarts
+
+if __name__ == "__main__":
+    # Usage : python verifier_http.py [nb_matchs] [compétition du registre]
+    # Extrait des matchs du site local en mode http (flux et pages enregistrés), arrête le site, rejoue les
+    # enregistrements avec serveur_local.demarrer_serveur (hors ligne), et compare les deux à l'extraction selenium
+    # des mêmes pages (ou, sans navigateur, aux données servies). Code de sortie 1 en cas d'écart.
+    nb_matchs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    site, url = demarrer_site()
+    os.environ["FLASHCORE_SITE"] = url.rstrip("/")
+    from async_fetch import process_matches_http
+    from competitions import COMPETITIONS, periode_stats
+
+    nom = sys.argv[2] if len(sys.argv) > 2 else "laliga2"
+    config = COMPETITIONS[nom]
+    stats = config["stats"]
+    lecture = {"stats": stats, "periode": periode_stats(config), "mi_temps": config["mi_temps"]}
+    categories = stats.categories if stats is not None else [colonne_stat(None, categorie) for categorie in CATEGORIES]
+    colonnes = COLONNES_COMMUNES + [f"{colonne}_{cote}" for colonne in categories for cote in ("home", "away")]
+    repertoire = tempfile.mkdtemp(prefix="verifier_http_")
+    morts = []
+    try:
+        links_list = liens_test(nb_matchs, url)
+        direct = process_matches_http(links_list, url_flux=url.rstrip("/") + CHEMIN_FLUX, enregistrement=repertoire,
+                                      **lecture)
+        references = extraction_selenium(links_list, nom) or [attendu(href, config) for _, href in links_list]
+        site.shutdown()
+
+        # Rejeu hors ligne : flux et pages des matchs servis uniquement depuis les enregistrements
+        enregistrements, url_enregistrements = demarrer_serveur(repertoire)
+        rejoue = process_matches_http(links_list, url_flux=url_enregistrements, url_page=url_enregistrements,
+                                      morts=morts, **lecture)
+        enregistrements.shutdown()
+        ecarts = differences(direct, rejoue, colonnes) + differences(references, direct, colonnes)
+    finally:
+        site.shutdown()
+        shutil.rmtree(repertoire, ignore_errors=True)
+    for href, nom_flux, erreur in morts[:5]:
+        print(f"Rejeu : {nom_flux} absent des enregistrements ({erreur})")
+    for href, col, reference, valeur in ecarts[:20]:
+        print(f"{href} {col} : {reference!r} != {valeur!r}")
+    print(f"{nom} : {nb_matchs} matchs, {len(colonnes)} colonnes comparées : {len(ecarts)} écarts")
+    sys.exit(1 if ecarts or morts else 0)
@@ -0,0 +1,124 @@
+import json
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metriques import observer, compter
+
+
+# --- Délai maximal (s) de chaque attente, à ajuster avec resume_attentes() ---
+DELAIS = {
+    "liste_matchs": 10,     # premiers matchs affichés sur la page des résultats
+    "bouton_plus": 5,       # bouton "Montrer plus de matchs" cliquable
+    "liste_agrandie": 10,   # nouveaux matchs ajoutés après le clic
+    "score": 10,            # div.detailScore__wrapper présent
+    "statistiques": 10,     # lignes wcl-statistics remplies (ou match sans onglet statistiques)
+    "mi_temps": 5,          # score mi-temps affiché
+}
+FREQUENCE_SONDAGE = 0.1
+
+# Onglets de la page d'un match (liens par ancre) et onglet des statistiques, absent des matchs sans statistiques
+SELECTEUR_ONGLETS = 'a[href*="#/resume-du-match"]'
+SELECTEUR_ONGLET_STATS = 'a[href*="statistiques-du-match"]'
+SANS_STATISTIQUES = "sans statistiques"
+
+# Fichier des mesures de tous les processus d'une exécution (vidé au début de chaque exécution)
+CHEMIN_ATTENTES = "attentes.jsonl"
+
+# Durées mesurées dans ce processus : nom -> liste de (durée, succès)
+durees = defaultdict(list)
+
+
+def attendre(driver, nom, condition, timeout=None):
+    """
+    Attend que condition(driver) soit vraie, au plus DELAIS[nom] secondes.
+    Enregistre la durée réelle de l'attente et renvoie la valeur de la condition (None si délai dépassé).
+    """
+    debut = time.perf_counter()
+    try:
+        valeur = WebDriverWait(driver, timeout or DELAIS[nom], poll_frequency=FREQUENCE_SONDAGE).until(condition)
+    except TimeoutException:
+        valeur = None
+    duree = time.perf_counter() - debut
+    durees[nom].append((duree, valeur is not None))
+    observer(f"attente.{nom}", duree)
+    if valeur is None:
+        compter("delais_depasses", nom)
+    return valeur
+
+# --- Conditions ---
+
+def score_present(driver):
+    elements = driver.find_elements(By.CSS_SELECTOR, "div.detailScore__wrapper")
+    return elements[0] if elements else False
+
+def statistiques_remplies(driver):
+    """
+    Lignes de statistiques présentes et dont la dernière contient ses trois valeurs, ou SANS_STATISTIQUES
+    dès que les onglets du match sont affichés sans onglet statistiques (inutile d'attendre le délai).
+    """
+    rows = driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="wcl-statistics"]')
+    if rows and len(rows[-1].find_elements(By.CSS_SELECTOR, '[data-testid="wcl-scores-simpleText-01"]')) >= 3:
+        return rows
+    if (not rows and driver.find_elements(By.CSS_SELECTOR, SELECTEUR_ONGLETS)
+            and not driver.find_elements(By.CSS_SELECTOR, SELECTEUR_ONGLET_STATS)):
+        return SANS_STATISTIQUES
+    return False
+
+def mi_temps_present(driver):
+    elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid^="wcl-scores-overline-02"]')
+    return elements if len(elements) > 1 else False
+
+def liste_agrandie(selecteur, nb_avant):
+    """Condition : plus de `nb_avant` éléments correspondent à `selecteur`."""
+    def condition(driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, selecteur)
+        return elements if len(elements) > nb_avant else False
+    return condition
+
+# --- Exploitation des mesures ---
+
+def resume_attentes(mesures=None):
+    """Nombre, délais dépassés et percentiles (s) de chaque attente."""
+    mesures = durees if mesures is None else mesures
+    resume = {}
+    for nom, valeurs in mesures.items():
+        temps = np.array([d for d, _ in valeurs])
+        resume[nom] = {"n": len(valeurs),
+                       "delais_depasses": sum(1 for _, ok in valeurs if not ok),
+                       "p50": float(np.percentile(temps, 50)),
+                       "p95": float(np.percentile(temps, 95)),
+                       "max": float(temps.max()),
+                       "delai": DELAIS.get(nom)}
+    return resume
+
+def reinitialiser_attentes(chemin=CHEMIN_ATTENTES):
+    """Oublie les mesures des exécutions précédentes (à appeler au début d'un run, dans le processus principal)."""
+    durees.clear()
+    if os.path.exists(chemin):
+        os.remove(chemin)
+
+def sauvegarder_attentes(chemin=CHEMIN_ATTENTES):
+    """Ajoute les mesures du processus au fichier (une ligne par attente) et les vide."""
+    if not durees:
+        return
+    with open(chemin, "a", encoding="utf-8") as f:
+        for nom, valeurs in durees.items():
+            for duree, ok in valeurs:
+                f.write(json.dumps({"nom": nom, "duree": duree, "ok": ok, "pid": os.getpid()}) + "\n")
+    durees.clear()
+
+def charger_attentes(chemin=CHEMIN_ATTENTES):
+    """Relit les mesures de tous les processus pour resume_attentes()."""
+    mesures = defaultdict(list)
+    if os.path.exists(chemin):
+        with open(chemin, encoding="utf-8") as f:
+            for ligne in f:
+                m = json.loads(ligne)
+                mesures[m["nom"]].append((m["duree"], m["ok"]))
+    return mesures